@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class GearConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gear'
+
+    def ready(self):
+        from gear import signals  # noqa: F401
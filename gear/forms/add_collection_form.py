@@ -1,6 +1,9 @@
 from django import forms
+from django.urls import reverse_lazy
 from gear.forms.base_form import BaseForm
+from gear.forms.picker_field import PickerMultipleChoiceField
 from gear.models import Item
+from gear.service.service_instances import _item_service
 from users.models import UserProfile
 from users.service.service_instances import _patron_service
 from gear.views.base import is_librarian
@@ -19,16 +22,19 @@ class CollectionForm(BaseForm):
         ),
     )
 
-    allowed_users = forms.ModelMultipleChoiceField(
+    allowed_users = PickerMultipleChoiceField(
         queryset=UserProfile.objects.none(),
+        search_url=reverse_lazy("users:picker_patrons"),
+        placeholder="Search patrons...",
         required=False,
-        widget=forms.CheckboxSelectMultiple,
     )
 
-    items = forms.ModelMultipleChoiceField(
-        queryset=None,
+    items = PickerMultipleChoiceField(
+        queryset=Item.objects.none(),
+        search_url=reverse_lazy("gear:picker_items"),
+        placeholder="Search items...",
+        option_data=("in_public",),
         required=False,
-        widget=forms.CheckboxSelectMultiple,
     )
 
     def __init__(self, *args, **kwargs):
@@ -41,11 +47,8 @@ class CollectionForm(BaseForm):
                 email=self.request_user.email
             )
 
-        self.fields["items"].queryset = Item.objects.all()
-
-        if not is_librarian(self.request_user):
-            self.fields["items"].queryset = (
-                self.fields["items"]
-                .queryset.filter(collections__is_private=False)
-                .distinct()
+        self.fields["items"].queryset = _item_service.search_items(
+            _item_service.get_pickable_items(
+                self.request_user, is_librarian(self.request_user)
             )
+        )
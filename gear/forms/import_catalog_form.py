@@ -0,0 +1,40 @@
+from django import forms
+from gear.service.catalog.catalog_service import CatalogImportError, CatalogService
+
+
+class ImportCatalogForm(forms.Form):
+    catalog = forms.FileField(
+        required=True,
+        error_messages={"required": "Please choose a CSV or JSONL file."},
+        widget=forms.ClearableFileInput(
+            attrs={
+                "accept": ".csv,.jsonl,.ndjson",
+                "class": "file-input file-input-bordered w-full",
+            }
+        ),
+    )
+    images = forms.FileField(
+        required=False,
+        help_text="Optional zip archive with the images named in the catalog.",
+        widget=forms.ClearableFileInput(
+            attrs={"accept": ".zip", "class": "file-input file-input-bordered w-full"}
+        ),
+    )
+    dry_run = forms.BooleanField(
+        required=False,
+        widget=forms.CheckboxInput(attrs={"class": "checkbox checkbox-primary"}),
+    )
+
+    def clean_catalog(self):
+        catalog = self.cleaned_data["catalog"]
+        try:
+            self.catalog_format = CatalogService.detect_format(catalog.name)
+        except CatalogImportError as e:
+            raise forms.ValidationError(str(e))
+        return catalog
+
+    def clean_images(self):
+        images = self.cleaned_data.get("images")
+        if images and not images.name.lower().endswith(".zip"):
+            raise forms.ValidationError("Images must be uploaded as a .zip archive.")
+        return images
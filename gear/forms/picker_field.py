@@ -0,0 +1,71 @@
+from django import forms
+from django.core.exceptions import ValidationError
+
+
+class TypeaheadSelectMultiple(forms.SelectMultiple):
+    """Search-as-you-type picker that only ever renders the selected options.
+
+    Candidates come from a JSON search endpoint, so rendering the widget
+    costs one query for the current selection instead of one row per object
+    in the field's queryset.
+    """
+
+    template_name = "components/_typeahead_picker.html"
+    option_inherits_attrs = False
+
+    class Media:
+        js = ["js/picker.js"]
+
+    def __init__(self, search_url, placeholder="Search...", option_data=(), attrs=None):
+        super().__init__(attrs)
+        self.search_url = search_url
+        self.placeholder = placeholder
+        self.option_data = option_data
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"]["search_url"] = str(self.search_url)
+        context["widget"]["placeholder"] = self.placeholder
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [v for v in value if v]
+        if not selected:
+            return []
+
+        try:
+            objects = list(self.choices.queryset.filter(pk__in=selected))
+        except (ValueError, ValidationError):
+            return []
+
+        options = []
+        for index, obj in enumerate(objects):
+            option_value, label = self.choices.choice(obj)
+            option = self.create_option(name, option_value, label, True, index)
+            for attr in self.option_data:
+                data = getattr(obj, attr, "")
+                if isinstance(data, bool):
+                    data = "true" if data else "false"
+                option["attrs"][f"data-{attr.replace('_', '-')}"] = data
+            options.append(option)
+        return [(None, options, 0)]
+
+
+class PickerMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """ModelMultipleChoiceField paired with :class:`TypeaheadSelectMultiple`.
+
+    Validation already only looks up the submitted primary keys
+    (``pk__in``); this field keeps it that way and never iterates the full
+    queryset to build choices.
+    """
+
+    def __init__(
+        self, queryset, search_url, placeholder="Search...", option_data=(), **kwargs
+    ):
+        kwargs.setdefault(
+            "widget",
+            TypeaheadSelectMultiple(
+                search_url=search_url, placeholder=placeholder, option_data=option_data
+            ),
+        )
+        super().__init__(queryset, **kwargs)
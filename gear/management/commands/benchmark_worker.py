@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+from gear.models import Task
+from gear.service.task.task_service import TaskService
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure outbox worker throughput by queueing no-op tasks and "
+        "draining them at each thread count. Other due tasks are drained "
+        "too, so run it against a scratch database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--tasks", type=int, default=1000)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            nargs="+",
+            default=[1, 4, 8],
+            help="Thread counts to compare.",
+        )
+        parser.add_argument("--batch-size", type=int, default=TaskService.BATCH_SIZE)
+        parser.add_argument(
+            "--sleep-ms",
+            type=int,
+            default=20,
+            help="Simulated handler latency, e.g. one storage round trip.",
+        )
+
+    def handle(self, *args, **options):
+        count = max(1, options["tasks"])
+        payload = {"sleep_ms": options["sleep_ms"]}
+        for threads in options["threads"]:
+            Task.objects.bulk_create(
+                [Task(name="noop", payload=payload) for _ in range(count)],
+                batch_size=1000,
+            )
+            started = time.perf_counter()
+            succeeded, failed = TaskService.run_until_empty(
+                max(1, threads), max(1, options["batch_size"])
+            )
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"threads={threads:<3} tasks={succeeded + failed:<6} "
+                f"failed={failed:<4} {elapsed:8.2f}s "
+                f"{(succeeded + failed) / elapsed:10.1f} tasks/s"
+            )
@@ -0,0 +1,31 @@
+import os
+
+from django.core.management.base import BaseCommand
+from gear.service.recommendation.recommendation_service import RecommendationService
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the 'patrons who borrowed this also borrowed' neighbours of "
+        "every item touched by borrows or wishlist adds since the last run. "
+        "Run it nightly from cron, with --full now and then to drop pairs "
+        "left by removed wishlist entries."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--full", action="store_true", help="Rescore every item.")
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes used to score items.",
+        )
+        parser.add_argument("--top-k", type=int, default=RecommendationService.TOP_K)
+
+    def handle(self, *args, **options):
+        rescored = RecommendationService.build(
+            full=options["full"],
+            processes=max(1, options["processes"]),
+            top_k=max(1, options["top_k"]),
+        )
+        self.stdout.write(f"Rescored {rescored} items.")
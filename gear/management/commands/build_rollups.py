@@ -0,0 +1,36 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from gear.service.rollup.rollup_service import RollupService
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll borrows, returns, requests, rejections and wishlist adds up into "
+        "one ItemDailyStats row per item and day. Only days after the last "
+        "run are processed; run it nightly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--since",
+            help="Rebuild from this day (YYYY-MM-DD) instead of the last run.",
+        )
+        parser.add_argument(
+            "--window-days",
+            type=int,
+            default=RollupService.WINDOW_DAYS,
+            help="Days aggregated and written per transaction.",
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options["since"]:
+            try:
+                since = date.fromisoformat(options["since"])
+            except ValueError:
+                raise CommandError("--since must be a date like 2024-01-31.")
+        days, rows = RollupService.build(
+            since=since, window_days=max(1, options["window_days"])
+        )
+        self.stdout.write(f"Rolled up {days} days into {rows} rows.")
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from gear.service.similarity.similarity_service import SimilarityService
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the TF-IDF similar-item index from every item's title and "
+        "description. Item edits update it as they happen; a periodic rebuild "
+        "refreshes IDF weights and fills lists thinned by edits."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=SimilarityService.TOP_K)
+
+    def handle(self, *args, **options):
+        rows = SimilarityService.build(k=max(1, options["top_k"]))
+        self.stdout.write(f"Indexed {rows} items.")
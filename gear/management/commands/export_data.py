@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+from gear.service.export.export_service import EXPORT_FORMATS, EXPORTS, ExportService
+
+
+class Command(BaseCommand):
+    help = "Stream items, borrow history, rental requests or reviews to CSV/JSONL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("dataset", choices=list(EXPORTS))
+        parser.add_argument("--format", choices=EXPORT_FORMATS, default="csv")
+        parser.add_argument(
+            "--output", "-o", help="File to write to (defaults to stdout)."
+        )
+        parser.add_argument("--chunk-size", type=int, default=ExportService.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines = ExportService.stream(
+            options["dataset"], options["format"], max(1, options["chunk_size"])
+        )
+        if not options["output"]:
+            for line in lines:
+                self.stdout.write(line, ending="")
+            return
+
+        count = -1 if options["format"] == "csv" else 0
+        try:
+            with open(options["output"], "w", encoding="utf-8", newline="") as f:
+                for line in lines:
+                    f.write(line)
+                    count += 1
+        except OSError as e:
+            raise CommandError(str(e))
+        self.stderr.write(
+            self.style.SUCCESS(f"Wrote {count} rows to {options['output']}.")
+        )
@@ -0,0 +1,56 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from gear.service.media.media_service import MediaService
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete stored media that no image field references any more, such as "
+        "files left by queryset deletes and cascades. Field defaults like the "
+        "shared default gear image are never deleted."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="List the orphans without deleting them.",
+        )
+        parser.add_argument(
+            "--min-age-hours",
+            type=float,
+            default=MediaService.MIN_AGE.total_seconds() / 3600,
+            help="Leave files younger than this, which may be uploads in flight.",
+        )
+        parser.add_argument("--batch-size", type=int, default=MediaService.BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+        on_orphan = None
+        if dry_run or options["verbosity"] > 1:
+            on_orphan = self.stdout.write
+
+        report = MediaService.collect(
+            dry_run=dry_run,
+            min_age=timedelta(hours=max(0, options["min_age_hours"])),
+            batch_size=max(1, min(options["batch_size"], MediaService.BATCH_SIZE)),
+            on_orphan=on_orphan,
+        )
+
+        if dry_run:
+            self.stdout.write(
+                f"Scanned {report.scanned} files; {report.orphans} orphans would "
+                "be deleted."
+            )
+            return
+        self.stdout.write(
+            f"Scanned {report.scanned} files; deleted {report.deleted} of "
+            f"{report.orphans} orphans."
+        )
+        if report.in_use:
+            self.stdout.write(
+                f"Kept {report.in_use} orphans that rows started using meanwhile."
+            )
+        for name in report.failed:
+            self.stderr.write(f"Could not delete {name}")
@@ -0,0 +1,89 @@
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from gear.service.catalog.catalog_service import (
+    CATALOG_FORMATS,
+    CatalogImportError,
+    CatalogService,
+)
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk import items from a CSV or JSONL file. Columns: title, "
+        "description, location, quantity, status, images, collections, "
+        "libraries (lists are ';'-separated in CSV)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV or JSONL catalog file.")
+        parser.add_argument(
+            "--images", help="Directory or zip archive holding the item images."
+        )
+        parser.add_argument("--format", choices=CATALOG_FORMATS)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count() or 1,
+            help="Worker processes for parsing and image handling.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CatalogService.CHUNK_SIZE)
+        parser.add_argument(
+            "--librarian", help="Email of the librarian recorded as creator."
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Validate every row without writing items or uploading images.",
+        )
+        parser.add_argument(
+            "--max-errors",
+            type=int,
+            default=50,
+            help="How many row errors to print.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.isfile(path):
+            raise CommandError(f"Catalog file '{path}' does not exist.")
+        if options["images"] and not os.path.exists(options["images"]):
+            raise CommandError(f"Image source '{options['images']}' does not exist.")
+
+        created_by = None
+        if options["librarian"]:
+            created_by = UserProfile.objects.filter(
+                email=options["librarian"], user_type="librarian"
+            ).first()
+            if created_by is None:
+                raise CommandError(f"No librarian with email {options['librarian']}.")
+
+        try:
+            fmt = options["format"] or CatalogService.detect_format(path)
+            with open(path, encoding="utf-8-sig", newline="") as stream:
+                report = CatalogService.import_catalog(
+                    stream,
+                    fmt,
+                    image_path=options["images"],
+                    created_by=created_by,
+                    workers=max(1, options["workers"]),
+                    chunk_size=max(1, options["chunk_size"]),
+                    dry_run=options["dry_run"],
+                )
+        except CatalogImportError as e:
+            raise CommandError(str(e))
+
+        for line, message in report.errors[: options["max_errors"]]:
+            self.stderr.write(f"line {line}: {message}")
+        hidden = len(report.errors) - options["max_errors"]
+        if hidden > 0:
+            self.stderr.write(f"... and {hidden} more errors")
+
+        verb = "Validated" if options["dry_run"] else "Imported"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {report.created} of {report.rows} rows "
+                f"({report.images} images, {len(report.errors)} errors)."
+            )
+        )
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand, CommandError
+from gear.service.startup.startup_service import APPLICATION, StartupService
+
+
+class Command(BaseCommand):
+    help = (
+        "Start a fresh worker process under `python -X importtime`, serve one "
+        "request through the ASGI application, and report the slowest imports and the time to first "
+        "response. With --max-ms it fails when the worker is slower than that."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", default="/", help="URL path to request.")
+        parser.add_argument("--host", default="localhost")
+        parser.add_argument(
+            "--application",
+            default=APPLICATION,
+            help="Module whose ASGI `application` to serve.",
+        )
+        parser.add_argument("--top", type=int, default=20)
+        parser.add_argument(
+            "--max-ms",
+            type=float,
+            help="Budget for boot plus first response, in milliseconds.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            profile = StartupService.profile(
+                options["path"], options["host"], application=options["application"]
+            )
+        except RuntimeError as e:
+            raise CommandError(f"The worker failed to start: {e}")
+
+        top = max(1, options["top"])
+        self.stdout.write(f"{'self ms':>9} {'cumul. ms':>10}  module")
+        for cost in profile.slowest(top):
+            self.stdout.write(
+                f"{cost.self_us / 1000:9.1f} {cost.cumulative_us / 1000:10.1f}  "
+                f"{'  ' * cost.depth}{cost.module}"
+            )
+        self.stdout.write("")
+        self.stdout.write(f"{'self ms':>9}  package")
+        for package, ms in profile.by_package(top):
+            self.stdout.write(f"{ms:9.1f}  {package}")
+        self.stdout.write("")
+        self.stdout.write(
+            f"Imports {profile.import_ms:.0f} ms across {len(profile.imports)} "
+            f"modules. Boot {profile.boot_ms:.0f} ms, first response "
+            f"{profile.first_response_ms:.0f} ms (HTTP {profile.status}), "
+            f"total {profile.total_ms:.0f} ms."
+        )
+
+        budget = options["max_ms"]
+        if budget is not None and profile.total_ms > budget:
+            raise CommandError(
+                f"Time to first response {profile.total_ms:.0f} ms is over the "
+                f"{budget:.0f} ms budget."
+            )
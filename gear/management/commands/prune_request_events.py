@@ -0,0 +1,32 @@
+import time
+
+from django.core.management.base import BaseCommand
+from gear.service.queue.request_queue_service import RequestQueueService
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete request queue events older than a day in batches. Streams "
+        "resuming from before them just get fresh counts. Run it from cron, "
+        "or with --interval as a long-running sweeper."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=RequestQueueService.PRUNE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between sweeps; 0 sweeps once and exits.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        while True:
+            removed = RequestQueueService.prune(batch_size=batch_size)
+            self.stdout.write(f"Deleted {removed} old request events.")
+            if options["interval"] <= 0:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+from gear.service.session.session_service import SessionService
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions from the session table in batches. Run it "
+        "from cron, or with --interval as a long-running sweeper."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=SessionService.PRUNE_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between sweeps; 0 sweeps once and exits.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        while True:
+            removed = SessionService.prune_expired(batch_size=batch_size)
+            self.stdout.write(f"Deleted {removed} expired sessions.")
+            if options["interval"] <= 0:
+                return
+            time.sleep(options["interval"])
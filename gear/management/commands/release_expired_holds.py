@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from gear.service.hold.hold_service import HoldService
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete inventory holds whose time box has passed and send restock "
+        "alerts for items they had used up. Expired holds no longer count "
+        "against availability. Run it from cron, or with --interval as a "
+        "long-running sweeper."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size", type=int, default=HoldService.SWEEP_BATCH_SIZE
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=0,
+            help="Seconds between sweeps; 0 sweeps once and exits.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = max(1, options["batch_size"])
+        while True:
+            removed = HoldService.sweep_expired(batch_size=batch_size)
+            self.stdout.write(f"Released {removed} expired holds.")
+            if options["interval"] <= 0:
+                return
+            time.sleep(options["interval"])
@@ -0,0 +1,58 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from gear.service.task.task_service import TaskService
+
+
+class Command(BaseCommand):
+    help = (
+        "Run queued outbox tasks. Claims due tasks in batches with SKIP "
+        "LOCKED, so several workers can run side by side, and retries "
+        "failures with exponential backoff."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads", type=int, default=4, help="Handler threads per worker."
+        )
+        parser.add_argument("--batch-size", type=int, default=TaskService.BATCH_SIZE)
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=2.0,
+            help="Seconds to sleep when no task is due.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the due tasks and exit instead of polling.",
+        )
+
+    def handle(self, *args, **options):
+        threads = max(1, options["threads"])
+        batch_size = max(1, options["batch_size"])
+
+        if options["once"]:
+            succeeded, failed = TaskService.run_until_empty(threads, batch_size)
+            self.stdout.write(f"Ran {succeeded} tasks, {failed} failed.")
+            return
+
+        pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        self.stdout.write(f"Worker started with {threads} threads.")
+        try:
+            while True:
+                results = TaskService.run_batch(batch_size, pool)
+                for result in results:
+                    if not result.ok:
+                        self.stderr.write(
+                            f"Task {result.task.id} ({result.task.name}) failed "
+                            f"on attempt {result.task.attempts}: {result.error}"
+                        )
+                if not results:
+                    time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Worker stopped.")
+        finally:
+            if pool is not None:
+                pool.shutdown()
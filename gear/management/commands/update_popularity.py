@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from gear.service.popularity.popularity_service import PopularityService
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the time-decayed popularity of every item, collection and "
+        "library that the home page and API sort by. Brings the daily rollups "
+        "up to date first; run it nightly from cron after midnight."
+    )
+
+    def handle(self, *args, **options):
+        changed = PopularityService.update()
+        self.stdout.write(f"Updated popularity for {changed} items.")
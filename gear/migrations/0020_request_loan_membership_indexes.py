@@ -0,0 +1,55 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:24
+
+from django.db import migrations, models
+import uuid
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gear', '0019_alter_collection_image_alter_itemimage_image_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='item',
+            name='identifier',
+            field=models.UUIDField(db_index=True, default=uuid.uuid4, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='borrowhistory',
+            index=models.Index(condition=models.Q(('returned_at__isnull', True)), fields=['item'], name='gear_borrow_open_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowhistory',
+            index=models.Index(fields=['item', 'returned_at'], name='gear_borrow_item_ret_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='borrowhistory',
+            index=models.Index(fields=['user', 'item', 'returned_at'], name='gear_borrow_user_item_ret_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collectionaccessrequest',
+            index=models.Index(fields=['patron', 'status', 'approved_date'], name='gear_access_patron_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collectionaccessrequest',
+            index=models.Index(fields=['status', '-request_date'], name='gear_access_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='collectionaccessrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-request_date'], name='gear_access_pending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentalrequest',
+            index=models.Index(fields=['patron', 'item', 'status'], name='gear_rental_patron_item_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentalrequest',
+            index=models.Index(fields=['status', '-request_date'], name='gear_rental_status_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='rentalrequest',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-request_date'], name='gear_rental_pending_idx'),
+        ),
+    ]
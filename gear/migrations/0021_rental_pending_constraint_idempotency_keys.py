@@ -0,0 +1,85 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:46
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def drop_duplicate_pending_requests(apps, schema_editor):
+    """Keep only the newest pending request per (patron, item).
+
+    Older duplicates could only come from double submits; removing them is
+    what cancelling them would have done.
+    """
+    RentalRequest = apps.get_model("gear", "RentalRequest")
+    seen = set()
+    duplicates = []
+    pending = (
+        RentalRequest.objects.filter(status="pending")
+        .order_by("patron_id", "item_id", "-request_date")
+        .values_list("id", "patron_id", "item_id")
+    )
+    for request_id, patron_id, item_id in pending.iterator():
+        if (patron_id, item_id) in seen:
+            duplicates.append(request_id)
+        else:
+            seen.add((patron_id, item_id))
+    RentalRequest.objects.filter(id__in=duplicates).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0007_userprofile_search_indexes"),
+        ("gear", "0020_request_loan_membership_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IdempotencyKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("key", models.CharField(max_length=64)),
+                ("path", models.CharField(max_length=255)),
+                (
+                    "status_code",
+                    models.PositiveSmallIntegerField(blank=True, null=True),
+                ),
+                ("location", models.CharField(blank=True, max_length=500)),
+                ("created_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+        ),
+        migrations.RunPython(
+            drop_duplicate_pending_requests, migrations.RunPython.noop
+        ),
+        migrations.AddConstraint(
+            model_name="rentalrequest",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status", "pending")),
+                fields=("patron", "item"),
+                name="gear_rental_one_pending_per_item",
+            ),
+        ),
+        migrations.AddField(
+            model_name="idempotencykey",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="idempotency_keys",
+                to="users.userprofile",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="idempotencykey",
+            constraint=models.UniqueConstraint(
+                fields=("user", "key"), name="gear_idempotency_user_key"
+            ),
+        ),
+    ]
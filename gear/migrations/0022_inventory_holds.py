@@ -0,0 +1,55 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:50
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gear", "0021_rental_pending_constraint_idempotency_keys"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="InventoryHold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField()),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("expires_at", models.DateTimeField()),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="holds",
+                        to="gear.item",
+                    ),
+                ),
+                (
+                    "rental_request",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="hold",
+                        to="gear.rentalrequest",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["item", "expires_at"], name="gear_hold_item_expires_idx"
+                    ),
+                    models.Index(fields=["expires_at"], name="gear_hold_expires_idx"),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 4.2.19 on 2026-10-19 09:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0007_userprofile_search_indexes"),
+        ("gear", "0022_inventory_holds"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="WishlistAlert",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("seen_at", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="wishlistentry",
+            index=models.Index(
+                fields=["item", "user_profile"], name="gear_wishlist_item_user_idx"
+            ),
+        ),
+        migrations.AddField(
+            model_name="wishlistalert",
+            name="item",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="wishlist_alerts",
+                to="gear.item",
+            ),
+        ),
+        migrations.AddField(
+            model_name="wishlistalert",
+            name="user_profile",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="wishlist_alerts",
+                to="users.userprofile",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wishlistalert",
+            index=models.Index(
+                fields=["user_profile", "seen_at"], name="gear_wlalert_user_seen_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="wishlistalert",
+            index=models.Index(
+                fields=["user_profile", "created_at"],
+                name="gear_wlalert_user_created_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="wishlistalert",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("seen_at__isnull", True)),
+                fields=("user_profile", "item"),
+                name="gear_wlalert_one_unseen",
+            ),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0008_userprofile_unread_notifications"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("gear", "0024_task_outbox"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Notification",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("rental_approved", "Rental approved"),
+                            ("rental_rejected", "Rental denied"),
+                            ("collection_approved", "Collection access approved"),
+                            ("collection_rejected", "Collection access denied"),
+                        ],
+                        max_length=30,
+                    ),
+                ),
+                ("target_id", models.CharField(max_length=64)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                ("read_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "recipient",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="notifications",
+                        to="users.userprofile",
+                    ),
+                ),
+                (
+                    "target_type",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to="contenttypes.contenttype",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["recipient", "read_at"],
+                        name="gear_notif_recipient_read_idx",
+                    ),
+                    models.Index(
+                        fields=["recipient", "-created_at", "id"],
+                        name="gear_notif_feed_idx",
+                    ),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:11
+
+import datetime
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gear", "0026_request_events"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RollupState",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("last_day", models.DateField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ItemDailyStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("borrows", models.PositiveIntegerField(default=0)),
+                ("returns", models.PositiveIntegerField(default=0)),
+                ("outstanding", models.PositiveIntegerField(default=0)),
+                ("requests", models.PositiveIntegerField(default=0)),
+                ("rejections", models.PositiveIntegerField(default=0)),
+                ("wishlist_adds", models.PositiveIntegerField(default=0)),
+                ("loan_duration", models.DurationField(default=datetime.timedelta)),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="gear.item",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["day", "item"], name="gear_daily_day_item_idx")
+                ],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="itemdailystats",
+            constraint=models.UniqueConstraint(
+                fields=("item", "day"), name="gear_daily_item_day"
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gear", "0027_daily_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ItemRecommendation",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("score", models.FloatField()),
+                (
+                    "item",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="recommendations",
+                        to="gear.item",
+                    ),
+                ),
+                (
+                    "neighbour",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="gear.item",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="itemrecommendation",
+            constraint=models.UniqueConstraint(
+                fields=("item", "rank"), name="gear_recommendation_item_rank"
+            ),
+        ),
+    ]
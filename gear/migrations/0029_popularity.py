@@ -0,0 +1,46 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gear", "0028_item_recommendations"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="collection",
+            name="popularity",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="item",
+            name="popularity",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name="library",
+            name="popularity",
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name="collection",
+            index=models.Index(
+                fields=["-popularity", "id"], name="gear_coll_popularity_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="item",
+            index=models.Index(
+                fields=["-popularity", "id"], name="gear_item_popularity_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="library",
+            index=models.Index(
+                fields=["-popularity", "id"], name="gear_library_popularity_idx"
+            ),
+        ),
+    ]
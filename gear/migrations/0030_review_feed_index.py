@@ -0,0 +1,19 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gear", "0029_popularity"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="itemreview",
+            index=models.Index(
+                fields=["item", "-created_at", "id"], name="gear_review_item_feed_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 4.2.19 on 2026-10-19 11:40
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def copy_unseen_alerts(apps, schema_editor):
+    """Turn each unseen wishlist alert into an unread restock notification.
+
+    Seen alerts are dropped. The copies are stamped with the migration time,
+    which only makes the restock rate limit a little stricter for a day.
+    """
+    WishlistAlert = apps.get_model("gear", "WishlistAlert")
+    Notification = apps.get_model("gear", "Notification")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    UserProfile = apps.get_model("users", "UserProfile")
+    unseen = list(
+        WishlistAlert.objects.filter(seen_at__isnull=True).values_list(
+            "user_profile_id", "item_id"
+        )
+    )
+    if not unseen:
+        return
+    item_type, _ = ContentType.objects.get_or_create(app_label="gear", model="item")
+    Notification.objects.bulk_create(
+        Notification(
+            recipient_id=recipient_id,
+            kind="item_restocked",
+            target_type=item_type,
+            target_id=str(item_id),
+        )
+        for recipient_id, item_id in unseen
+    )
+    for recipient_id, count in Counter(r for r, _ in unseen).items():
+        UserProfile.objects.filter(id=recipient_id).update(
+            unread_notifications=F("unread_notifications") + count
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("users", "0008_userprofile_unread_notifications"),
+        ("gear", "0030_review_feed_index"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="notification",
+            name="kind",
+            field=models.CharField(
+                choices=[
+                    ("rental_approved", "Rental approved"),
+                    ("rental_rejected", "Rental denied"),
+                    ("collection_approved", "Collection access approved"),
+                    ("collection_rejected", "Collection access denied"),
+                    ("item_restocked", "Wishlisted item available"),
+                ],
+                max_length=30,
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="notification",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(
+                    ("kind", "item_restocked"), ("read_at__isnull", True)
+                ),
+                fields=("recipient", "target_type", "target_id"),
+                name="gear_notif_one_unread_restock",
+            ),
+        ),
+        migrations.RunPython(copy_unseen_alerts, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name="WishlistAlert",
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.19 on 2026-10-19 12:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("gear", "0032_cache_table"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SimilarityIndexFile",
+            fields=[
+                (
+                    "name",
+                    models.CharField(max_length=50, primary_key=True, serialize=False),
+                ),
+                ("version", models.PositiveIntegerField(default=0)),
+                ("data", models.BinaryField(default=bytes)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
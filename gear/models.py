@@ -1,21 +1,76 @@
+import os
 import uuid
-from django.db import models
-from django.db.models import Avg
+from datetime import timedelta
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Avg, Q, Sum
+from django.utils import timezone
 from django.forms import ValidationError
 from users.models import UserProfile as User
 from users.service.patron.patron_service import PatronService
 from django.db.models.fields.files import ImageFieldFile
 from django.db.models import ImageField as DjangoImageField
+from gear.storage import content_name, save_once
 
 DEFAULT_IMAGE = "item_images/default_gear.png"
 
 
+def _queue_file_deletes(names):
+    """Queue storage deletes in the caller's transaction, sparing the default.
+
+    The task waits ``FILE_DELETE_DELAY`` seconds and then skips any file a
+    row still references, so a transaction that is reusing the same
+    content-addressed file has time to commit first.
+    """
+    from gear.tasks import enqueue
+
+    names = [name for name in names if name and name != DEFAULT_IMAGE]
+    if names:
+        enqueue("delete_files", {"names": names}, delay=settings.FILE_DELETE_DELAY)
+
+
 class ProtectedImageFieldFile(ImageFieldFile):
+    def save(self, name, content, save=True):
+        """Store ``content`` under its hash, uploading it only if it is new."""
+        directory = os.path.dirname(self.field.generate_filename(self.instance, name))
+        name = save_once(
+            self.storage,
+            content_name(directory, name, content),
+            content,
+            max_length=self.field.max_length,
+        )
+        self.name = name
+        setattr(self.instance, self.field.attname, name)
+        self._committed = True
+        if save:
+            self.instance.save()
+
+    save.alters_data = True
+
     def delete(self, save=False):
-        if self.name == DEFAULT_IMAGE:
-            return
+        """Clear the field and queue the file's delete, see ``_queue_file_deletes``.
 
-        super().delete(save=save)
+        The worker leaves the file in storage while any row, this one
+        included if it is not saved, still refers to it.
+        """
+        if not self:
+            return
+        name = self.name
+        if hasattr(self, "_dimensions_cache"):
+            del self._dimensions_cache
+        if hasattr(self, "_file"):
+            self.close()
+            del self.file
+        self.name = None
+        setattr(self.instance, self.field.attname, self.name)
+        self._committed = False
+        if save:
+            self.instance.save()
+        _queue_file_deletes([name])
+
+    delete.alters_data = True
 
 
 class ProtectedImageField(DjangoImageField):
@@ -40,11 +95,20 @@ class Library(models.Model):
         blank=True,
     )
     updated_at = models.DateTimeField(auto_now=True)
+    # Time-decayed activity score, refreshed by ``manage.py update_popularity``.
+    popularity = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["-popularity", "id"], name="gear_library_popularity_idx"
+            ),
+        ]
 
     def delete(self, *args, **kwargs):
-        if self.image and self.image.name != "item_images/default_gear.png":
-            self.image.delete(save=False)
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            _queue_file_deletes([self.image.name if self.image else None])
+            super().delete(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -82,7 +146,7 @@ class Item(models.Model):
 
     title = models.CharField(max_length=200)
 
-    identifier = models.UUIDField(default=uuid.uuid4, editable=False)
+    identifier = models.UUIDField(default=uuid.uuid4, editable=False, db_index=True)
 
     STATUS_CHOICES = [
         ("available", "available"),
@@ -139,6 +203,13 @@ class Item(models.Model):
         related_name="items_created",
     )
     updated_at = models.DateTimeField(auto_now=True)
+    # Time-decayed activity score, refreshed by ``manage.py update_popularity``.
+    popularity = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-popularity", "id"], name="gear_item_popularity_idx"),
+        ]
 
     def clean(self):
         super().clean()
@@ -174,10 +245,18 @@ class Item(models.Model):
 
     @property
     def available_quantity(self):
+        return self.available_for_request(None)
+
+    def available_for_request(self, rental_request):
+        """Units not on loan or held, counting ``rental_request``'s own hold."""
         rented = BorrowHistory.objects.filter(
             item=self, returned_at__isnull=True
         ).count()
-        return self.quantity - rented
+        holds = InventoryHold.objects.active().filter(item=self)
+        if rental_request is not None:
+            holds = holds.exclude(rental_request=rental_request)
+        held = holds.aggregate(held=Sum("quantity"))["held"] or 0
+        return self.quantity - rented - held
 
     @property
     def is_private(self):
@@ -188,11 +267,17 @@ class Item(models.Model):
         return self.collections.exists()
 
     def delete(self, *args, **kwargs):
-        for img in self.images.all():
-            if img.image and img.image.name != "item_images/default_gear.png":
-                img.image.delete(save=False)
+        with transaction.atomic():
+            _queue_file_deletes(self.images.values_list("image", flat=True))
+            super().delete(*args, **kwargs)
+
 
-        super().delete(*args, **kwargs)
+class ItemImageQuerySet(models.QuerySet):
+    def delete(self):
+        """Delete the rows and queue their files in one task."""
+        with transaction.atomic():
+            _queue_file_deletes(self.values_list("image", flat=True))
+            return super().delete()
 
 
 class ItemImage(models.Model):
@@ -206,10 +291,12 @@ class ItemImage(models.Model):
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ItemImageQuerySet.as_manager()
+
     def delete(self, *args, **kwargs):
-        if self.image and self.image.name != "item_images/default_gear.png":
-            self.image.delete(save=False)
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            _queue_file_deletes([self.image.name if self.image else None])
+            super().delete(*args, **kwargs)
 
     def __str__(self):
         return f"Image for {self.item.title}"
@@ -226,6 +313,24 @@ class BorrowHistory(models.Model):
     borrowed_at = models.DateTimeField(auto_now_add=True)
     returned_at = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            # available_quantity and the currently-borrowed views only ever
+            # look at open loans, so keep a small partial index for them.
+            models.Index(
+                fields=["item"],
+                condition=Q(returned_at__isnull=True),
+                name="gear_borrow_open_item_idx",
+            ),
+            models.Index(
+                fields=["item", "returned_at"], name="gear_borrow_item_ret_idx"
+            ),
+            models.Index(
+                fields=["user", "item", "returned_at"],
+                name="gear_borrow_user_item_ret_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user} borrowed {self.item} on {self.borrowed_at}"
 
@@ -258,6 +363,30 @@ class RentalRequest(models.Model):
     )
     approved_date = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["patron", "item", "status"], name="gear_rental_patron_item_idx"
+            ),
+            models.Index(
+                fields=["status", "-request_date"], name="gear_rental_status_date_idx"
+            ),
+            models.Index(
+                fields=["-request_date"],
+                condition=Q(status="pending"),
+                name="gear_rental_pending_idx",
+            ),
+        ]
+        constraints = [
+            # A patron may only have one open request per item; the insert
+            # itself enforces it, so double submits cannot race past a check.
+            models.UniqueConstraint(
+                fields=["patron", "item"],
+                condition=Q(status="pending"),
+                name="gear_rental_one_pending_per_item",
+            ),
+        ]
+
     def __str__(self):
         return (
             f"Request for {self.item.title} ({self.quantity} units) "
@@ -265,6 +394,46 @@ class RentalRequest(models.Model):
         )
 
 
+class InventoryHoldQuerySet(models.QuerySet):
+    def active(self, now=None):
+        return self.filter(expires_at__gt=now or timezone.now())
+
+    def expired(self, now=None):
+        return self.filter(expires_at__lte=now or timezone.now())
+
+
+class InventoryHold(models.Model):
+    """Units reserved for a pending rental request until ``expires_at``.
+
+    A hold only exists while its request is pending: approving, denying or
+    cancelling the request removes it, and expired rows stop counting
+    against availability straight away and are swept up later.
+    """
+
+    rental_request = models.OneToOneField(
+        RentalRequest, on_delete=models.CASCADE, related_name="hold"
+    )
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="holds")
+    quantity = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+
+    objects = InventoryHoldQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Availability sums the live holds of an item next to its open
+            # loans; the sweep scans by expiry alone.
+            models.Index(
+                fields=["item", "expires_at"], name="gear_hold_item_expires_idx"
+            ),
+            models.Index(fields=["expires_at"], name="gear_hold_expires_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} of {self.item} held until {self.expires_at}"
+
+
 class ItemReview(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     item = models.ForeignKey("Item", on_delete=models.CASCADE, related_name="reviews")
@@ -276,6 +445,12 @@ class ItemReview(models.Model):
 
     class Meta:
         unique_together = ("item", "user")
+        indexes = [
+            # Keyset pages of an item's reviews, newest first.
+            models.Index(
+                fields=["item", "-created_at", "id"], name="gear_review_item_feed_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user.name} reviewed {self.item.title}: {self.rating}/5"
@@ -293,6 +468,12 @@ class WishlistEntry(models.Model):
 
     class Meta:
         unique_together = ("user_profile", "item")
+        indexes = [
+            # Restock alerts look up everyone who wishlisted an item.
+            models.Index(
+                fields=["item", "user_profile"], name="gear_wishlist_item_user_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.user_profile.name} wishlisted {self.item.title}"
@@ -321,11 +502,18 @@ class Collection(models.Model):
         related_name="collections_created",
     )
     updated_at = models.DateTimeField(auto_now=True)
+    # Time-decayed activity score, refreshed by ``manage.py update_popularity``.
+    popularity = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-popularity", "id"], name="gear_coll_popularity_idx"),
+        ]
 
     def delete(self, *args, **kwargs):
-        if self.image and self.image.name != "item_images/default_gear.png":
-            self.image.delete(save=False)
-        super().delete(*args, **kwargs)
+        with transaction.atomic():
+            _queue_file_deletes([self.image.name if self.image else None])
+            super().delete(*args, **kwargs)
 
     def __str__(self):
         return self.title
@@ -375,6 +563,22 @@ class CollectionAccessRequest(models.Model):
     )
     approved_date = models.DateTimeField(null=True, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["patron", "status", "approved_date"],
+                name="gear_access_patron_status_idx",
+            ),
+            models.Index(
+                fields=["status", "-request_date"], name="gear_access_status_date_idx"
+            ),
+            models.Index(
+                fields=["-request_date"],
+                condition=Q(status="pending"),
+                name="gear_access_pending_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Access Request for {self.collection.title} by {self.patron.name} ({self.status})"
 
@@ -408,3 +612,236 @@ class CollectionItem(models.Model):
 
     def __str__(self):
         return f"{self.item.title} in {self.collection.title}"
+
+
+class Notification(models.Model):
+    """Something that happened to one of ``recipient``'s requests or items."""
+
+    KIND_CHOICES = [
+        ("rental_approved", "Rental approved"),
+        ("rental_rejected", "Rental denied"),
+        ("collection_approved", "Collection access approved"),
+        ("collection_rejected", "Collection access denied"),
+        ("item_restocked", "Wishlisted item available"),
+    ]
+
+    recipient = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="notifications"
+    )
+    kind = models.CharField(max_length=30, choices=KIND_CHOICES)
+    target_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    target_id = models.CharField(max_length=64)
+    target = GenericForeignKey("target_type", "target_id")
+    created_at = models.DateTimeField(auto_now_add=True)
+    read_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["recipient", "read_at"], name="gear_notif_recipient_read_idx"
+            ),
+            models.Index(
+                fields=["recipient", "-created_at", "id"],
+                name="gear_notif_feed_idx",
+            ),
+        ]
+        constraints = [
+            # At most one unread restock alert per patron and item, so
+            # repeated returns of the same item do not stack up alerts.
+            models.UniqueConstraint(
+                fields=["recipient", "target_type", "target_id"],
+                condition=Q(kind="item_restocked", read_at__isnull=True),
+                name="gear_notif_one_unread_restock",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for {self.recipient}"
+
+    @property
+    def message(self):
+        title = getattr(self.target, "title", "an item")
+        return {
+            "rental_approved": f"Your rental request for {title} was approved.",
+            "rental_rejected": f"Your rental request for {title} was denied.",
+            "collection_approved": f"You now have access to {title}.",
+            "collection_rejected": f"Your request to access {title} was denied.",
+            "item_restocked": f"{title} from your wishlist is available again.",
+        }.get(self.kind, self.get_kind_display())
+
+    @property
+    def is_read(self):
+        return self.read_at is not None
+
+
+class RequestEvent(models.Model):
+    """A pending-queue change.
+
+    The auto-increment id is the high-water mark the librarian queue
+    stream resumes from, since request ids are UUIDs and not ordered. Ids
+    follow insert order, not commit order, so the stream only moves its
+    mark past events that have settled (see ``RequestQueueService``).
+    """
+
+    KIND_CHOICES = [
+        ("rental", "Rental request"),
+        ("collection", "Collection access request"),
+    ]
+    ACTION_CHOICES = [
+        ("created", "Created"),
+        ("approved", "Approved"),
+        ("rejected", "Rejected"),
+        ("cancelled", "Cancelled"),
+    ]
+
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    request_id = models.UUIDField()
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.kind} {self.request_id} {self.action}"
+
+
+class ItemDailyStats(models.Model):
+    """Per-item activity for one local day, built by ``build_rollups``.
+
+    ``outstanding`` is the number of units on loan at the end of the day;
+    days without any activity for an item have no row.
+    """
+
+    item = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    borrows = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+    outstanding = models.PositiveIntegerField(default=0)
+    requests = models.PositiveIntegerField(default=0)
+    rejections = models.PositiveIntegerField(default=0)
+    wishlist_adds = models.PositiveIntegerField(default=0)
+    # Total length of the loans returned this day, for average loan length.
+    loan_duration = models.DurationField(default=timedelta)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["item", "day"], name="gear_daily_item_day"),
+        ]
+        indexes = [
+            models.Index(fields=["day", "item"], name="gear_daily_day_item_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.item} on {self.day}"
+
+
+class RollupState(models.Model):
+    """High-water mark of a rollup: the last complete day it has built."""
+
+    name = models.CharField(max_length=50, primary_key=True)
+    last_day = models.DateField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} through {self.last_day}"
+
+
+class SimilarityIndexFile(models.Model):
+    """The built similar-item index, shared by every web and worker process.
+
+    Processes keep a local, memory-mapped copy of the current ``version``.
+    """
+
+    name = models.CharField(max_length=50, primary_key=True)
+    version = models.PositiveIntegerField(default=0)
+    data = models.BinaryField(default=bytes)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
+
+
+class ItemRecommendation(models.Model):
+    """One of an item's top co-borrowed neighbours, built offline."""
+
+    item = models.ForeignKey(
+        Item, on_delete=models.CASCADE, related_name="recommendations"
+    )
+    neighbour = models.ForeignKey(Item, on_delete=models.CASCADE, related_name="+")
+    rank = models.PositiveSmallIntegerField()
+    score = models.FloatField()
+
+    class Meta:
+        constraints = [
+            # Also the index behind ``filter(item=...).order_by("rank")``.
+            models.UniqueConstraint(
+                fields=["item", "rank"], name="gear_recommendation_item_rank"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.item} -> {self.neighbour} ({self.score:.2f})"
+
+
+class Task(models.Model):
+    """An outbox row for a side effect run later by ``manage.py run_worker``.
+
+    Rows are written in the same transaction as the change that needs
+    them, so a side effect is queued if and only if the change commits.
+    """
+
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("running", "Running"),
+        ("failed", "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=5)
+    run_after = models.DateTimeField(default=timezone.now)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Workers only ever scan due pending rows, and reclaim running
+            # rows whose worker died; failed rows stay out of both.
+            models.Index(
+                fields=["run_after", "id"],
+                condition=Q(status="pending"),
+                name="gear_task_due_idx",
+            ),
+            models.Index(
+                fields=["locked_at"],
+                condition=Q(status="running"),
+                name="gear_task_running_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.name} ({self.status}, attempt {self.attempts})"
+
+
+class IdempotencyKey(models.Model):
+    """A client-supplied key for a POST that must not be processed twice."""
+
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="idempotency_keys"
+    )
+    key = models.CharField(max_length=64)
+    path = models.CharField(max_length=255)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    location = models.CharField(max_length=500, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "key"], name="gear_idempotency_user_key"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.key} for {self.path}"
@@ -0,0 +1,310 @@
+from django.db.models import (
+    Avg,
+    Count,
+    OuterRef,
+    Prefetch,
+    Subquery,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce
+from gear.models import (
+    DEFAULT_IMAGE,
+    CollectionItem,
+    Item,
+    ItemImage,
+    ItemReview,
+    Library,
+)
+from gear.service.collection.collection_service import CollectionService
+from gear.service.item.item_service import ItemService
+from gear.service.pagination.pagination_service import PaginationService
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+def _image_url(name):
+    return ItemImage._meta.get_field("image").storage.url(name or DEFAULT_IMAGE)
+
+
+def _first_image():
+    return Subquery(
+        ItemImage.objects.filter(item=OuterRef("pk")).order_by("pk").values("image")[:1]
+    )
+
+
+def _average_rating():
+    return Subquery(
+        ItemReview.objects.filter(item=OuterRef("pk"))
+        .order_by()
+        .values("item")
+        .annotate(average=Avg("rating"))
+        .values("average")
+    )
+
+
+def _item_count():
+    return Coalesce(
+        Subquery(
+            CollectionItem.objects.filter(collection=OuterRef("pk"))
+            .order_by()
+            .values("collection")
+            .annotate(count=Count("id"))
+            .values("count")
+        ),
+        0,
+    )
+
+
+class ApiField:
+    """A selectable field: the columns it loads, annotations, and its value."""
+
+    def __init__(self, columns=None, annotations=None, value=None):
+        self.columns = columns
+        self.annotations = annotations or {}
+        self.value = value
+
+    def bind(self, name):
+        if self.columns is None:
+            self.columns = (name,)
+        if self.value is None:
+            self.value = lambda obj: getattr(obj, name)
+        return self
+
+
+class ApiInclude:
+    """A related list expanded with one batched prefetch for the whole page."""
+
+    def __init__(self, relation, queryset, serialize):
+        self.relation = relation
+        self.queryset = queryset
+        self.serialize = serialize
+
+    def prefetch(self, name, user, is_librarian):
+        return Prefetch(
+            self.relation,
+            queryset=self.queryset(user, is_librarian),
+            to_attr=f"api_{name}",
+        )
+
+
+def _compact(obj):
+    return {"id": str(obj.id), "title": obj.title}
+
+
+def _visible_items(user, is_librarian):
+    return ItemService.get_visible_items(user, is_librarian).only("id", "title")
+
+
+def _visible_collections(user, is_librarian):
+    return CollectionService.get_visible_collections(user).only("id", "title")
+
+
+class ApiResource:
+    def __init__(self, name, queryset, fields, default_fields, includes):
+        self.name = name
+        self.queryset = queryset
+        self.fields = {name: field.bind(name) for name, field in fields.items()}
+        self.default_fields = default_fields
+        self.includes = includes
+
+
+def _timestamps():
+    return {"created_at": ApiField(), "updated_at": ApiField()}
+
+
+RESOURCES = {
+    "items": ApiResource(
+        "items",
+        queryset=ItemService.get_visible_items,
+        fields={
+            "title": ApiField(),
+            "description": ApiField(),
+            "location": ApiField(),
+            "status": ApiField(),
+            "quantity": ApiField(),
+            "available_quantity": ApiField(
+                columns=("quantity",),
+                annotations={
+                    "open_loans": ItemService.open_loans,
+                    "held": ItemService.active_holds,
+                },
+                value=lambda item: item.quantity - item.open_loans - item.held,
+            ),
+            "image": ApiField(
+                columns=(),
+                annotations={"first_image": _first_image},
+                value=lambda item: _image_url(item.first_image),
+            ),
+            "rating": ApiField(
+                columns=(),
+                annotations={"average_rating": _average_rating},
+                value=lambda item: round(item.average_rating or 0, 2),
+            ),
+            **_timestamps(),
+        },
+        default_fields=("title", "description", "location", "status", "image"),
+        includes={
+            "collections": ApiInclude("collections", _visible_collections, _compact),
+            "libraries": ApiInclude(
+                "libraries",
+                lambda user, is_librarian: Library.objects.only("id", "title"),
+                _compact,
+            ),
+            "images": ApiInclude(
+                "images",
+                lambda user, is_librarian: ItemImage.objects.order_by("pk").only(
+                    "id", "item_id", "image"
+                ),
+                lambda image: _image_url(image.image.name),
+            ),
+        },
+    ),
+    "collections": ApiResource(
+        "collections",
+        queryset=lambda user, is_librarian: CollectionService.get_visible_collections(
+            user
+        ),
+        fields={
+            "title": ApiField(),
+            "description": ApiField(),
+            "is_private": ApiField(),
+            "image": ApiField(value=lambda obj: _image_url(obj.image.name)),
+            "item_count": ApiField(
+                columns=(),
+                annotations={"api_item_count": _item_count},
+                value=lambda obj: obj.api_item_count,
+            ),
+            **_timestamps(),
+        },
+        default_fields=("title", "description", "is_private", "image"),
+        includes={
+            "items": ApiInclude("items", _visible_items, _compact),
+            "libraries": ApiInclude(
+                "libraries",
+                lambda user, is_librarian: Library.objects.only("id", "title"),
+                _compact,
+            ),
+        },
+    ),
+    "libraries": ApiResource(
+        "libraries",
+        queryset=lambda user, is_librarian: Library.objects.all(),
+        fields={
+            "title": ApiField(),
+            "description": ApiField(),
+            "image": ApiField(value=lambda obj: _image_url(obj.image.name)),
+            **_timestamps(),
+        },
+        default_fields=("title", "description", "image"),
+        includes={
+            "collections": ApiInclude("collections", _visible_collections, _compact),
+            "items": ApiInclude("items", _visible_items, _compact),
+        },
+    ),
+}
+
+
+class ApiService:
+    ORDERINGS = {"title": ("title", "id"), "popular": ("-popularity", "id")}
+    ORDERING = ORDERINGS["title"]
+
+    @staticmethod
+    def _parse_list(raw, allowed, kind, resource):
+        names = [name.strip() for name in (raw or "").split(",") if name.strip()]
+        unknown = sorted(set(names) - set(allowed))
+        if unknown:
+            raise ApiError(
+                f"Unknown {kind} for {resource}: {', '.join(unknown)}. "
+                f"Allowed: {', '.join(sorted(allowed))}."
+            )
+        return list(dict.fromkeys(names))
+
+    @staticmethod
+    def list_resource(name, user, is_librarian, params):
+        """One page of a resource restricted to ``fields=`` and ``include=``.
+
+        Only the columns and annotations the requested fields need are
+        selected, and each include costs one prefetch query per page.
+        """
+        resource = RESOURCES[name]
+        fields = (
+            ApiService._parse_list(
+                params.get("fields"), resource.fields, "fields", name
+            )
+            or resource.default_fields
+        )
+        includes = ApiService._parse_list(
+            params.get("include"), resource.includes, "include", name
+        )
+        limit = PaginationService.parse_limit(params.get("limit"))
+        sort = params.get("sort") or "title"
+        if sort not in ApiService.ORDERINGS:
+            raise ApiError(
+                f"Unknown sort for {name}: {sort}. "
+                f"Allowed: {', '.join(sorted(ApiService.ORDERINGS))}."
+            )
+        ordering = ApiService.ORDERINGS[sort]
+
+        queryset = resource.queryset(user, is_librarian)
+        columns = {"id", *(field.lstrip("-") for field in ordering)}
+        annotations = {}
+        for field_name in fields:
+            field = resource.fields[field_name]
+            columns.update(field.columns)
+            annotations.update(
+                {alias: build() for alias, build in field.annotations.items()}
+            )
+        queryset = queryset.only(*columns)
+        if annotations:
+            queryset = queryset.annotate(**annotations)
+
+        rows, next_cursor = PaginationService.keyset_page(
+            queryset, ordering, params.get("cursor"), limit
+        )
+        if includes:
+            prefetch_related_objects(
+                rows,
+                *[
+                    resource.includes[include].prefetch(include, user, is_librarian)
+                    for include in includes
+                ],
+            )
+
+        data = []
+        for obj in rows:
+            record = {"id": str(obj.id)}
+            for field_name in fields:
+                record[field_name] = resource.fields[field_name].value(obj)
+            for include in includes:
+                serialize = resource.includes[include].serialize
+                record[include] = [
+                    serialize(related) for related in getattr(obj, f"api_{include}")
+                ]
+            data.append(record)
+        return {"data": data, "next_cursor": next_cursor}
+
+    @staticmethod
+    def item_availability(item_id, user, is_librarian):
+        item = (
+            ItemService.get_visible_items(user, is_librarian)
+            .filter(pk=item_id)
+            .only("id", "quantity", "status")
+            .annotate(
+                open_loans=ItemService.open_loans(), held=ItemService.active_holds()
+            )
+            .first()
+        )
+        if item is None:
+            raise ApiError("Item not found.", status=404)
+        return {
+            "id": str(item.id),
+            "status": item.status,
+            "quantity": item.quantity,
+            "on_loan": item.open_loans,
+            "on_hold": item.held,
+            "available_quantity": item.quantity - item.open_loans - item.held,
+        }
@@ -0,0 +1,175 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+MISSING = object()
+# The shared tier: CACHE_URL's store, or the database cache; see settings.
+L2_ALIAS = "default"
+
+
+class LRUCache:
+    """A thread-safe in-process LRU whose entries expire after ``ttl`` seconds."""
+
+    def __init__(self, max_entries, ttl, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires = entry
+            if expires <= self.clock():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._entries[key] = (value, self.clock() + ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CacheMetrics:
+    FIELDS = ("l1_hits", "l2_hits", "misses", "sets", "deletes")
+
+    def __init__(self):
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def record(self, field, count=1):
+        with self._lock:
+            self._counts[field] += count
+
+    def snapshot(self):
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["l1_hits"] + counts["l2_hits"] + counts["misses"]
+        hits = counts["l1_hits"] + counts["l2_hits"]
+        counts["lookups"] = lookups
+        counts["hit_rate"] = hits / lookups if lookups else 0.0
+        return counts
+
+
+class TieredCache:
+    """A per-process LRU (L1) in front of a Django cache shared by workers (L2).
+
+    Keys carry the namespace, a code ``version`` to bump when the cached
+    shape changes, and a generation stored in L2 that ``invalidate_all``
+    increments. A delete reaches this process's L1 and L2 straight away;
+    other workers may serve their L1 copy for up to ``l1_ttl`` seconds.
+    """
+
+    instances = []
+
+    def __init__(
+        self, namespace, version=1, timeout=None, l1_entries=None, l1_ttl=None
+    ):
+        self.namespace = namespace
+        self.version = version
+        self.timeout = timeout
+        self.l1 = LRUCache(
+            l1_entries or settings.CACHE_L1_MAX_ENTRIES,
+            settings.CACHE_L1_TTL if l1_ttl is None else l1_ttl,
+        )
+        self.metrics = CacheMetrics()
+        TieredCache.instances.append(self)
+
+    @property
+    def l2(self):
+        return caches[L2_ALIAS]
+
+    def _generation_key(self):
+        return f"{self.namespace}:generation"
+
+    def generation(self):
+        key = self._generation_key()
+        generation = self.l1.get(key)
+        if generation is MISSING:
+            generation = self.l2.get(key, 0)
+            self.l1.set(key, generation)
+        return generation
+
+    def key(self, key):
+        return f"{self.namespace}:v{self.version}:g{self.generation()}:{key}"
+
+    def get(self, key, default=None):
+        full_key = self.key(key)
+        value = self.l1.get(full_key)
+        if value is not MISSING:
+            self.metrics.record("l1_hits")
+            return value
+        value = self.l2.get(full_key, MISSING)
+        if value is not MISSING:
+            self.metrics.record("l2_hits")
+            self.l1.set(full_key, value, self.timeout)
+            return value
+        self.metrics.record("misses")
+        return default
+
+    def set(self, key, value, timeout=None):
+        timeout = self.timeout if timeout is None else timeout
+        full_key = self.key(key)
+        self.l2.set(full_key, value, timeout)
+        self.l1.set(full_key, value, timeout)
+        self.metrics.record("sets")
+
+    def get_or_set(self, key, build, timeout=None):
+        """The cached value, or ``build()`` stored unless it returns None."""
+        value = self.get(key, MISSING)
+        if value is MISSING:
+            value = build()
+            if value is not None:
+                self.set(key, value, timeout)
+        return value
+
+    def delete_many(self, keys):
+        full_keys = [self.key(key) for key in keys]
+        for full_key in full_keys:
+            self.l1.delete(full_key)
+        self.l2.delete_many(full_keys)
+        self.metrics.record("deletes", len(full_keys))
+
+    def invalidate_all(self):
+        """Retire every key in the namespace by moving to a new generation."""
+        key = self._generation_key()
+        self.l2.add(key, 0, None)
+        try:
+            generation = self.l2.incr(key)
+        except ValueError:
+            # Evicted between add() and incr(); start a fresh generation.
+            generation = self.generation() + 1
+            self.l2.set(key, generation, None)
+        self.l1.clear()
+        self.l1.set(key, generation)
+
+
+class CacheService:
+    @staticmethod
+    def metrics():
+        """``{namespace: counts}`` for this process's tiered caches."""
+        return {
+            cache.namespace: cache.metrics.snapshot() for cache in TieredCache.instances
+        }
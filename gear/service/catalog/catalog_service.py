@@ -0,0 +1,400 @@
+import csv
+import io
+import json
+import os
+import zipfile
+from collections import deque
+
+from django.core.files.base import ContentFile
+from django.db import DatabaseError, transaction
+from django.forms import ValidationError
+from gear.models import Collection, CollectionItem, Item, ItemImage, Library
+from gear.service.media.media_service import MediaService
+from gear.service.membership.membership_service import PRIVATE_CONFLICT_MESSAGE
+from gear.storage import content_name, delete_many, save_once
+from gear.tasks import enqueue
+
+CATALOG_FORMATS = ("csv", "jsonl")
+ITEM_FIELDS = ("title", "description", "location", "quantity", "status")
+LIST_SEPARATOR = ";"
+AMBIGUOUS = object()
+
+
+class CatalogImportError(Exception):
+    pass
+
+
+class ImportReport:
+    """What an import created and which source lines it rejected."""
+
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.images = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.errors.append((line, message))
+
+    @property
+    def has_errors(self):
+        return bool(self.errors)
+
+
+class ImageSource:
+    """Item images looked up by file name in a directory or a zip archive.
+
+    Zip handles are opened lazily so a source can be shipped to worker
+    processes and each one opens its own.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.is_zip = bool(path) and zipfile.is_zipfile(path)
+        self._zip = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_zip"] = None
+        return state
+
+    def read(self, name):
+        if not self.path:
+            raise CatalogImportError(f"No image source given for '{name}'.")
+        name = name.replace("\\", "/").lstrip("/")
+        if ".." in name.split("/"):
+            raise CatalogImportError(f"Invalid image path '{name}'.")
+
+        if self.is_zip:
+            if self._zip is None:
+                self._zip = zipfile.ZipFile(self.path)
+            try:
+                return self._zip.read(name)
+            except KeyError:
+                raise CatalogImportError(f"Image '{name}' not found in archive.")
+
+        try:
+            with open(os.path.join(self.path, name), "rb") as f:
+                return f.read()
+        except OSError:
+            raise CatalogImportError(f"Image '{name}' not found.")
+
+
+class ImportContext:
+    """Everything a worker needs to validate rows without touching the database."""
+
+    def __init__(self, collections, libraries, image_source, storage, dry_run=False):
+        self.collections = collections
+        self.libraries = libraries
+        self.image_source = image_source
+        self.storage = storage
+        self.dry_run = dry_run
+
+
+_worker_context = None
+
+
+def _init_worker(context):
+    global _worker_context
+    _worker_context = context
+
+
+def _chunk_worker(chunk):
+    return CatalogService.process_chunk(chunk, _worker_context)
+
+
+class CatalogService:
+    CHUNK_SIZE = 1000
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def detect_format(name):
+        extension = os.path.splitext(name)[1].lower()
+        if extension == ".csv":
+            return "csv"
+        if extension in (".jsonl", ".ndjson"):
+            return "jsonl"
+        raise CatalogImportError(
+            f"Unsupported catalog file '{name}'; expected .csv or .jsonl."
+        )
+
+    @staticmethod
+    def iter_rows(stream, fmt):
+        """Yield ``(line, row)`` pairs without reading the whole file.
+
+        CSV rows are split here since quoted fields may span lines; JSONL
+        lines are passed on raw and decoded by the workers.
+        """
+        if fmt == "csv":
+            reader = csv.DictReader(stream)
+            reader.fieldnames  # consume the header so line_num starts past it
+            line = reader.line_num + 1
+            for row in reader:
+                yield line, row
+                line = reader.line_num + 1
+        else:
+            for line, text in enumerate(stream, 1):
+                if text.strip():
+                    yield line, text
+
+    @staticmethod
+    def iter_chunks(rows, size=CHUNK_SIZE):
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) >= size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    @staticmethod
+    def _lookup(objects, flag=None):
+        """Map ids and case-folded titles to ``(id, flag)``."""
+        lookup = {}
+        for obj in objects:
+            value = (obj.id, getattr(obj, flag) if flag else False)
+            lookup[str(obj.id)] = value
+            key = obj.title.strip().casefold()
+            if lookup.get(key, value) != value:
+                lookup[key] = AMBIGUOUS
+            else:
+                lookup[key] = value
+        return lookup
+
+    @staticmethod
+    def build_context(image_path=None, storage=None, dry_run=False):
+        return ImportContext(
+            collections=CatalogService._lookup(
+                Collection.objects.only("id", "title", "is_private"), "is_private"
+            ),
+            libraries=CatalogService._lookup(Library.objects.only("id", "title")),
+            image_source=ImageSource(image_path),
+            storage=storage or ItemImage._meta.get_field("image").storage,
+            dry_run=dry_run,
+        )
+
+    @staticmethod
+    def _split(value):
+        if value in (None, ""):
+            return []
+        if isinstance(value, str):
+            value = value.split(LIST_SEPARATOR)
+        if not isinstance(value, list):
+            raise CatalogImportError("Expected a list or a ';'-separated string.")
+        return [str(v).strip() for v in value if str(v).strip()]
+
+    @staticmethod
+    def _resolve(names, lookup, kind):
+        resolved = []
+        for name in names:
+            match = lookup.get(name) or lookup.get(name.casefold())
+            if match is None:
+                raise CatalogImportError(f"Unknown {kind} '{name}'.")
+            if match is AMBIGUOUS:
+                raise CatalogImportError(
+                    f"More than one {kind} is titled '{name}'; use its id."
+                )
+            resolved.append(match)
+        return resolved
+
+    @staticmethod
+    def _error_message(error):
+        if hasattr(error, "message_dict"):
+            return "; ".join(
+                f"{field}: {' '.join(messages)}"
+                for field, messages in error.message_dict.items()
+            )
+        return " ".join(getattr(error, "messages", [str(error)]))
+
+    @staticmethod
+    def clean_row(raw, context):
+        """Validate one row and store its images; raise on the first problem."""
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError as e:
+                raise CatalogImportError(f"Invalid JSON: {e}")
+        if not isinstance(raw, dict):
+            raise CatalogImportError("Each row must be an object.")
+
+        fields = {
+            name: raw[name] for name in ITEM_FIELDS if raw.get(name) not in (None, "")
+        }
+        item = Item(**fields)
+        try:
+            item.clean_fields()
+            item.clean()
+        except ValidationError as e:
+            raise CatalogImportError(CatalogService._error_message(e))
+        if item.quantity < 1:
+            raise CatalogImportError("quantity: Quantity must be at least 1.")
+
+        collections = CatalogService._resolve(
+            CatalogService._split(raw.get("collections")),
+            context.collections,
+            "collection",
+        )
+        if len(collections) > 1 and any(private for _, private in collections):
+            raise CatalogImportError(PRIVATE_CONFLICT_MESSAGE)
+        libraries = CatalogService._resolve(
+            CatalogService._split(raw.get("libraries")), context.libraries, "library"
+        )
+
+        # Deferred so web workers do not load Pillow at boot.
+        from PIL import Image, UnidentifiedImageError
+
+        images = []
+        for name in CatalogService._split(raw.get("images")):
+            data = context.image_source.read(name)
+            try:
+                with Image.open(io.BytesIO(data)) as img:
+                    img.verify()
+            except (UnidentifiedImageError, OSError, SyntaxError):
+                raise CatalogImportError(f"'{name}' is not a valid image.")
+            images.append((os.path.basename(name), data))
+
+        stored = []
+        if not context.dry_run:
+            field = ItemImage._meta.get_field("image")
+            for name, data in images:
+                content = ContentFile(data)
+                directory = os.path.dirname(field.generate_filename(None, name))
+                stored.append(
+                    save_once(
+                        context.storage,
+                        content_name(directory, name, content),
+                        content,
+                    )
+                )
+
+        return {
+            "id": item.id,
+            "fields": {name: getattr(item, name) for name in ITEM_FIELDS},
+            "images": stored,
+            "image_count": len(images),
+            "collections": [collection_id for collection_id, _ in collections],
+            "libraries": [library_id for library_id, _ in libraries],
+        }
+
+    @staticmethod
+    def process_chunk(chunk, context):
+        """Parse and validate a chunk; runs inside a worker process."""
+        valid, errors = [], []
+        for line, raw in chunk:
+            try:
+                row = CatalogService.clean_row(raw, context)
+            except CatalogImportError as e:
+                errors.append((line, str(e)))
+            else:
+                row["line"] = line
+                valid.append(row)
+        return valid, errors
+
+    @staticmethod
+    def _processed_chunks(chunks, context, workers):
+        if workers <= 1:
+            for chunk in chunks:
+                yield CatalogService.process_chunk(chunk, context)
+            return
+
+        from concurrent.futures import ProcessPoolExecutor
+
+        # Keep a bounded window of chunks in flight so a huge file is never
+        # fully buffered, and yield results in file order.
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(context,)
+        ) as pool:
+            in_flight = deque()
+            for chunk in chunks:
+                in_flight.append(pool.submit(_chunk_worker, chunk))
+                if len(in_flight) >= workers * 2:
+                    yield in_flight.popleft().result()
+            while in_flight:
+                yield in_flight.popleft().result()
+
+    @staticmethod
+    def write_chunk(rows, created_by=None):
+        """Insert a validated chunk with one bulk insert per table."""
+        batch = CatalogService.BATCH_SIZE
+        items, images, memberships, links = [], [], [], []
+        for row in rows:
+            items.append(Item(id=row["id"], created_by=created_by, **row["fields"]))
+            if row["images"]:
+                images.extend(
+                    ItemImage(item_id=row["id"], image=name) for name in row["images"]
+                )
+            else:
+                images.append(ItemImage(item_id=row["id"]))
+            memberships.extend(
+                CollectionItem(collection_id=collection_id, item_id=row["id"])
+                for collection_id in row["collections"]
+            )
+            links.extend(
+                Item.libraries.through(item_id=row["id"], library_id=library_id)
+                for library_id in row["libraries"]
+            )
+
+        with transaction.atomic():
+            Item.objects.bulk_create(items, batch_size=batch)
+            ItemImage.objects.bulk_create(images, batch_size=batch)
+            CollectionItem.objects.bulk_create(memberships, batch_size=batch)
+            Item.libraries.through.objects.bulk_create(links, batch_size=batch)
+
+    @staticmethod
+    def discard_images(rows, storage):
+        """Delete images stored for rows that were never written.
+
+        Files another row already shares are kept; anything left behind is
+        an orphan that ``gc_media`` removes later.
+        """
+        names = [name for row in rows for name in row["images"]]
+        delete_many(storage, MediaService.unreferenced(names))
+
+    @staticmethod
+    def import_catalog(
+        stream,
+        fmt,
+        image_path=None,
+        created_by=None,
+        workers=1,
+        chunk_size=CHUNK_SIZE,
+        dry_run=False,
+        storage=None,
+    ):
+        """Import items from a CSV/JSONL text stream.
+
+        Rows are validated in chunks, in ``workers`` processes when more than
+        one is requested, and each valid chunk is written with bulk inserts.
+        Invalid rows are skipped and reported by line number.
+        """
+        if fmt not in CATALOG_FORMATS:
+            raise CatalogImportError(f"Unsupported catalog format '{fmt}'.")
+
+        report = ImportReport()
+        context = CatalogService.build_context(image_path, storage, dry_run)
+        chunks = CatalogService.iter_chunks(
+            CatalogService.iter_rows(stream, fmt), chunk_size
+        )
+
+        for valid, errors in CatalogService._processed_chunks(chunks, context, workers):
+            report.rows += len(valid) + len(errors)
+            for line, message in errors:
+                report.add_error(line, message)
+            if not valid:
+                continue
+            if not dry_run:
+                try:
+                    CatalogService.write_chunk(valid, created_by)
+                except DatabaseError as e:
+                    for row in valid:
+                        report.add_error(row["line"], f"Could not be saved: {e}")
+                    CatalogService.discard_images(valid, context.storage)
+                    continue
+            report.created += len(valid)
+            report.images += sum(row["image_count"] for row in valid)
+
+        if report.created and not dry_run:
+            enqueue("build_similarity_index")
+        report.errors.sort()
+        return report
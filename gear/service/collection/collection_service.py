@@ -1,8 +1,28 @@
+from django.db import transaction
+from django.db.models import Q
 from django.forms import ValidationError
-from gear.models import Collection, CollectionItem
+from gear.models import Collection, Item
+from gear.service.membership.membership_service import MembershipService
 
 
 class CollectionService:
+    @staticmethod
+    def _sync_items(collection, items):
+        change = MembershipService.set_collection_items(collection, items)
+        if change.has_conflicts:
+            titles = dict(
+                Item.objects.filter(id__in=change.conflicts).values_list("id", "title")
+            )
+            raise ValidationError(
+                {
+                    "items": [
+                        f"{titles.get(item_id, item_id)}: {message}"
+                        for item_id, message in change.conflicts.items()
+                    ]
+                }
+            )
+        return change
+
     @staticmethod
     def create_collection(collection_data, user, image=None):
         try:
@@ -10,25 +30,47 @@ class CollectionService:
             allowed_users = collection_data.pop("allowed_users", [])
             collection_data.pop("image", None)
 
-            collection = Collection(**collection_data)
-            collection.created_by = user.userprofile
-            collection.full_clean()
-            collection.save()
+            with transaction.atomic():
+                collection = Collection(**collection_data)
+                collection.created_by = user.userprofile
+                collection.full_clean()
+                collection.save()
+
+                if allowed_users:
+                    collection.allowed_users.set(allowed_users)
 
-            if allowed_users:
-                collection.allowed_users.set(allowed_users)
+                if items:
+                    CollectionService._sync_items(collection, items)
 
-            if collection.is_private and items:
+                if image:
+                    collection.image = image
+                    collection.save()
+
+            return collection
+
+        except ValidationError as e:
+            return e
 
-                CollectionItem.objects.filter(
-                    item__in=items, collection__is_private=False
-                ).delete()
+    @staticmethod
+    def edit_collection(collection, collection_data, image=None):
+        try:
+            with transaction.atomic():
+                collection.title = collection_data["title"]
+                collection.description = collection_data["description"]
+                collection.is_private = collection_data["is_private"]
+                collection.full_clean()
+                collection.save()
 
-            if items:
-                for item in items:
-                    CollectionItem.objects.create(collection=collection, item=item)
+                CollectionService._sync_items(
+                    collection, collection_data.get("items") or []
+                )
+                collection.allowed_users.set(collection_data.get("allowed_users") or [])
 
+            # The upload stays out of the transaction. The old file's delete is
+            # queued, and the worker keeps it while this row still refers to it.
             if image:
+                if collection.image:
+                    collection.image.delete(save=False)
                 collection.image = image
                 collection.save()
 
@@ -40,3 +82,19 @@ class CollectionService:
     @staticmethod
     def get_all_collections():
         return Collection.objects.all()
+
+    @staticmethod
+    def get_visible_collections(user):
+        """Anonymous visitors only see public collections."""
+        if user.is_authenticated:
+            return Collection.objects.all()
+        return Collection.objects.filter(is_private=False)
+
+    @staticmethod
+    def search_collections(query=""):
+        collections = Collection.objects.all()
+        if query:
+            collections = collections.filter(
+                Q(title__icontains=query) | Q(description__icontains=query)
+            )
+        return collections
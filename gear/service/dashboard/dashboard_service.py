@@ -0,0 +1,165 @@
+from django.db.models import Count, Q
+from gear.models import DEFAULT_IMAGE, BorrowHistory, InventoryHold, ItemImage
+from gear.service.pagination.pagination_service import (
+    InvalidCursor,
+    PaginationService,
+)
+
+REQUEST_STATUSES = ("pending", "approved", "rejected")
+
+
+class DashboardTab:
+    """One status tab of a request dashboard: a page of rows plus its links."""
+
+    def __init__(self, status, requests, count, cursor=None, next_cursor=None):
+        self.status = status
+        self.requests = requests
+        self.count = count
+        self.cursor = cursor
+        self.next_cursor = next_cursor
+        self.next_query = None
+        self.first_query = None
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+
+class DashboardService:
+    PAGE_SIZE = 12
+    ORDERING = ("-request_date", "id")
+
+    @staticmethod
+    def status_counts(requests):
+        """Every status count plus the total in one conditional aggregate."""
+        aggregates = {
+            status: Count("id", filter=Q(status=status)) for status in REQUEST_STATUSES
+        }
+        aggregates["total"] = Count("id")
+        return requests.order_by().aggregate(**aggregates)
+
+    @staticmethod
+    def _tab_query(params, status, cursor):
+        query = params.copy()
+        query.pop("tab", None)
+        query.pop(f"{status}_cursor", None)
+        query["tab"] = status
+        if cursor:
+            query[f"{status}_cursor"] = cursor
+        return query.urlencode()
+
+    @staticmethod
+    def build_tabs(requests, params, page_size=PAGE_SIZE):
+        """Count every status at once and page each tab on its own cursor.
+
+        ``params`` is the request's GET QueryDict; each tab reads
+        ``<status>_cursor`` so moving through one tab keeps the others put.
+        A stale or tampered cursor just restarts that tab.
+        """
+        counts = DashboardService.status_counts(requests)
+        tabs = {}
+        for status in REQUEST_STATUSES:
+            cursor = params.get(f"{status}_cursor")
+            rows, next_cursor = [], None
+            if counts[status]:
+                status_requests = requests.filter(status=status)
+                try:
+                    rows, next_cursor = PaginationService.keyset_page(
+                        status_requests, DashboardService.ORDERING, cursor, page_size
+                    )
+                except InvalidCursor:
+                    cursor = None
+                    rows, next_cursor = PaginationService.keyset_page(
+                        status_requests, DashboardService.ORDERING, None, page_size
+                    )
+
+            tab = DashboardTab(status, rows, counts[status], cursor, next_cursor)
+            if next_cursor:
+                tab.next_query = DashboardService._tab_query(
+                    params, status, next_cursor
+                )
+            if cursor:
+                tab.first_query = DashboardService._tab_query(params, status, None)
+            tabs[status] = tab
+
+        return tabs, counts["total"]
+
+    @staticmethod
+    def active_tab(params):
+        tab = params.get("tab")
+        return tab if tab in REQUEST_STATUSES else "pending"
+
+    @staticmethod
+    def preload_items(rental_requests):
+        """Attach availability and cover image to each request's item in bulk.
+
+        Replaces the per-card ``available_quantity`` count and
+        ``get_first_image`` lookup with one query each for open loans,
+        active holds and images.
+        """
+        items = {request.item_id: request.item for request in rental_requests}
+        if not items:
+            return rental_requests
+
+        borrowed = dict(
+            BorrowHistory.objects.filter(item_id__in=items, returned_at__isnull=True)
+            .values("item_id")
+            .annotate(open_loans=Count("id"))
+            .values_list("item_id", "open_loans")
+        )
+
+        # Each request's own hold counts as available to it, matching
+        # ``Item.available_for_request``.
+        held, own_holds = {}, {}
+        for item_id, request_id, quantity in (
+            InventoryHold.objects.active()
+            .filter(item_id__in=items)
+            .values_list("item_id", "rental_request_id", "quantity")
+        ):
+            held[item_id] = held.get(item_id, 0) + quantity
+            own_holds[request_id] = quantity
+
+        # Matches ``Item.get_first_image``, which takes ``images.first()``.
+        first_images = {}
+        for item_id, name in (
+            ItemImage.objects.filter(item_id__in=items)
+            .order_by("item_id", "pk")
+            .values_list("item_id", "image")
+        ):
+            first_images.setdefault(item_id, name)
+
+        storage = ItemImage._meta.get_field("image").storage
+        for request in rental_requests:
+            item = items[request.item_id]
+            request.item_available_quantity = (
+                item.quantity
+                - borrowed.get(item.id, 0)
+                - held.get(item.id, 0)
+                + own_holds.get(request.id, 0)
+            )
+            request.item_image_url = storage.url(
+                first_images.get(item.id) or DEFAULT_IMAGE
+            )
+        return rental_requests
+
+    @staticmethod
+    def rental_dashboard(requests, params, page_size=PAGE_SIZE):
+        tabs, total = DashboardService.build_tabs(requests, params, page_size)
+        DashboardService.preload_items(
+            [request for tab in tabs.values() for request in tab.requests]
+        )
+        return DashboardService.context(tabs, total, params)
+
+    @staticmethod
+    def collection_dashboard(requests, params, page_size=PAGE_SIZE):
+        tabs, total = DashboardService.build_tabs(requests, params, page_size)
+        return DashboardService.context(tabs, total, params)
+
+    @staticmethod
+    def context(tabs, total, params):
+        context = {"tabs": tabs, "total_count": total}
+        for status, tab in tabs.items():
+            context[f"{status}_requests"] = tab.requests
+            context[f"{status}_count"] = tab.count
+        context["active_tab"] = DashboardService.active_tab(params)
+        return context
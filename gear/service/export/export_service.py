@@ -0,0 +1,177 @@
+import csv
+import json
+from datetime import date, datetime
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.core.serializers.json import DjangoJSONEncoder
+from gear.models import BorrowHistory, CollectionItem, Item, ItemReview, RentalRequest
+
+EXPORT_FORMATS = ("csv", "jsonl")
+
+# Column name -> values() lookup, per dataset. Item exports use the same
+# column names as import_catalog so an export can be re-imported.
+EXPORTS = {
+    "items": (
+        Item,
+        {
+            "id": "id",
+            "title": "title",
+            "description": "description",
+            "location": "location",
+            "quantity": "quantity",
+            "status": "status",
+            "identifier": "identifier",
+            "created_at": "created_at",
+            "created_by": "created_by__email",
+        },
+    ),
+    "borrow_history": (
+        BorrowHistory,
+        {
+            "id": "id",
+            "item_id": "item_id",
+            "item": "item__title",
+            "patron": "user__email",
+            "borrowed_at": "borrowed_at",
+            "returned_at": "returned_at",
+        },
+    ),
+    "rental_requests": (
+        RentalRequest,
+        {
+            "id": "id",
+            "item_id": "item_id",
+            "item": "item__title",
+            "patron": "patron__email",
+            "status": "status",
+            "quantity": "quantity",
+            "request_date": "request_date",
+            "approved_by": "approved_by__email",
+            "approved_date": "approved_date",
+        },
+    ),
+    "reviews": (
+        ItemReview,
+        {
+            "id": "id",
+            "item_id": "item_id",
+            "item": "item__title",
+            "user": "user__email",
+            "rating": "rating",
+            "comment": "comment",
+            "created_at": "created_at",
+            "updated_at": "updated_at",
+        },
+    ),
+}
+
+MEMBERSHIP_COLUMNS = ("collections", "libraries")
+
+
+class UnknownExport(Exception):
+    pass
+
+
+class _Echo:
+    """File-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+class ExportService:
+    CHUNK_SIZE = 2000
+
+    @staticmethod
+    def columns(dataset):
+        if dataset not in EXPORTS:
+            raise UnknownExport(f"Unknown export '{dataset}'.")
+        columns = list(EXPORTS[dataset][1])
+        if dataset == "items":
+            columns.extend(MEMBERSHIP_COLUMNS)
+        return columns
+
+    @staticmethod
+    def _with_membership(rows, chunk_size):
+        """Add collection/library ids to item rows, two queries per chunk."""
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                return
+            ids = [row["id"] for row in chunk]
+            collections, libraries = {}, {}
+            for item_id, collection_id in CollectionItem.objects.filter(
+                item_id__in=ids
+            ).values_list("item_id", "collection_id"):
+                collections.setdefault(item_id, []).append(str(collection_id))
+            for item_id, library_id in Item.libraries.through.objects.filter(
+                item_id__in=ids
+            ).values_list("item_id", "library_id"):
+                libraries.setdefault(item_id, []).append(str(library_id))
+
+            for row in chunk:
+                row["collections"] = collections.get(row["id"], [])
+                row["libraries"] = libraries.get(row["id"], [])
+                yield row
+
+    @staticmethod
+    def rows(dataset, chunk_size=CHUNK_SIZE):
+        """Yield export rows as dicts, holding at most one chunk in memory."""
+        if dataset not in EXPORTS:
+            raise UnknownExport(f"Unknown export '{dataset}'.")
+        model, columns = EXPORTS[dataset]
+        lookups = model.objects.order_by("pk").values_list(*columns.values())
+        rows = (
+            dict(zip(columns, values))
+            for values in lookups.iterator(chunk_size=chunk_size)
+        )
+        if dataset == "items":
+            rows = ExportService._with_membership(rows, chunk_size)
+        return rows
+
+    @staticmethod
+    def _csv_value(value):
+        if value is None:
+            return ""
+        if isinstance(value, list):
+            return ";".join(value)
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        return value
+
+    @staticmethod
+    def stream(dataset, fmt, chunk_size=CHUNK_SIZE):
+        """Yield the export as text lines, header first for CSV."""
+        if fmt not in EXPORT_FORMATS:
+            raise UnknownExport(f"Unknown export format '{fmt}'.")
+        columns = ExportService.columns(dataset)
+        rows = ExportService.rows(dataset, chunk_size)
+
+        if fmt == "csv":
+            writer = csv.writer(_Echo())
+            yield writer.writerow(columns)
+            for row in rows:
+                yield writer.writerow(
+                    [ExportService._csv_value(row[column]) for column in columns]
+                )
+        else:
+            for row in rows:
+                yield json.dumps(row, cls=DjangoJSONEncoder) + "\n"
+
+    @staticmethod
+    async def astream(dataset, fmt, chunk_size=None):
+        """``stream`` for ASGI responses, one joined chunk of lines at a time.
+
+        Django's ASGI handler would read a sync iterator to the end before
+        sending anything. Each chunk is read on the thread-sensitive sync
+        thread, so the cursor stays on one database connection.
+        """
+        chunk_size = chunk_size or ExportService.CHUNK_SIZE
+        lines = ExportService.stream(dataset, fmt, chunk_size)
+        next_chunk = sync_to_async(lambda: "".join(islice(lines, chunk_size)))
+        try:
+            while chunk := await next_chunk():
+                yield chunk
+        finally:
+            await sync_to_async(lines.close)()
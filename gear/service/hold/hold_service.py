@@ -0,0 +1,91 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Sum
+from django.utils import timezone
+from gear.models import InventoryHold, Item
+from gear.service.item.item_service import ItemService
+from gear.service.wishlist.wishlist_alert_service import WishlistAlertService
+
+
+class HoldService:
+    DEFAULT_TTL_HOURS = 48
+    SWEEP_BATCH_SIZE = 1000
+
+    @staticmethod
+    def ttl():
+        return timedelta(
+            hours=getattr(settings, "RENTAL_HOLD_HOURS", HoldService.DEFAULT_TTL_HOURS)
+        )
+
+    @staticmethod
+    def place_hold(rental_request, now=None):
+        now = now or timezone.now()
+        return InventoryHold.objects.create(
+            rental_request=rental_request,
+            item_id=rental_request.item_id,
+            quantity=rental_request.quantity,
+            expires_at=now + HoldService.ttl(),
+        )
+
+    @staticmethod
+    def release(rental_request):
+        InventoryHold.objects.filter(rental_request=rental_request).delete()
+
+    @staticmethod
+    def held_by_item(item_ids, now=None):
+        """Active held units per item id, in one grouped query."""
+        return dict(
+            InventoryHold.objects.active(now)
+            .filter(item_id__in=item_ids)
+            .order_by()
+            .values("item_id")
+            .annotate(held=Sum("quantity"))
+            .values_list("item_id", "held")
+        )
+
+    @staticmethod
+    def sweep_expired(now=None, batch_size=SWEEP_BATCH_SIZE):
+        """Delete expired holds in batches and return how many were removed.
+
+        Expired holds already stop counting against availability, but their
+        units came back without anyone being told. Each batch works out what
+        its items had free with those holds still counted and passes that to
+        the wishlist restock hook, in the transaction that deletes them.
+        """
+        now = now or timezone.now()
+        removed = 0
+        while True:
+            with transaction.atomic():
+                holds = list(
+                    InventoryHold.objects.expired(now)
+                    .order_by("expires_at")
+                    .values_list("id", "item_id", "quantity")[:batch_size]
+                )
+                if not holds:
+                    return removed
+                released = {}
+                for _, item_id, quantity in holds:
+                    released[item_id] = released.get(item_id, 0) + quantity
+                removed += InventoryHold.objects.filter(
+                    id__in=[hold_id for hold_id, _, _ in holds]
+                ).delete()[0]
+                HoldService._alert_restocked(released, now)
+
+    @staticmethod
+    def _alert_restocked(released, now):
+        """Call ``item_restocked`` for items given back ``released[item_id]`` units."""
+        items = (
+            Item.objects.filter(pk__in=released)
+            .only("id", "quantity")
+            .annotate(
+                open_loans=ItemService.open_loans(),
+                held=ItemService.active_holds(now),
+            )
+        )
+        for item in items:
+            available = item.quantity - item.open_loans - item.held
+            WishlistAlertService.item_restocked(
+                item, available - released[item.pk], available
+            )
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from gear.models import IdempotencyKey
+
+MAX_KEY_LENGTH = 64
+
+
+class IdempotencyService:
+    PRUNE_BATCH_SIZE = 1000
+
+    @staticmethod
+    def cutoff(now=None):
+        """Keys created before this have expired and count as new."""
+        now = now or timezone.now()
+        return now - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+    @staticmethod
+    def clean_key(raw):
+        key = (raw or "").strip()
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return None
+        return key
+
+    @staticmethod
+    def reserve(user_profile, key, path):
+        """Claim ``key`` for this POST.
+
+        Returns ``None`` when the key is new and the caller should do the
+        work, or the existing :class:`IdempotencyKey` when it was seen before
+        (``status_code`` is ``None`` while the first attempt is still running).
+        An expired key, including one a crashed worker never completed, is
+        claimed again as new; the conditional update lets one racer win.
+        """
+        try:
+            with transaction.atomic():
+                IdempotencyKey.objects.create(user=user_profile, key=key, path=path)
+            return None
+        except IntegrityError:
+            keys = IdempotencyKey.objects.filter(user=user_profile, key=key)
+            claimed = keys.filter(created_at__lt=IdempotencyService.cutoff()).update(
+                path=path, status_code=None, location="", created_at=timezone.now()
+            )
+            if claimed:
+                return None
+            return keys.first()
+
+    @staticmethod
+    def complete(user_profile, key, response):
+        IdempotencyKey.objects.filter(user=user_profile, key=key).update(
+            status_code=response.status_code,
+            location=response.get("Location", "")[:500],
+        )
+
+    @staticmethod
+    def release(user_profile, key):
+        IdempotencyKey.objects.filter(user=user_profile, key=key).delete()
+
+    @staticmethod
+    def prune_expired(now=None, batch_size=PRUNE_BATCH_SIZE):
+        """Delete expired keys in batches along the ``created_at`` index.
+
+        Returns how many were removed.
+        """
+        cutoff = IdempotencyService.cutoff(now)
+        removed = 0
+        while True:
+            ids = list(
+                IdempotencyKey.objects.filter(created_at__lt=cutoff)
+                .order_by("created_at")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                return removed
+            removed += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
@@ -0,0 +1,129 @@
+import copy
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Prefetch
+from gear.models import Collection, CollectionItem, Item, ItemImage
+from gear.service.cache.cache_service import TieredCache
+from gear.service.item.item_service import ItemService
+from gear.service.review.review_service import ReviewService
+
+# Bump the version when ItemDetail changes shape.
+details = TieredCache(
+    "item_detail", version=2, timeout=settings.ITEM_DETAIL_CACHE_SECONDS
+)
+
+
+class ItemDetail:
+    """Everything the item page shows, apart from the per-user strips.
+
+    ``available_quantity`` is filled in live on every request; holds lapse
+    by the clock, so it cannot be invalidated by signals like the rest.
+    """
+
+    def __init__(self, item, image_urls, collections, summary, reviews, cursor):
+        self.item = item
+        self.image_urls = image_urls
+        self.collections = collections
+        self.is_private = any(c.is_private for c in collections)
+        self.review_summary = summary
+        self.reviews = reviews
+        self.next_cursor = cursor
+        self.available_quantity = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["available_quantity"] = None
+        return state
+
+
+class ItemDetailService:
+    cache = details
+
+    @staticmethod
+    def build(item_id):
+        """Assemble the read model in five queries, or None if there is no item.
+
+        The item with its images and collections, the review summary and
+        the first page of reviews.
+        """
+        item = (
+            Item.objects.filter(pk=item_id)
+            .prefetch_related(
+                Prefetch("images", queryset=ItemImage.objects.order_by("pk")),
+                Prefetch(
+                    "collections",
+                    queryset=Collection.objects.only("id", "title", "is_private"),
+                ),
+            )
+            .first()
+        )
+        if item is None:
+            return None
+        image_urls = [image.image.url for image in item.images.all() if image.image]
+        collections = list(item.collections.all())
+        # Drop the prefetch cache so the pickled item stays small.
+        item._prefetched_objects_cache = {}
+        reviews, cursor = ReviewService.page(item)
+        return ItemDetail(
+            item,
+            image_urls,
+            collections,
+            ReviewService.summary(item),
+            list(reviews),
+            cursor,
+        )
+
+    @staticmethod
+    def available_quantity(item_id):
+        """Units free to request right now, in one query."""
+        row = (
+            Item.objects.filter(pk=item_id)
+            .annotate(
+                open_loans=ItemService.open_loans(), held=ItemService.active_holds()
+            )
+            .values_list("quantity", "open_loans", "held")
+            .first()
+        )
+        if row is None:
+            return None
+        quantity, open_loans, held = row
+        return quantity - open_loans - held
+
+    @staticmethod
+    def get(item_id):
+        """The cached read model with live availability, or None if missing."""
+        detail = details.get_or_set(
+            str(item_id), lambda: ItemDetailService.build(item_id)
+        )
+        if detail is None:
+            return None
+        available = ItemDetailService.available_quantity(item_id)
+        if available is None:
+            details.delete_many([str(item_id)])
+            return None
+        # The L1 copy is shared between threads; never mutate it.
+        detail = copy.copy(detail)
+        detail.available_quantity = available
+        return detail
+
+    @staticmethod
+    def invalidate(*item_ids):
+        """Drop cached pages now and again once the transaction commits.
+
+        The second delete catches a page rebuilt from the old rows by a
+        request that read them before the commit.
+        """
+        keys = [str(item_id) for item_id in item_ids]
+        if not keys:
+            return
+        details.delete_many(keys)
+        transaction.on_commit(lambda: details.delete_many(keys))
+
+    @staticmethod
+    def invalidate_collection(collection_id):
+        ItemDetailService.invalidate(
+            *CollectionItem.objects.filter(collection_id=collection_id).values_list(
+                "item_id", flat=True
+            )
+        )
@@ -1,5 +1,16 @@
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.forms import ValidationError
-from gear.models import Item, ItemImage, WishlistEntry
+from gear.models import (
+    BorrowHistory,
+    CollectionItem,
+    InventoryHold,
+    Item,
+    ItemImage,
+    WishlistEntry,
+)
+from gear.tasks import enqueue
 
 
 class ItemService:
@@ -21,12 +32,38 @@ class ItemService:
                     ItemImage.objects.create(item=item, image=img)
             else:
                 ItemImage.objects.create(item=item)
+            enqueue("index_similar_item", {"item_id": str(item.pk)})
 
             return item
 
         except ValidationError as e:
             return e
 
+    @staticmethod
+    def edit_item(item, item_data, images=None):
+        """Update ``item``; new images replace the old ones.
+
+        A title or description change is queued for the similar-item index.
+        """
+        text_changed = (item.title, item.description) != (
+            item_data["title"],
+            item_data["description"],
+        )
+        for field in ("title", "description", "location", "quantity"):
+            setattr(item, field, item_data[field])
+        item.save()
+
+        if images:
+            # Unchanged uploads hash to the files already stored, so they
+            # are not uploaded again; the queued deletes then skip them.
+            with transaction.atomic():
+                item.images.all().delete()
+                for image in images:
+                    item.images.create(image=image)
+        if text_changed:
+            enqueue("index_similar_item", {"item_id": str(item.pk)})
+        return item
+
     @staticmethod
     def get_all_items_not_in_collection():
         return Item.objects.exclude(collections__isnull=False)
@@ -36,6 +73,94 @@ class ItemService:
         """Get all items that are not in any private collections."""
         return Item.objects.exclude(collections__is_private=True)
 
+    @staticmethod
+    def get_visible_items(user, is_librarian=False):
+        """Items ``user`` may browse.
+
+        Items in a private collection are hidden unless the user is a
+        librarian or one of that collection's allowed users.
+        """
+        items = Item.objects.all()
+        if is_librarian:
+            return items
+
+        hidden = CollectionItem.objects.filter(
+            item=OuterRef("pk"), collection__is_private=True
+        )
+        if user.is_authenticated:
+            hidden = hidden.exclude(collection__allowed_users=user.userprofile)
+        return items.exclude(Exists(hidden))
+
+    @staticmethod
+    def open_loans():
+        """Annotation: units of the outer item currently on loan."""
+        return Coalesce(
+            Subquery(
+                BorrowHistory.objects.filter(
+                    item=OuterRef("pk"), returned_at__isnull=True
+                )
+                .order_by()
+                .values("item")
+                .annotate(open_loans=Count("id"))
+                .values("open_loans")
+            ),
+            0,
+        )
+
+    @staticmethod
+    def active_holds(now=None):
+        """Annotation: units of the outer item held for pending requests."""
+        return Coalesce(
+            Subquery(
+                InventoryHold.objects.active(now)
+                .filter(item=OuterRef("pk"))
+                .order_by()
+                .values("item")
+                .annotate(held=Sum("quantity"))
+                .values("held")
+            ),
+            0,
+        )
+
+    @staticmethod
+    def get_pickable_items(user, is_librarian=False):
+        """Items a user may put into a collection they are building."""
+        items = Item.objects.all()
+        if not is_librarian:
+            items = items.filter(
+                Exists(
+                    CollectionItem.objects.filter(
+                        item=OuterRef("pk"), collection__is_private=False
+                    )
+                )
+            )
+        return items
+
+    @staticmethod
+    def search_items(items, query=""):
+        """Filter ``items`` by title/description and annotate picker metadata."""
+        if query:
+            items = items.filter(
+                Q(title__icontains=query) | Q(description__icontains=query)
+            )
+        return items.annotate(
+            first_image=Subquery(
+                ItemImage.objects.filter(item=OuterRef("pk"))
+                .order_by("pk")
+                .values("image")[:1]
+            ),
+            in_private=Exists(
+                CollectionItem.objects.filter(
+                    item=OuterRef("pk"), collection__is_private=True
+                )
+            ),
+            in_public=Exists(
+                CollectionItem.objects.filter(
+                    item=OuterRef("pk"), collection__is_private=False
+                )
+            ),
+        )
+
     @staticmethod
     def add_to_wishlist(item, user):
         wishlist_entry, created = WishlistEntry.objects.get_or_create(
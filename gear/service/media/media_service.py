@@ -0,0 +1,159 @@
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import models
+from django.db.models import Count
+from django.utils import timezone
+from gear.models import DEFAULT_IMAGE
+from gear.storage import DELETE_BATCH_SIZE, chunked, delete_many
+
+
+class MediaReport:
+    def __init__(self):
+        self.scanned = 0
+        self.orphans = 0
+        self.deleted = 0
+        # Orphans a new row started sharing before their batch was deleted.
+        self.in_use = 0
+        self.failed = []
+
+
+class MediaService:
+    BATCH_SIZE = DELETE_BATCH_SIZE
+    # Uploads are saved before the row that references them commits; files
+    # younger than this are left alone so an in-flight upload is never lost.
+    MIN_AGE = timedelta(hours=24)
+
+    @staticmethod
+    def file_fields():
+        """Every concrete file or image column in the project."""
+        return [
+            (model, field)
+            for model in apps.get_models()
+            for field in model._meta.concrete_fields
+            if isinstance(field, models.FileField)
+        ]
+
+    @staticmethod
+    def protected_names(fields):
+        """``DEFAULT_IMAGE`` and every other field default, shared by many rows."""
+        names = {DEFAULT_IMAGE}
+        names.update(
+            field.default for _, field in fields if isinstance(field.default, str)
+        )
+        return names
+
+    @staticmethod
+    def referenced_names(fields):
+        """Names stored in any of ``fields``, streamed from the database."""
+        names = set()
+        for model, field in fields:
+            names.update(
+                model._base_manager.values_list(field.name, flat=True).iterator()
+            )
+        names.discard(None)
+        names.discard("")
+        return names
+
+    @staticmethod
+    def reference_counts(names):
+        """``{name: rows}`` across every file column, one query per column.
+
+        Content-addressed files are shared, so a file may only go once this
+        reaches zero.
+        """
+        counts = dict.fromkeys(names, 0)
+        for model, field in MediaService.file_fields():
+            for chunk in chunked(list(counts)):
+                rows = model._base_manager.filter(**{f"{field.name}__in": chunk})
+                for name, count in (
+                    rows.order_by()
+                    .values_list(field.name)
+                    .annotate(rows=Count("pk"))
+                    .values_list(field.name, "rows")
+                ):
+                    counts[name] += count
+        return counts
+
+    @staticmethod
+    def unreferenced(names):
+        """The names in ``names`` that are neither field defaults nor in use."""
+        protected = MediaService.protected_names(MediaService.file_fields())
+        names = [
+            name for name in dict.fromkeys(names) if name and name not in protected
+        ]
+        counts = MediaService.reference_counts(names)
+        return [name for name in names if not counts[name]]
+
+    @staticmethod
+    def prefixes(fields):
+        """``{storage: [prefix, ...]}`` from the fields' ``upload_to`` folders.
+
+        A field with a callable ``upload_to`` scans its whole storage.
+        """
+        by_storage = {}
+        for _, field in fields:
+            upload_to = field.upload_to if isinstance(field.upload_to, str) else ""
+            prefix = upload_to.split("%", 1)[0]
+            by_storage.setdefault(field.storage, set()).add(prefix)
+        return {
+            storage: [
+                prefix
+                for prefix in sorted(prefixes)
+                if not any(
+                    prefix != other and prefix.startswith(other) for other in prefixes
+                )
+            ]
+            for storage, prefixes in by_storage.items()
+        }
+
+    @staticmethod
+    def orphans(storage, prefixes, keep, cutoff, report):
+        """Stream names under ``prefixes`` not in ``keep`` and older than ``cutoff``."""
+        for prefix in prefixes:
+            for name, modified in storage.list_files(prefix):
+                report.scanned += 1
+                if name in keep or modified > cutoff:
+                    continue
+                report.orphans += 1
+                yield name
+
+    @staticmethod
+    def collect(dry_run=False, min_age=MIN_AGE, batch_size=BATCH_SIZE, on_orphan=None):
+        """Delete stored files that no row references, a batch at a time.
+
+        The referenced set is read before the listing starts, and uploads
+        younger than ``min_age`` are skipped. A new row can still start
+        sharing an old content-addressed file without writing it again, so
+        each batch is checked against the database once more just before
+        it is deleted.
+        """
+        fields = MediaService.file_fields()
+        keep = MediaService.referenced_names(fields) | MediaService.protected_names(
+            fields
+        )
+        cutoff = timezone.now() - min_age
+        report = MediaReport()
+
+        for storage, prefixes in MediaService.prefixes(fields).items():
+            batch = []
+            for name in MediaService.orphans(storage, prefixes, keep, cutoff, report):
+                if on_orphan is not None:
+                    on_orphan(name)
+                batch.append(name)
+                if len(batch) >= batch_size:
+                    MediaService._delete(storage, batch, dry_run, report)
+                    batch = []
+            MediaService._delete(storage, batch, dry_run, report)
+        return report
+
+    @staticmethod
+    def _delete(storage, names, dry_run, report):
+        if dry_run or not names:
+            return
+        unreferenced = MediaService.unreferenced(names)
+        report.in_use += len(names) - len(unreferenced)
+        names = unreferenced
+        failed = delete_many(storage, names)
+        report.failed.extend(failed)
+        report.deleted += len(names) - len(failed)
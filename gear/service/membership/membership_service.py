@@ -0,0 +1,98 @@
+from django.db import transaction
+from gear.models import CollectionItem
+from gear.service.item.item_detail_service import ItemDetailService
+
+PRIVATE_CONFLICT_MESSAGE = (
+    "Item already belongs to a private collection; cannot add it to another collection."
+)
+
+
+class MembershipChange:
+    """Items added, removed, claimed from public collections, or refused."""
+
+    def __init__(self, added=None, removed=None, claimed=None, conflicts=None):
+        self.added = added or set()
+        self.removed = removed or set()
+        self.claimed = claimed or set()
+        self.conflicts = conflicts or {}
+
+    @property
+    def has_conflicts(self):
+        return bool(self.conflicts)
+
+
+class MembershipService:
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def find_conflicts(collection, item_ids):
+        """Check the private/public rule for a batch of items in one query.
+
+        A private collection takes its items away from public collections, so
+        those memberships are claimable; membership in another private
+        collection is always a conflict.
+        """
+        conflicts = {}
+        claimable = set()
+        if not item_ids:
+            return conflicts, claimable
+
+        other_memberships = (
+            CollectionItem.objects.filter(item_id__in=item_ids)
+            .exclude(collection_id=collection.pk)
+            .values_list("item_id", "collection__is_private")
+        )
+        for item_id, other_is_private in other_memberships.iterator():
+            if other_is_private:
+                conflicts[item_id] = PRIVATE_CONFLICT_MESSAGE
+            elif collection.is_private:
+                claimable.add(item_id)
+
+        return conflicts, claimable - conflicts.keys()
+
+    @staticmethod
+    def set_collection_items(collection, items):
+        """Diff a saved collection's items against ``items`` and apply it in bulk.
+
+        Conflicting items are skipped and reported instead of raising.
+        """
+        item_ids = {getattr(item, "pk", item) for item in items}
+
+        with transaction.atomic():
+            existing = set(
+                CollectionItem.objects.filter(collection=collection).values_list(
+                    "item_id", flat=True
+                )
+            )
+            conflicts, claimable = MembershipService.find_conflicts(
+                collection, item_ids
+            )
+
+            wanted = item_ids - conflicts.keys()
+            to_add = wanted - existing
+            to_remove = existing - wanted
+
+            if to_remove:
+                CollectionItem.objects.filter(
+                    collection=collection, item_id__in=to_remove
+                ).delete()
+
+            if claimable:
+                CollectionItem.objects.filter(
+                    item_id__in=claimable, collection__is_private=False
+                ).exclude(collection_id=collection.pk).delete()
+
+            if to_add:
+                CollectionItem.objects.bulk_create(
+                    [
+                        CollectionItem(collection=collection, item_id=item_id)
+                        for item_id in to_add
+                    ],
+                    batch_size=MembershipService.BATCH_SIZE,
+                )
+                # bulk_create sends no post_save for the signal handlers.
+                ItemDetailService.invalidate(*to_add)
+
+        return MembershipChange(
+            added=to_add, removed=to_remove, claimed=claimable, conflicts=conflicts
+        )
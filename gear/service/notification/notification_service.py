@@ -0,0 +1,115 @@
+from collections import Counter
+
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import F, Value, prefetch_related_objects
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from gear.models import Notification
+from gear.service.pagination.pagination_service import (
+    InvalidCursor,
+    PaginationService,
+)
+from users.models import UserProfile
+
+RENTAL_KINDS = ("rental_approved", "rental_rejected")
+COLLECTION_KINDS = ("collection_approved", "collection_rejected")
+RESTOCK_KINDS = ("item_restocked",)
+
+
+class NotificationService:
+    PAGE_SIZE = 20
+    ORDERING = ("-created_at", "id")
+
+    @staticmethod
+    def notify(kind, recipients_and_targets):
+        """Write one notification per ``(recipient_id, target)`` pair.
+
+        One bulk insert for the rows, then one counter-cache UPDATE per
+        distinct number of new rows per recipient (usually just one).
+        """
+        notifications = [
+            Notification(
+                recipient_id=recipient_id,
+                kind=kind,
+                target_type=ContentType.objects.get_for_model(target),
+                target_id=str(target.pk),
+            )
+            for recipient_id, target in recipients_and_targets
+        ]
+        if not notifications:
+            return []
+
+        per_recipient = Counter(n.recipient_id for n in notifications)
+        by_count = {}
+        for recipient_id, count in per_recipient.items():
+            by_count.setdefault(count, []).append(recipient_id)
+
+        with transaction.atomic():
+            Notification.objects.bulk_create(notifications)
+            for count, recipient_ids in by_count.items():
+                UserProfile.objects.filter(id__in=recipient_ids).update(
+                    unread_notifications=F("unread_notifications") + count
+                )
+        return notifications
+
+    @staticmethod
+    def feed(user_profile, cursor=None, limit=PAGE_SIZE):
+        """One page of ``user_profile``'s notifications, newest first.
+
+        Targets are loaded with one query per target type; a bad cursor
+        restarts at the newest page.
+        """
+        notifications = Notification.objects.filter(recipient=user_profile)
+        try:
+            rows, next_cursor = PaginationService.keyset_page(
+                notifications, NotificationService.ORDERING, cursor, limit
+            )
+        except InvalidCursor:
+            rows, next_cursor = PaginationService.keyset_page(
+                notifications, NotificationService.ORDERING, None, limit
+            )
+        prefetch_related_objects(rows, "target")
+        return rows, next_cursor
+
+    @staticmethod
+    def mark_all_read(user_profile):
+        """Mark everything read with a single UPDATE and zero the counter."""
+        with transaction.atomic():
+            updated = Notification.objects.filter(
+                recipient=user_profile, read_at__isnull=True
+            ).update(read_at=timezone.now())
+            UserProfile.objects.filter(id=user_profile.id).update(
+                unread_notifications=0
+            )
+        user_profile.unread_notifications = 0
+        return updated
+
+    @staticmethod
+    def mark_read(user_profile, kinds, target=None):
+        """Mark the unread notifications of ``kinds`` read, e.g. on a tab visit.
+
+        With ``target``, only those about that object.
+        """
+        if not user_profile.unread_notifications:
+            return 0
+        unread = Notification.objects.filter(
+            recipient=user_profile, kind__in=kinds, read_at__isnull=True
+        )
+        if target is not None:
+            unread = unread.filter(
+                target_type=ContentType.objects.get_for_model(target),
+                target_id=str(target.pk),
+            )
+        with transaction.atomic():
+            updated = unread.update(read_at=timezone.now())
+            if updated:
+                UserProfile.objects.filter(id=user_profile.id).update(
+                    unread_notifications=Greatest(
+                        F("unread_notifications") - updated, Value(0)
+                    )
+                )
+        user_profile.unread_notifications = max(
+            user_profile.unread_notifications - updated, 0
+        )
+        return updated
@@ -0,0 +1,77 @@
+import base64
+import json
+from django.db.models import Q
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+class PaginationService:
+    DEFAULT_LIMIT = 20
+    MAX_LIMIT = 100
+
+    @staticmethod
+    def parse_limit(raw, default=DEFAULT_LIMIT, maximum=MAX_LIMIT):
+        try:
+            limit = int(raw)
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(limit, maximum))
+
+    @staticmethod
+    def encode_cursor(values):
+        payload = json.dumps([str(value) for value in values])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor, size):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        except (ValueError, TypeError):
+            raise InvalidCursor("Malformed cursor.")
+        if not isinstance(values, list) or len(values) != size:
+            raise InvalidCursor("Cursor does not match this listing.")
+        return values
+
+    @staticmethod
+    def _after(ordering, values):
+        """Rows strictly after ``values`` in ``ordering`` (row-value comparison)."""
+        condition = Q()
+        for position, field in enumerate(ordering):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            step = Q(**{f"{name}__{lookup}": values[position]})
+            for earlier, earlier_field in enumerate(ordering[:position]):
+                step &= Q(**{earlier_field.lstrip("-"): values[earlier]})
+            condition |= step
+        return condition
+
+    @staticmethod
+    def keyset_page(queryset, ordering, cursor=None, limit=DEFAULT_LIMIT):
+        """Return ``(rows, next_cursor)`` without OFFSET.
+
+        ``ordering`` must end in a unique column (usually ``id``) so every
+        row has a distinct position. ``rows`` may be model instances or
+        ``values()`` dicts.
+        """
+        if cursor:
+            values = PaginationService.decode_cursor(cursor, len(ordering))
+            queryset = queryset.filter(PaginationService._after(ordering, values))
+
+        rows = list(queryset.order_by(*ordering)[: limit + 1])
+        if len(rows) <= limit:
+            return rows, None
+
+        rows = rows[:limit]
+        last = rows[-1]
+        last_values = [
+            (
+                last[field.lstrip("-")]
+                if isinstance(last, dict)
+                else getattr(last, field.lstrip("-"))
+            )
+            for field in ordering
+        ]
+        return rows, PaginationService.encode_cursor(last_values)
@@ -0,0 +1,133 @@
+import math
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from gear.models import (
+    Collection,
+    CollectionItem,
+    Item,
+    ItemDailyStats,
+    ItemReview,
+    Library,
+)
+from gear.service.rollup.rollup_service import RollupService
+
+
+def _total(queryset, group, value):
+    """Correlated ``SUM(value)`` per ``group``, zero when there are no rows."""
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group).annotate(total=Sum(value)).values("total")
+        ),
+        Value(0.0),
+    )
+
+
+class PopularityService:
+    ORDERING = ("-popularity", "id")
+    BORROW_WEIGHT = 3.0
+    WISHLIST_WEIGHT = 1.0
+    # Per star, so a five-star review counts for two points.
+    REVIEW_WEIGHT = 0.4
+    # Activity older than this many half-lives adds under 0.4% and is skipped.
+    HALF_LIVES = 8
+    BATCH_SIZE = 500
+
+    @staticmethod
+    def decay(age_days, half_life_days):
+        return 0.5 ** (age_days / half_life_days)
+
+    @staticmethod
+    def item_scores(today=None):
+        """``{item_id: score}`` with each day's activity decayed by its age.
+
+        Borrows and wishlist adds come from the daily rollups, so today's
+        activity counts from tomorrow; reviews are grouped by day directly.
+        """
+        today = today or timezone.localdate()
+        half_life = settings.POPULARITY_HALF_LIFE_DAYS
+        start = today - timedelta(
+            days=math.ceil(half_life * PopularityService.HALF_LIVES)
+        )
+        scores = defaultdict(float)
+
+        daily = (
+            ItemDailyStats.objects.filter(day__gte=start, day__lt=today)
+            .values_list("item_id", "day", "borrows", "wishlist_adds")
+            .iterator()
+        )
+        for item_id, day, borrows, wishlist_adds in daily:
+            points = (
+                borrows * PopularityService.BORROW_WEIGHT
+                + wishlist_adds * PopularityService.WISHLIST_WEIGHT
+            )
+            if points:
+                scores[item_id] += points * PopularityService.decay(
+                    (today - day).days, half_life
+                )
+
+        reviews = (
+            ItemReview.objects.filter(created_at__gte=RollupService.day_start(start))
+            .annotate(
+                day=TruncDate("created_at", tzinfo=timezone.get_current_timezone())
+            )
+            .order_by()
+            .values("item_id", "day")
+            .annotate(stars=Sum("rating"))
+            .values_list("item_id", "day", "stars")
+        )
+        for item_id, day, stars in reviews:
+            scores[item_id] += (
+                stars
+                * PopularityService.REVIEW_WEIGHT
+                * PopularityService.decay(max((today - day).days, 0), half_life)
+            )
+        return scores
+
+    @staticmethod
+    def update(today=None):
+        """Refresh the stored scores; returns how many items changed.
+
+        Items are rewritten only where the score moved, in batches; each
+        collection and library total is then one correlated UPDATE.
+        """
+        RollupService.build()
+        scores = PopularityService.item_scores(today)
+        changed = [
+            Item(id=item_id, popularity=scores.get(item_id, 0.0))
+            for item_id, popularity in Item.objects.values_list(
+                "id", "popularity"
+            ).iterator()
+            if not math.isclose(popularity, scores.get(item_id, 0.0), abs_tol=1e-9)
+        ]
+
+        with transaction.atomic():
+            Item.objects.bulk_update(
+                changed, ["popularity"], batch_size=PopularityService.BATCH_SIZE
+            )
+            Collection.objects.update(
+                popularity=_total(
+                    CollectionItem.objects.filter(collection=OuterRef("pk")),
+                    "collection",
+                    "item__popularity",
+                )
+            )
+            # A library counts its own items plus its collections' totals.
+            Library.objects.update(
+                popularity=_total(
+                    Item.libraries.through.objects.filter(library=OuterRef("pk")),
+                    "library",
+                    "item__popularity",
+                )
+                + _total(
+                    Collection.libraries.through.objects.filter(library=OuterRef("pk")),
+                    "library",
+                    "collection__popularity",
+                )
+            )
+        return len(changed)
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import threading
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from gear.models import CollectionAccessRequest, RentalRequest, RequestEvent
+
+
+class RequestEventBroker:
+    """In-process pub/sub that wakes the queue streams of this process.
+
+    It only carries a wake-up; the events themselves are read from
+    ``RequestEvent`` so a stream in another process, or one that missed a
+    wake-up, catches up on its next poll.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self):
+        subscription = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self):
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for loop, event in subscribers:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's loop has closed; it unsubscribes itself.
+                pass
+
+
+broker = RequestEventBroker()
+
+
+def _rental_summary(rental):
+    return {
+        "item": rental.item.title,
+        "item_id": str(rental.item_id),
+        "patron": rental.patron.name,
+        "quantity": rental.quantity,
+        "requested_at": rental.request_date.isoformat(),
+    }
+
+
+def _collection_summary(access):
+    return {
+        "collection": access.collection.title,
+        "collection_id": str(access.collection_id),
+        "patron": access.patron.name,
+        "requested_at": access.request_date.isoformat(),
+    }
+
+
+class RequestQueueService:
+    # Fallback poll for changes made by other processes.
+    POLL_INTERVAL = 15
+    BATCH_SIZE = 100
+    RETRY_MS = 5000
+    # Event ids are taken at insert but become visible at commit, so a lower
+    # id can appear after a higher one. A stream only moves its mark past an
+    # event once it has been visible this long; a transaction still open
+    # after that is missed.
+    SETTLE_SECONDS = 10
+    # Events older than this are pruned; a stream resuming from before them
+    # just gets fresh counts.
+    RETENTION = timedelta(days=1)
+    PRUNE_BATCH_SIZE = 1000
+
+    @staticmethod
+    def record(kind, action, request_id):
+        """Log a queue change and wake local streams once it commits."""
+        RequestEvent.objects.create(kind=kind, action=action, request_id=request_id)
+        transaction.on_commit(broker.publish)
+
+    @staticmethod
+    def high_water_mark(now=None):
+        """The last event id a new stream can safely start after.
+
+        Only settled events count, so the newest few may be sent again.
+        """
+        now = now or timezone.now()
+        cutoff = now - timedelta(seconds=RequestQueueService.SETTLE_SECONDS)
+        return (
+            RequestEvent.objects.filter(created_at__lt=cutoff).aggregate(
+                last=Max("id")
+            )["last"]
+            or 0
+        )
+
+    @staticmethod
+    def pending_counts():
+        return {
+            "rental": RentalRequest.objects.filter(status="pending").count(),
+            "collection": CollectionAccessRequest.objects.filter(
+                status="pending"
+            ).count(),
+        }
+
+    @staticmethod
+    def changes_after(high_water_mark, limit=BATCH_SIZE, sent=()):
+        """Events past ``high_water_mark`` with summaries of new requests.
+
+        Events whose ids are in ``sent`` are skipped. Costs one query for
+        the events, one per request kind for the summaries, and the pending
+        counts when anything changed.
+        """
+        events = list(
+            RequestEvent.objects.filter(id__gt=high_water_mark)
+            .exclude(id__in=sent)
+            .order_by("id")[:limit]
+        )
+        if not events:
+            return [], None
+
+        created = {
+            kind: [
+                e.request_id for e in events if e.kind == kind and e.action == "created"
+            ]
+            for kind in ("rental", "collection")
+        }
+        summaries = {}
+        if created["rental"]:
+            for rental in RentalRequest.objects.filter(
+                id__in=created["rental"], status="pending"
+            ).select_related("item", "patron"):
+                summaries[rental.id] = _rental_summary(rental)
+        if created["collection"]:
+            for access in CollectionAccessRequest.objects.filter(
+                id__in=created["collection"], status="pending"
+            ).select_related("collection", "patron"):
+                summaries[access.id] = _collection_summary(access)
+
+        changes = [
+            {
+                "id": event.id,
+                "kind": event.kind,
+                "action": event.action,
+                "request_id": str(event.request_id),
+                "summary": summaries.get(event.request_id),
+            }
+            for event in events
+        ]
+        return changes, RequestQueueService.pending_counts()
+
+    @staticmethod
+    def settle(high_water_mark, sent, now):
+        """Move the mark past sent events visible for ``SETTLE_SECONDS``.
+
+        ``sent`` maps event ids above the mark to when the stream sent them
+        and loses the ids the mark passes.
+        """
+        for event_id in sorted(sent):
+            if now - sent[event_id] < RequestQueueService.SETTLE_SECONDS:
+                break
+            high_water_mark = event_id
+            del sent[event_id]
+        return high_water_mark
+
+    @staticmethod
+    def prune(now=None, batch_size=PRUNE_BATCH_SIZE):
+        """Delete events older than ``RETENTION`` in batches; returns how many."""
+        cutoff = (now or timezone.now()) - RequestQueueService.RETENTION
+        removed = 0
+        while True:
+            ids = list(
+                RequestEvent.objects.filter(created_at__lt=cutoff)
+                .order_by("id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return removed
+            removed += RequestEvent.objects.filter(id__in=ids).delete()[0]
+
+    @staticmethod
+    def format_event(name, data, event_id=None):
+        lines = []
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"event: {name}")
+        lines.append(f"data: {json.dumps(data)}")
+        return "\n".join(lines) + "\n\n"
+
+    @staticmethod
+    async def stream(high_water_mark, poll_interval=POLL_INTERVAL):
+        """Yield SSE messages for queue changes after ``high_water_mark``.
+
+        Waits on the in-process broker, falling back to a timed poll, and
+        always reads the changes themselves from the database. Events above
+        the settled mark are re-read, so one that commits late is still
+        sent; the SSE id is the settled mark, so a reconnect may repeat an
+        event but never skips one. Clients de-duplicate by event id.
+        """
+        yield f"retry: {RequestQueueService.RETRY_MS}\n\n"
+        counts = await sync_to_async(RequestQueueService.pending_counts)()
+        yield RequestQueueService.format_event("counts", counts)
+
+        loop = asyncio.get_running_loop()
+        sent = {}
+        subscription = broker.subscribe()
+        _, wake = subscription
+        try:
+            while True:
+                changes, counts = await sync_to_async(
+                    RequestQueueService.changes_after
+                )(high_water_mark, sent=list(sent))
+                for change in changes:
+                    sent[change["id"]] = loop.time()
+                high_water_mark = RequestQueueService.settle(
+                    high_water_mark, sent, loop.time()
+                )
+                for change in changes:
+                    yield RequestQueueService.format_event(
+                        "request", change, event_id=high_water_mark
+                    )
+                if counts is not None:
+                    yield RequestQueueService.format_event(
+                        "counts", counts, event_id=high_water_mark
+                    )
+                    if len(changes) == RequestQueueService.BATCH_SIZE:
+                        continue
+
+                try:
+                    await asyncio.wait_for(wake.wait(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                wake.clear()
+        finally:
+            broker.unsubscribe(subscription)
@@ -0,0 +1,49 @@
+"""Co-borrow scoring, kept free of Django so pool workers import it cheaply.
+
+Patron baskets are the rows of a sparse patron-by-item matrix ``B`` and
+postings are its columns. Scoring an item walks its posting list and the
+baskets it touches, which is row ``i`` of ``B.T @ B`` computed the way a
+CSR product does, without materialising the matrix.
+"""
+
+import heapq
+from collections import defaultdict
+
+_postings = {}
+_baskets = {}
+
+
+def init_worker(postings, baskets):
+    """Pool initializer: ship the matrix to each worker once, not per chunk."""
+    global _postings, _baskets
+    _postings = postings
+    _baskets = baskets
+
+
+def score_item(item_id, top_k, postings=None, baskets=None):
+    """Top ``top_k`` neighbours of ``item_id`` as ``(neighbour_id, score)``.
+
+    The score is the weighted share of ``item_id``'s patrons who also have
+    the neighbour, so it depends only on that item's own column and can be
+    recomputed for one item without touching the others.
+    """
+    postings = _postings if postings is None else postings
+    baskets = _baskets if baskets is None else baskets
+    weights = postings.get(item_id)
+    if not weights:
+        return []
+    norm = sum(weights.values())
+    scores = defaultdict(float)
+    for patron_id, weight in weights.items():
+        for other_id, other_weight in baskets[patron_id].items():
+            if other_id != item_id:
+                scores[other_id] += weight * other_weight
+    return heapq.nlargest(
+        top_k,
+        ((other_id, score / norm) for other_id, score in scores.items()),
+        key=lambda pair: (pair[1], str(pair[0])),
+    )
+
+
+def score_chunk(item_ids, top_k):
+    return [(item_id, score_item(item_id, top_k)) for item_id in item_ids]
@@ -0,0 +1,202 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Subquery
+from gear.models import (
+    BorrowHistory,
+    CollectionItem,
+    ItemImage,
+    ItemRecommendation,
+    RollupState,
+    WishlistEntry,
+)
+from gear.service.recommendation import co_borrow
+from gear.service.rollup.rollup_service import RollupService
+
+ROLLUP_NAME = "co_borrow"
+
+
+class RecommendationService:
+    TOP_K = 8
+    CHUNK_SIZE = 200
+    BORROW_WEIGHT = 1.0
+    WISHLIST_WEIGHT = 0.5
+
+    @staticmethod
+    def baskets(before, patron_ids=None):
+        """``{patron_id: {item_id: weight}}`` from borrows and wishlists.
+
+        A borrow outweighs a wishlist entry for the same item.
+        """
+        sources = (
+            (BorrowHistory.objects.filter(borrowed_at__lt=before), "user_id"),
+            (WishlistEntry.objects.filter(date_added__lt=before), "user_profile_id"),
+        )
+        weights = (
+            RecommendationService.BORROW_WEIGHT,
+            RecommendationService.WISHLIST_WEIGHT,
+        )
+        baskets = {}
+        for (queryset, patron_field), weight in zip(sources, weights):
+            if patron_ids is not None:
+                queryset = queryset.filter(**{f"{patron_field}__in": patron_ids})
+            rows = (
+                queryset.order_by()
+                .values_list(patron_field, "item_id")
+                .distinct()
+                .iterator()
+            )
+            for patron_id, item_id in rows:
+                basket = baskets.setdefault(patron_id, {})
+                basket[item_id] = max(basket.get(item_id, 0), weight)
+        return baskets
+
+    @staticmethod
+    def patrons_with_activity(since, before):
+        borrowers = BorrowHistory.objects.filter(
+            borrowed_at__gte=since, borrowed_at__lt=before
+        ).values_list("user_id", flat=True)
+        wishers = WishlistEntry.objects.filter(
+            date_added__gte=since, date_added__lt=before
+        ).values_list("user_profile_id", flat=True)
+        return set(borrowers) | set(wishers)
+
+    @staticmethod
+    def dirty_items(since, before):
+        """Items whose co-borrow row changed because of activity since ``since``.
+
+        A new entry in a patron's basket changes the row of every item in
+        that basket, and no other row.
+        """
+        patrons = RecommendationService.patrons_with_activity(since, before)
+        if not patrons:
+            return set()
+        baskets = RecommendationService.baskets(before, patrons)
+        return {item_id for basket in baskets.values() for item_id in basket}
+
+    @staticmethod
+    def matrix(before, item_ids=None):
+        """Postings for ``item_ids`` (every item if None) and the baskets they touch."""
+        if item_ids is None:
+            baskets = RecommendationService.baskets(before)
+        else:
+            patrons = set(
+                BorrowHistory.objects.filter(
+                    item_id__in=item_ids, borrowed_at__lt=before
+                ).values_list("user_id", flat=True)
+            ) | set(
+                WishlistEntry.objects.filter(
+                    item_id__in=item_ids, date_added__lt=before
+                ).values_list("user_profile_id", flat=True)
+            )
+            baskets = RecommendationService.baskets(before, patrons)
+
+        postings = {}
+        for patron_id, basket in baskets.items():
+            for item_id, weight in basket.items():
+                if item_ids is None or item_id in item_ids:
+                    postings.setdefault(item_id, {})[patron_id] = weight
+        return postings, baskets
+
+    @staticmethod
+    def score(
+        postings, baskets, item_ids, processes=1, top_k=TOP_K, chunk_size=CHUNK_SIZE
+    ):
+        """``{item_id: [(neighbour_id, score), ...]}`` for ``item_ids``.
+
+        With more than one process the items are scored in chunks by a
+        process pool; each worker receives the matrix once.
+        """
+        item_ids = sorted(item_ids, key=str)
+        chunks = [
+            item_ids[i : i + chunk_size] for i in range(0, len(item_ids), chunk_size)
+        ]
+        if processes > 1 and len(chunks) > 1:
+            # multiprocessing is only worth importing for a parallel build.
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(
+                max_workers=processes,
+                initializer=co_borrow.init_worker,
+                initargs=(postings, baskets),
+            ) as pool:
+                results = pool.map(co_borrow.score_chunk, chunks, [top_k] * len(chunks))
+                return {item_id: top for chunk in results for item_id, top in chunk}
+        return {
+            item_id: co_borrow.score_item(item_id, top_k, postings, baskets)
+            for item_id in item_ids
+        }
+
+    @staticmethod
+    def build(full=False, until=None, processes=1, top_k=TOP_K):
+        """Recompute the neighbours of items touched since the last build.
+
+        Activity is taken through the end of ``until`` (yesterday by
+        default) and the day is recorded as the high-water mark. ``full``
+        rebuilds every item, which also drops pairs left behind by deleted
+        wishlist entries. Returns the number of items rescored.
+        """
+        until = until or RollupService.last_complete_day()
+        before = RollupService.day_start(until + timedelta(days=1))
+        state = RollupState.objects.filter(name=ROLLUP_NAME).first()
+
+        if full or state is None:
+            item_ids = None
+        elif state.last_day >= until:
+            return 0
+        else:
+            since = RollupService.day_start(state.last_day + timedelta(days=1))
+            item_ids = RecommendationService.dirty_items(since, before)
+
+        postings, baskets = RecommendationService.matrix(before, item_ids)
+        if item_ids is None:
+            item_ids = set(postings)
+        neighbours = RecommendationService.score(
+            postings, baskets, item_ids, processes, top_k
+        )
+
+        rows = [
+            ItemRecommendation(
+                item_id=item_id, neighbour_id=neighbour_id, rank=rank, score=score
+            )
+            for item_id, top in neighbours.items()
+            for rank, (neighbour_id, score) in enumerate(top, start=1)
+        ]
+        with transaction.atomic():
+            stale = ItemRecommendation.objects.all()
+            if state is not None and not full:
+                stale = stale.filter(item_id__in=item_ids)
+            stale.delete()
+            ItemRecommendation.objects.bulk_create(rows, batch_size=1000)
+            RollupState.objects.update_or_create(
+                name=ROLLUP_NAME, defaults={"last_day": until}
+            )
+        return len(item_ids)
+
+    @staticmethod
+    def for_item(item, user, is_librarian=False, limit=TOP_K):
+        """The stored neighbours ``user`` may see, in one query."""
+        recommendations = ItemRecommendation.objects.filter(item=item)
+        if not is_librarian:
+            hidden = CollectionItem.objects.filter(
+                item=OuterRef("neighbour_id"), collection__is_private=True
+            )
+            if user.is_authenticated:
+                hidden = hidden.exclude(collection__allowed_users=user.userprofile)
+            recommendations = recommendations.exclude(Exists(hidden))
+        recommendations = (
+            recommendations.select_related("neighbour")
+            .annotate(
+                first_image=Subquery(
+                    ItemImage.objects.filter(item=OuterRef("neighbour_id"))
+                    .order_by("pk")
+                    .values("image")[:1]
+                )
+            )
+            .order_by("rank")[:limit]
+        )
+        neighbours = []
+        for recommendation in recommendations:
+            recommendation.neighbour.first_image = recommendation.first_image
+            neighbours.append(recommendation.neighbour)
+        return neighbours
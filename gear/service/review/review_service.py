@@ -0,0 +1,62 @@
+from django.db.models import Avg, Count, Q
+from gear.models import ItemReview
+from gear.service.pagination.pagination_service import PaginationService
+
+STARS = (5, 4, 3, 2, 1)
+
+
+class ReviewSummary:
+    def __init__(self, count, average, counts):
+        self.count = count
+        self.average = average
+        self.counts = counts
+
+    @property
+    def rounded(self):
+        """The average rounded to whole stars, for the star widget."""
+        return int(self.average + 0.5)
+
+    @property
+    def histogram(self):
+        """``(stars, count, percent)`` rows from five stars down to one."""
+        return [
+            (
+                stars,
+                self.counts[stars],
+                round(100 * self.counts[stars] / self.count) if self.count else 0,
+            )
+            for stars in STARS
+        ]
+
+
+class ReviewService:
+    PAGE_SIZE = 10
+    ORDERING = ("-created_at", "id")
+
+    @staticmethod
+    def summary(item):
+        """Review count, average and per-star counts in one aggregate query."""
+        per_star = {
+            f"stars_{stars}": Count("id", filter=Q(rating=stars)) for stars in STARS
+        }
+        totals = ItemReview.objects.filter(item=item).aggregate(
+            count=Count("id"), average=Avg("rating"), **per_star
+        )
+        return ReviewSummary(
+            totals["count"],
+            round(totals["average"] or 0, 2),
+            {stars: totals[f"stars_{stars}"] for stars in STARS},
+        )
+
+    @staticmethod
+    def page(item, cursor=None, limit=PAGE_SIZE):
+        """One page of reviews, newest first, with their authors joined in.
+
+        Raises ``InvalidCursor`` for a cursor this listing did not issue.
+        """
+        return PaginationService.keyset_page(
+            ItemReview.objects.filter(item=item).select_related("user"),
+            ReviewService.ORDERING,
+            cursor,
+            limit,
+        )
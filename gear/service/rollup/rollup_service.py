@@ -0,0 +1,180 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Min, Q, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from gear.models import (
+    BorrowHistory,
+    ItemDailyStats,
+    RentalRequest,
+    RollupState,
+    WishlistEntry,
+)
+
+ROLLUP_NAME = "item_daily"
+COUNTERS = ("borrows", "returns", "requests", "rejections", "wishlist_adds")
+
+
+class RollupService:
+    WINDOW_DAYS = 31
+    BATCH_SIZE = 1000
+
+    @staticmethod
+    def day_start(day):
+        return timezone.make_aware(datetime.combine(day, time.min))
+
+    @staticmethod
+    def last_complete_day():
+        return timezone.localdate() - timedelta(days=1)
+
+    @staticmethod
+    def high_water_mark():
+        state = RollupState.objects.filter(name=ROLLUP_NAME).first()
+        return state.last_day if state else None
+
+    @staticmethod
+    def first_activity_day():
+        firsts = [
+            BorrowHistory.objects.aggregate(first=Min("borrowed_at"))["first"],
+            RentalRequest.objects.aggregate(first=Min("request_date"))["first"],
+            WishlistEntry.objects.aggregate(first=Min("date_added"))["first"],
+        ]
+        firsts = [value for value in firsts if value is not None]
+        return timezone.localdate(min(firsts)) if firsts else None
+
+    @staticmethod
+    def _per_day(queryset, timestamp, value=None):
+        """``{(item_id, day): value}`` grouped on the local day of ``timestamp``."""
+        rows = (
+            queryset.annotate(
+                day=TruncDate(timestamp, tzinfo=timezone.get_current_timezone())
+            )
+            .order_by()
+            .values("item_id", "day")
+            .annotate(value=value or Count("id"))
+            .values_list("item_id", "day", "value")
+        )
+        return {(item_id, day): value for item_id, day, value in rows}
+
+    @staticmethod
+    def window_stats(start, end):
+        """Build the rows for days ``start``..``end`` with one query per metric.
+
+        Outstanding units are carried forward from the loans open when the
+        window starts, so they match borrows and returns day by day.
+        """
+        lower = RollupService.day_start(start)
+        upper = RollupService.day_start(end + timedelta(days=1))
+
+        metrics = {
+            "borrows": RollupService._per_day(
+                BorrowHistory.objects.filter(
+                    borrowed_at__gte=lower, borrowed_at__lt=upper
+                ),
+                "borrowed_at",
+            ),
+            "returns": RollupService._per_day(
+                BorrowHistory.objects.filter(
+                    returned_at__gte=lower, returned_at__lt=upper
+                ),
+                "returned_at",
+            ),
+            "requests": RollupService._per_day(
+                RentalRequest.objects.filter(
+                    request_date__gte=lower, request_date__lt=upper
+                ),
+                "request_date",
+            ),
+            "rejections": RollupService._per_day(
+                RentalRequest.objects.filter(
+                    status="rejected", approved_date__gte=lower, approved_date__lt=upper
+                ),
+                "approved_date",
+            ),
+            "wishlist_adds": RollupService._per_day(
+                WishlistEntry.objects.filter(
+                    date_added__gte=lower, date_added__lt=upper
+                ),
+                "date_added",
+            ),
+        }
+        durations = RollupService._per_day(
+            BorrowHistory.objects.filter(returned_at__gte=lower, returned_at__lt=upper),
+            "returned_at",
+            Sum(
+                ExpressionWrapper(
+                    F("returned_at") - F("borrowed_at"), output_field=DurationField()
+                )
+            ),
+        )
+        outstanding = dict(
+            BorrowHistory.objects.filter(borrowed_at__lt=lower)
+            .filter(Q(returned_at__isnull=True) | Q(returned_at__gte=lower))
+            .order_by()
+            .values("item_id")
+            .annotate(open=Count("id"))
+            .values_list("item_id", "open")
+        )
+
+        active = defaultdict(set)
+        for values in metrics.values():
+            for item_id, day in values:
+                active[day].add(item_id)
+
+        rows = []
+        day = start
+        while day <= end:
+            for item_id in active.get(day, ()):
+                key = (item_id, day)
+                counts = {name: metrics[name].get(key, 0) for name in COUNTERS}
+                outstanding[item_id] = (
+                    outstanding.get(item_id, 0) + counts["borrows"] - counts["returns"]
+                )
+                rows.append(
+                    ItemDailyStats(
+                        item_id=item_id,
+                        day=day,
+                        outstanding=max(outstanding[item_id], 0),
+                        loan_duration=durations.get(key) or timedelta(0),
+                        **counts,
+                    )
+                )
+            day += timedelta(days=1)
+        return rows
+
+    @staticmethod
+    def build(since=None, until=None, window_days=WINDOW_DAYS):
+        """Roll up every complete day after the high-water mark.
+
+        ``since`` rebuilds from that day instead. Each window is replaced
+        in one transaction and advances the mark, so an interrupted run
+        resumes where it stopped. Returns ``(days, rows)`` written.
+        """
+        until = until or RollupService.last_complete_day()
+        if since is None:
+            mark = RollupService.high_water_mark()
+            since = (
+                mark + timedelta(days=1) if mark else RollupService.first_activity_day()
+            )
+        if since is None or since > until:
+            return 0, 0
+
+        days = rows_written = 0
+        start = since
+        while start <= until:
+            end = min(start + timedelta(days=window_days - 1), until)
+            rows = RollupService.window_stats(start, end)
+            with transaction.atomic():
+                ItemDailyStats.objects.filter(day__gte=start, day__lte=end).delete()
+                ItemDailyStats.objects.bulk_create(
+                    rows, batch_size=RollupService.BATCH_SIZE
+                )
+                RollupState.objects.update_or_create(
+                    name=ROLLUP_NAME, defaults={"last_day": end}
+                )
+            days += (end - start).days + 1
+            rows_written += len(rows)
+            start = end + timedelta(days=1)
+        return days, rows_written
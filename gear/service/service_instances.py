@@ -1,7 +1,45 @@
 from .item.item_service import ItemService
 from .collection.collection_service import CollectionService
 from .library.library_service import LibraryService
+from .membership.membership_service import MembershipService
+from .pagination.pagination_service import PaginationService
+from .dashboard.dashboard_service import DashboardService
+from .catalog.catalog_service import CatalogService
+from .export.export_service import ExportService
+from .api.api_service import ApiService
+from .idempotency.idempotency_service import IdempotencyService
+from .hold.hold_service import HoldService
+from .wishlist.wishlist_alert_service import WishlistAlertService
+from .notification.notification_service import NotificationService
+from .queue.request_queue_service import RequestQueueService
+from .rollup.rollup_service import RollupService
+from .analytics.analytics_service import AnalyticsService
+from .recommendation.recommendation_service import RecommendationService
+from .similarity.similarity_service import SimilarityService
+from .popularity.popularity_service import PopularityService
+from .review.review_service import ReviewService
+from .cache.cache_service import CacheService
+from .session.session_service import SessionService
 
 _item_service = ItemService()
 _collection_service = CollectionService()
 _library_service = LibraryService()
+_membership_service = MembershipService()
+_pagination_service = PaginationService()
+_dashboard_service = DashboardService()
+_catalog_service = CatalogService()
+_export_service = ExportService()
+_api_service = ApiService()
+_idempotency_service = IdempotencyService()
+_hold_service = HoldService()
+_wishlist_alert_service = WishlistAlertService()
+_notification_service = NotificationService()
+_request_queue_service = RequestQueueService()
+_rollup_service = RollupService()
+_analytics_service = AnalyticsService()
+_recommendation_service = RecommendationService()
+_similarity_service = SimilarityService()
+_popularity_service = PopularityService()
+_review_service = ReviewService()
+_cache_service = CacheService()
+_session_service = SessionService()
@@ -0,0 +1,25 @@
+from django.contrib.sessions.models import Session
+from django.utils import timezone
+
+
+class SessionService:
+    PRUNE_BATCH_SIZE = 1000
+
+    @staticmethod
+    def prune_expired(now=None, batch_size=PRUNE_BATCH_SIZE):
+        """Delete expired sessions in batches and return how many were removed.
+
+        Unlike ``clearsessions`` this never holds one long DELETE over the
+        whole table. Cached copies expire from the cache on their own.
+        """
+        now = now or timezone.now()
+        removed = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now)
+                .order_by("expire_date")
+                .values_list("session_key", flat=True)[:batch_size]
+            )
+            if not keys:
+                return removed
+            removed += Session.objects.filter(session_key__in=keys).delete()[0]
@@ -0,0 +1,211 @@
+import glob
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import OuterRef, Subquery
+from gear.models import Item, ItemImage, SimilarityIndexFile
+from gear.service.item.item_service import ItemService
+from gear.service.similarity.tfidf_index import MappedIndex, SimilarityIndex
+
+INDEX_NAME = "similar_items"
+
+# This process's map of the index, as (version, MappedIndex), and when the
+# stored version was last checked; see SimilarityService.mapped().
+_mapped = None
+_checked_at = None
+
+
+class SimilarityService:
+    TOP_K = 8
+    # Seconds a process serves its mapped copy before checking the database
+    # for a newer version.
+    CHECK_INTERVAL = 5
+
+    @staticmethod
+    def cache_dir():
+        return settings.SIMILARITY_INDEX_CACHE_DIR
+
+    @staticmethod
+    def _local_copy(version, data):
+        """Map ``data`` from a per-host file named for its version.
+
+        Older copies are unlinked; processes that still map them keep
+        reading them until they remap.
+        """
+        directory = SimilarityService.cache_dir()
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{INDEX_NAME}-{version}.idx")
+        if not os.path.exists(path):
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix=".similar-")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    out.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+        for old in glob.glob(os.path.join(directory, f"{INDEX_NAME}-*.idx")):
+            if old != path:
+                try:
+                    os.unlink(old)
+                except FileNotFoundError:
+                    pass
+        return MappedIndex(path)
+
+    @staticmethod
+    @contextmanager
+    def _write_lock():
+        """Lock the stored index; yield its current map and a ``save(index)``.
+
+        The row lock serialises rewrites across processes and hosts; readers
+        never wait because they map a local copy.
+        """
+        global _mapped, _checked_at
+        with transaction.atomic():
+            SimilarityIndexFile.objects.get_or_create(name=INDEX_NAME)
+            stored = SimilarityIndexFile.objects.select_for_update().get(
+                name=INDEX_NAME
+            )
+            current = None
+            if stored.version:
+                current = SimilarityService._local_copy(
+                    stored.version, bytes(stored.data)
+                )
+            saved = []
+
+            def save(index):
+                # SimilarityIndex writes files, so go through a scratch one.
+                with tempfile.TemporaryDirectory() as tmp:
+                    path = os.path.join(tmp, "index")
+                    index.save(path)
+                    with open(path, "rb") as f:
+                        stored.data = f.read()
+                stored.version += 1
+                stored.save()
+                saved.append(stored.version)
+
+            yield current, save
+        if saved:
+            _mapped = (
+                stored.version,
+                SimilarityService._local_copy(stored.version, bytes(stored.data)),
+            )
+            _checked_at = time.monotonic()
+
+    @staticmethod
+    def mapped():
+        """The memory-mapped index, mapped again once it has been rewritten."""
+        global _mapped, _checked_at
+        now = time.monotonic()
+        if (
+            _checked_at is not None
+            and now - _checked_at < SimilarityService.CHECK_INTERVAL
+        ):
+            return _mapped[1] if _mapped else None
+        version = (
+            SimilarityIndexFile.objects.filter(name=INDEX_NAME, version__gt=0)
+            .values_list("version", flat=True)
+            .first()
+        )
+        _checked_at = now
+        if version is None:
+            _mapped = None
+        elif _mapped is None or _mapped[0] != version:
+            stored = SimilarityIndexFile.objects.get(name=INDEX_NAME)
+            _mapped = (
+                stored.version,
+                SimilarityService._local_copy(stored.version, bytes(stored.data)),
+            )
+        return _mapped[1] if _mapped else None
+
+    @staticmethod
+    def build(k=TOP_K):
+        """Vectorise every item and store a fresh index; returns the row count.
+
+        Items are read under the write lock, so an ``index_item`` that ran
+        meanwhile is not overwritten with what the build read before it.
+        """
+        with SimilarityService._write_lock() as (_, save):
+            documents = (
+                Item.objects.order_by("pk")
+                .values_list("id", "title", "description")
+                .iterator()
+            )
+            index = SimilarityIndex.build(documents, k)
+            save(index)
+        return len(index.ids)
+
+    @staticmethod
+    def index_item(item_id):
+        """Fold one created or edited item into the index, or drop a deleted one."""
+        with SimilarityService._write_lock() as (mapped, save):
+            document = (
+                Item.objects.filter(id=item_id)
+                .values_list("title", "description")
+                .first()
+            )
+            if document is None:
+                if mapped is not None:
+                    index = SimilarityIndex.from_mapped(mapped)
+                    if index.remove(item_id):
+                        save(index)
+                return
+            if mapped is None:
+                index = SimilarityIndex.build(
+                    Item.objects.order_by("pk").values_list(
+                        "id", "title", "description"
+                    ),
+                    SimilarityService.TOP_K,
+                )
+            else:
+                index = SimilarityIndex.from_mapped(mapped)
+                index.update(item_id, *document)
+            save(index)
+
+    @staticmethod
+    def _visible(ids, user, is_librarian, limit):
+        """Visible items among ``ids``, kept in order, in one query."""
+        items = (
+            ItemService.get_visible_items(user, is_librarian)
+            .filter(id__in=ids)
+            .annotate(
+                first_image=Subquery(
+                    ItemImage.objects.filter(item=OuterRef("pk"))
+                    .order_by("pk")
+                    .values("image")[:1]
+                )
+            )
+        )
+        by_id = {item.id: item for item in items}
+        return [by_id[i] for i in ids if i in by_id][:limit]
+
+    @staticmethod
+    def similar_items(item, user, is_librarian=False, limit=TOP_K):
+        mapped = SimilarityService.mapped()
+        if mapped is None:
+            return []
+        ids = [neighbour for neighbour, _ in mapped.neighbours(item.id)]
+        if not ids:
+            return []
+        return SimilarityService._visible(ids, user, is_librarian, limit)
+
+    @staticmethod
+    def similar_to_collection(collection, user, is_librarian=False, limit=TOP_K):
+        """Items like the collection's own, ranked by summed similarity."""
+        mapped = SimilarityService.mapped()
+        if mapped is None:
+            return []
+        members = {item.id for item in collection.items.all()}
+        scores = {}
+        for member in members:
+            for neighbour, score in mapped.neighbours(member):
+                if neighbour not in members:
+                    scores[neighbour] = scores.get(neighbour, 0) + score
+        if not scores:
+            return []
+        ids = sorted(scores, key=lambda i: (-scores[i], str(i)))
+        return SimilarityService._visible(ids, user, is_librarian, limit)
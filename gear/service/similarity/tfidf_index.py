@@ -0,0 +1,284 @@
+"""TF-IDF vectors over item text and a top-K cosine neighbour index.
+
+The index is a single file of flat native-endian arrays, so every process
+memory-maps it and shares the pages instead of holding its own copy:
+
+    header   magic, version, rows, k, vocabulary bytes, nnz
+    ids      rows x 16 bytes            item UUIDs
+    nbrs     rows x k int32             neighbour row numbers, -1 padded
+    scores   rows x k float32           cosine similarities
+    indptr   rows + 1 int32             CSR vectors, L2-normalised
+    indices  nnz int32
+    data     nnz float32
+    vocab    JSON {"terms": [...], "idf": [...]}
+
+The layout matches what ``numpy.memmap`` would read, but only the standard
+library is needed. A rewrite goes to a temporary file that replaces the
+index atomically; readers notice the new inode and map it again.
+"""
+
+import heapq
+import json
+import math
+import mmap
+import os
+import re
+import struct
+import tempfile
+import uuid
+from array import array
+from collections import Counter, defaultdict
+
+MAGIC = b"GSIM"
+VERSION = 1
+HEADER = struct.Struct("<4sIIIIQ4x")
+TITLE_WEIGHT = 2
+TOKEN = re.compile(r"[a-z0-9]+")
+STOP_WORDS = frozenset(
+    "an and are as at be by for from has in is it its of on or that the this "
+    "to was were with".split()
+)
+
+
+def tokenize(title, description=""):
+    """Term counts for an item; title words count ``TITLE_WEIGHT`` times."""
+    counts = Counter()
+    for text, weight in ((title, TITLE_WEIGHT), (description, 1)):
+        for token in TOKEN.findall((text or "").lower()):
+            if len(token) > 1 and token not in STOP_WORDS:
+                counts[token] += weight
+    return counts
+
+
+def idf(rows, document_frequency):
+    return math.log((1 + rows) / (1 + document_frequency)) + 1
+
+
+def vectorize(counts, columns, weights):
+    """Sublinear TF times IDF, L2-normalised, as ``{column: weight}``."""
+    vector = {
+        columns[term]: (1 + math.log(count)) * weights[columns[term]]
+        for term, count in counts.items()
+        if term in columns
+    }
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {column: value / norm for column, value in vector.items()} if norm else {}
+
+
+def top_neighbours(row, vector, postings, k):
+    """``(other_row, cosine)`` pairs, best first, through the inverted index."""
+    scores = defaultdict(float)
+    for column, value in vector.items():
+        for other, other_value in postings.get(column, ()):
+            if other != row:
+                scores[other] += value * other_value
+    return heapq.nlargest(k, scores.items(), key=lambda pair: (pair[1], -pair[0]))
+
+
+def _postings(vectors):
+    postings = defaultdict(list)
+    for row, vector in enumerate(vectors):
+        for column, value in vector.items():
+            postings[column].append((row, value))
+    return postings
+
+
+class SimilarityIndex:
+    """An index held in plain lists while it is being built or updated."""
+
+    def __init__(self, ids, vectors, neighbours, terms, weights, k):
+        self.ids = ids
+        self.vectors = vectors
+        self.neighbours = neighbours
+        self.terms = terms
+        self.weights = weights
+        self.k = k
+
+    @classmethod
+    def build(cls, documents, k):
+        """Index ``(item_id, title, description)`` documents from scratch."""
+        ids, counts = [], []
+        for item_id, title, description in documents:
+            ids.append(uuid.UUID(str(item_id)))
+            counts.append(tokenize(title, description))
+        frequency = Counter(term for terms in counts for term in terms)
+        terms = sorted(frequency)
+        weights = [idf(len(ids), frequency[term]) for term in terms]
+        columns = {term: column for column, term in enumerate(terms)}
+        vectors = [vectorize(c, columns, weights) for c in counts]
+        postings = _postings(vectors)
+        neighbours = [
+            top_neighbours(row, vector, postings, k)
+            for row, vector in enumerate(vectors)
+        ]
+        return cls(ids, vectors, neighbours, terms, weights, k)
+
+    def update(self, item_id, title, description):
+        """Re-vectorise one item and patch every neighbour list it affects.
+
+        IDF weights stay as they were at the last full build, apart from
+        terms seen for the first time, so other rows keep their vectors.
+        Rows that lose the item may hold fewer than ``k`` neighbours until
+        the next build.
+        """
+        item_id = uuid.UUID(str(item_id))
+        counts = tokenize(title, description)
+        columns = {term: column for column, term in enumerate(self.terms)}
+        for term in counts:
+            if term not in columns:
+                columns[term] = len(self.terms)
+                self.terms.append(term)
+                self.weights.append(idf(len(self.ids) + 1, 1))
+        vector = vectorize(counts, columns, self.weights)
+
+        try:
+            row = self.ids.index(item_id)
+            self.vectors[row] = vector
+        except ValueError:
+            row = len(self.ids)
+            self.ids.append(item_id)
+            self.vectors.append(vector)
+            self.neighbours.append([])
+
+        ranked = top_neighbours(row, vector, _postings(self.vectors), len(self.ids))
+        self.neighbours[row] = ranked[: self.k]
+        similarity = dict(ranked)
+        for other, pairs in enumerate(self.neighbours):
+            if other == row:
+                continue
+            pairs = [pair for pair in pairs if pair[0] != row]
+            score = similarity.get(other)
+            if score:
+                pairs.append((row, score))
+                pairs = heapq.nlargest(
+                    self.k, pairs, key=lambda pair: (pair[1], -pair[0])
+                )
+            self.neighbours[other] = pairs
+
+    def remove(self, item_id):
+        """Drop an item and refill the neighbour lists that held it.
+
+        Returns False when the item is not in the index.
+        """
+        try:
+            row = self.ids.index(uuid.UUID(str(item_id)))
+        except ValueError:
+            return False
+        del self.ids[row], self.vectors[row], self.neighbours[row]
+        postings = None
+        for other, pairs in enumerate(self.neighbours):
+            if any(pair[0] == row for pair in pairs):
+                if postings is None:
+                    postings = _postings(self.vectors)
+                self.neighbours[other] = top_neighbours(
+                    other, self.vectors[other], postings, self.k
+                )
+            else:
+                self.neighbours[other] = [
+                    (o - 1 if o > row else o, score) for o, score in pairs
+                ]
+        return True
+
+    @classmethod
+    def from_mapped(cls, mapped):
+        ids = [mapped.item_id(row) for row in range(mapped.rows)]
+        vectors = [mapped.vector(row) for row in range(mapped.rows)]
+        neighbours = [list(mapped.neighbour_rows(row)) for row in range(mapped.rows)]
+        vocab = mapped.vocabulary()
+        return cls(ids, vectors, neighbours, vocab["terms"], vocab["idf"], mapped.k)
+
+    def save(self, path):
+        rows, k = len(self.ids), self.k
+        nbrs, scores = array("i", [-1] * rows * k), array("f", [0.0] * rows * k)
+        for row, pairs in enumerate(self.neighbours):
+            for slot, (other, score) in enumerate(pairs[:k]):
+                nbrs[row * k + slot] = other
+                scores[row * k + slot] = score
+        indptr, indices, data = array("i", [0]), array("i"), array("f")
+        for vector in self.vectors:
+            for column in sorted(vector):
+                indices.append(column)
+                data.append(vector[column])
+            indptr.append(len(indices))
+        vocab = json.dumps({"terms": self.terms, "idf": self.weights}).encode()
+
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".similar-")
+        try:
+            with os.fdopen(fd, "wb") as out:
+                out.write(HEADER.pack(MAGIC, VERSION, rows, k, len(vocab), len(data)))
+                out.write(b"".join(uuid.UUID(str(i)).bytes for i in self.ids))
+                for values in (nbrs, scores, indptr, indices, data):
+                    out.write(values.tobytes())
+                out.write(vocab)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+class MappedIndex:
+    """Read-only, zero-copy view of an index file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.rows, self.k, vocab_size, nnz = HEADER.unpack_from(
+            self._map
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a similarity index.")
+        view = memoryview(self._map)
+        offset = HEADER.size
+        self._ids = view[offset : offset + self.rows * 16]
+        offset += self.rows * 16
+        sections = {}
+        for name, code, length in (
+            ("nbrs", "i", self.rows * self.k),
+            ("scores", "f", self.rows * self.k),
+            ("indptr", "i", self.rows + 1),
+            ("indices", "i", nnz),
+            ("data", "f", nnz),
+        ):
+            sections[name] = view[offset : offset + length * 4].cast(code)
+            offset += length * 4
+        self._nbrs = sections["nbrs"]
+        self._scores = sections["scores"]
+        self._indptr = sections["indptr"]
+        self._indices = sections["indices"]
+        self._data = sections["data"]
+        self._vocab = view[offset : offset + vocab_size]
+        self._rows_by_id = None
+
+    def item_id(self, row):
+        return uuid.UUID(bytes=bytes(self._ids[row * 16 : row * 16 + 16]))
+
+    def row_of(self, item_id):
+        if self._rows_by_id is None:
+            self._rows_by_id = {self.item_id(row): row for row in range(self.rows)}
+        return self._rows_by_id.get(uuid.UUID(str(item_id)))
+
+    def neighbour_rows(self, row):
+        start = row * self.k
+        for slot in range(start, start + self.k):
+            other = self._nbrs[slot]
+            if other < 0:
+                return
+            yield other, self._scores[slot]
+
+    def neighbours(self, item_id):
+        """``(neighbour_id, score)`` pairs for ``item_id``, best first."""
+        row = self.row_of(item_id)
+        if row is None:
+            return []
+        return [(self.item_id(o), s) for o, s in self.neighbour_rows(row)]
+
+    def vector(self, row):
+        start, end = self._indptr[row], self._indptr[row + 1]
+        return dict(zip(self._indices[start:end], self._data[start:end]))
+
+    def vocabulary(self):
+        return json.loads(bytes(self._vocab))
@@ -0,0 +1,130 @@
+import json
+import os
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+# The application the Procfile serves.
+APPLICATION = "gearup.asgi"
+
+# Run in a fresh interpreter: import the ASGI application the way a worker
+# does, then serve one request through it.
+CHILD = """
+import asyncio, importlib, json, sys, time
+started = time.perf_counter()
+application = importlib.import_module(sys.argv[1]).application
+booted = time.perf_counter()
+path, host = sys.argv[2], sys.argv[3]
+scope = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": path,
+    "raw_path": path.encode(),
+    "query_string": b"",
+    "root_path": "",
+    "headers": [(b"host", host.encode())],
+    "client": ("127.0.0.1", 0),
+    "server": (host, 80),
+}
+messages = []
+async def receive():
+    return {"type": "http.request", "body": b"", "more_body": False}
+async def send(message):
+    messages.append(message)
+asyncio.run(application(scope, receive, send))
+done = time.perf_counter()
+print(json.dumps({
+    "boot_ms": (booted - started) * 1000,
+    "first_response_ms": (done - booted) * 1000,
+    "status": messages[0]["status"],
+    "modules": sorted(sys.modules),
+}))
+"""
+
+
+class ImportCost:
+    def __init__(self, module, self_us, cumulative_us, depth):
+        self.module = module
+        self.self_us = self_us
+        self.cumulative_us = cumulative_us
+        self.depth = depth
+
+
+class StartupProfile:
+    def __init__(self, imports, boot_ms, first_response_ms, status, modules):
+        self.imports = imports
+        self.boot_ms = boot_ms
+        self.first_response_ms = first_response_ms
+        self.status = status
+        self.modules = set(modules)
+
+    @property
+    def total_ms(self):
+        return self.boot_ms + self.first_response_ms
+
+    @property
+    def import_ms(self):
+        return sum(cost.self_us for cost in self.imports) / 1000
+
+    def slowest(self, limit):
+        """The ``limit`` imports with the highest cumulative time."""
+        return sorted(self.imports, key=lambda cost: -cost.cumulative_us)[:limit]
+
+    def by_package(self, limit):
+        """``(package, ms)`` summing each top-level package's own import time."""
+        totals = defaultdict(int)
+        for cost in self.imports:
+            totals[cost.module.split(".", 1)[0]] += cost.self_us
+        ranked = sorted(totals.items(), key=lambda pair: -pair[1])[:limit]
+        return [(package, us / 1000) for package, us in ranked]
+
+
+class StartupService:
+    @staticmethod
+    def parse_importtime(output):
+        """``ImportCost`` rows from ``python -X importtime`` stderr."""
+        imports = []
+        for line in output.splitlines():
+            match = IMPORT_LINE.match(line)
+            if match:
+                self_us, cumulative_us, indent, module = match.groups()
+                imports.append(
+                    ImportCost(
+                        module, int(self_us), int(cumulative_us), len(indent) // 2
+                    )
+                )
+        return imports
+
+    @staticmethod
+    def profile(path="/", host="localhost", env=None, application=APPLICATION):
+        """Boot a fresh interpreter with ``-X importtime`` and request ``path``.
+
+        The child imports ``application`` (a module with an ASGI
+        ``application``) and uses this process's settings module and
+        environment. Raises ``RuntimeError`` with the child's stderr if it
+        fails.
+        """
+        env = dict(os.environ if env is None else env)
+        env.setdefault("DJANGO_SETTINGS_MODULE", os.environ["DJANGO_SETTINGS_MODULE"])
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD, application, path, host],
+            capture_output=True,
+            text=True,
+            env=env,
+        )
+        if result.returncode != 0:
+            raise RuntimeError(result.stderr.strip().splitlines()[-1])
+        timings = json.loads(result.stdout.strip().splitlines()[-1])
+        return StartupProfile(
+            StartupService.parse_importtime(result.stderr),
+            timings["boot_ms"],
+            timings["first_response_ms"],
+            timings["status"],
+            timings["modules"],
+        )
@@ -0,0 +1,140 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from gear import tasks
+from gear.models import Task
+
+
+class TaskResult:
+    def __init__(self, task, error=None):
+        self.task = task
+        self.error = error
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class TaskService:
+    BATCH_SIZE = 20
+    BACKOFF_SECONDS = 10
+    MAX_BACKOFF_SECONDS = 3600
+    # A running task whose worker has not finished it in this long is
+    # assumed dead and handed out again.
+    LEASE = timedelta(minutes=10)
+
+    @staticmethod
+    def backoff(attempts):
+        return timedelta(
+            seconds=min(
+                TaskService.BACKOFF_SECONDS * 2 ** max(attempts - 1, 0),
+                TaskService.MAX_BACKOFF_SECONDS,
+            )
+        )
+
+    @staticmethod
+    def claim(batch_size=BATCH_SIZE, now=None):
+        """Lock and mark up to ``batch_size`` due tasks as running.
+
+        ``skip_locked`` lets several workers claim side by side without
+        waiting on each other's rows.
+        """
+        now = now or timezone.now()
+        due = Q(status="pending", run_after__lte=now) | Q(
+            status="running", locked_at__lt=now - TaskService.LEASE
+        )
+        with transaction.atomic():
+            ids = list(
+                Task.objects.select_for_update(skip_locked=True)
+                .filter(due)
+                .order_by("run_after", "id")
+                .values_list("id", flat=True)[:batch_size]
+            )
+            if not ids:
+                return []
+            Task.objects.filter(id__in=ids).update(
+                status="running", locked_at=now, attempts=F("attempts") + 1
+            )
+        return list(Task.objects.filter(id__in=ids).order_by("run_after", "id"))
+
+    @staticmethod
+    def execute(task):
+        handler = tasks.HANDLERS.get(task.name)
+        if handler is None:
+            return TaskResult(task, f"No task handler registered for '{task.name}'.")
+        try:
+            handler(**task.payload)
+        except Exception as e:
+            return TaskResult(task, f"{type(e).__name__}: {e}")
+        return TaskResult(task)
+
+    @staticmethod
+    def _execute_in_thread(task):
+        # Pool threads hold their own connections; recycle them the way a
+        # request does so a long-running worker never keeps a stale one.
+        close_old_connections()
+        try:
+            return TaskService.execute(task)
+        finally:
+            close_old_connections()
+
+    @staticmethod
+    def record(results, now=None):
+        """Delete finished tasks and reschedule or fail the rest."""
+        now = now or timezone.now()
+        done = [result.task.id for result in results if result.ok]
+        if done:
+            Task.objects.filter(id__in=done).delete()
+        for result in results:
+            if result.ok:
+                continue
+            task = result.task
+            if task.attempts >= task.max_attempts:
+                fields = {"status": "failed"}
+            else:
+                fields = {
+                    "status": "pending",
+                    "run_after": now + TaskService.backoff(task.attempts),
+                }
+            Task.objects.filter(id=task.id).update(
+                locked_at=None, last_error=result.error, **fields
+            )
+
+    @staticmethod
+    def run_batch(batch_size=BATCH_SIZE, pool=None):
+        """Claim one batch, run it, record the outcome; return the results.
+
+        With a thread pool the handlers run concurrently; without one they
+        run in the calling thread.
+        """
+        claimed = TaskService.claim(batch_size)
+        if not claimed:
+            return []
+        if pool is None:
+            results = [TaskService.execute(task) for task in claimed]
+        else:
+            results = list(pool.map(TaskService._execute_in_thread, claimed))
+        TaskService.record(results)
+        return results
+
+    @staticmethod
+    def run_until_empty(threads=1, batch_size=BATCH_SIZE):
+        """Drain every due task; returns ``(succeeded, failed)`` counts."""
+        succeeded = failed = 0
+        pool = ThreadPoolExecutor(max_workers=threads) if threads > 1 else None
+        try:
+            while True:
+                results = TaskService.run_batch(batch_size, pool)
+                if not results:
+                    return succeeded, failed
+                for result in results:
+                    if result.ok:
+                        succeeded += 1
+                    else:
+                        failed += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
@@ -0,0 +1,113 @@
+import uuid
+from datetime import timedelta
+from itertools import islice
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, Q
+from django.utils import timezone
+from gear.models import Item, Notification, WishlistEntry
+from gear.service.notification.notification_service import (
+    RESTOCK_KINDS,
+    NotificationService,
+)
+from gear.tasks import enqueue
+
+RESTOCKED = "item_restocked"
+
+
+class WishlistAlertService:
+    """Restock alerts for wishlisted items, sent as ``item_restocked`` notifications."""
+
+    BATCH_SIZE = 500
+    # A patron gets at most this many restock alerts per window, however
+    # many of their wishlisted items come back.
+    ALERTS_PER_WINDOW = 5
+    WINDOW = timedelta(days=1)
+
+    @staticmethod
+    def item_restocked(item, available_before, available_after):
+        """Event hook for returns and released holds.
+
+        Queues the wishlister fan-out as an outbox task, and only when
+        ``item`` goes from nothing available to something available, so
+        routine returns of stocked items cost no queries here.
+        """
+        if available_before > 0 or available_after <= 0:
+            return False
+        enqueue("alert_wishlisters", {"item_id": str(item.pk)})
+        return True
+
+    @staticmethod
+    def alert_wishlisters(item_id, now=None):
+        """Notify every patron who wishlisted the item.
+
+        Patrons are read with one query on the (item, user_profile) index
+        and notified in batches. Patrons over the rate limit, or who still
+        have an unread alert for the item, are skipped. Returns how many
+        patrons were notified.
+        """
+        now = now or timezone.now()
+        item = Item.objects.filter(pk=item_id).only("pk").first()
+        if item is None:
+            return 0
+        patrons = (
+            WishlistEntry.objects.filter(item_id=item_id)
+            .values_list("user_profile_id", flat=True)
+            .iterator(chunk_size=WishlistAlertService.BATCH_SIZE)
+        )
+        queued = 0
+        while True:
+            batch = list(islice(patrons, WishlistAlertService.BATCH_SIZE))
+            if not batch:
+                return queued
+            skipped = WishlistAlertService._skipped(batch, item, now)
+            alerts = NotificationService.notify(
+                RESTOCKED,
+                [(patron_id, item) for patron_id in batch if patron_id not in skipped],
+            )
+            queued += len(alerts)
+
+    @staticmethod
+    def _skipped(patron_ids, item, now):
+        """Patrons over the rate limit or with an unread alert for ``item``."""
+        pending = Q(
+            target_type=ContentType.objects.get_for_model(item),
+            target_id=str(item.pk),
+            read_at__isnull=True,
+        )
+        return {
+            row["recipient_id"]
+            for row in Notification.objects.filter(
+                recipient_id__in=patron_ids,
+                kind=RESTOCKED,
+            )
+            .filter(Q(created_at__gte=now - WishlistAlertService.WINDOW) | pending)
+            .order_by()
+            .values("recipient_id")
+            .annotate(
+                sent=Count(
+                    "id", filter=Q(created_at__gte=now - WishlistAlertService.WINDOW)
+                ),
+                pending=Count("id", filter=pending),
+            )
+            if row["sent"] >= WishlistAlertService.ALERTS_PER_WINDOW
+            or row["pending"]
+        }
+
+    @staticmethod
+    def dismiss(user_profile, item):
+        """Mark ``user_profile``'s alert for ``item`` read, e.g. once they have it."""
+        return NotificationService.mark_read(user_profile, RESTOCK_KINDS, target=item)
+
+    @staticmethod
+    def take_unseen(user_profile):
+        """Item ids with unread restock alerts; marks them all read."""
+        if not user_profile.unread_notifications:
+            return set()
+        target_ids = Notification.objects.filter(
+            recipient=user_profile, kind=RESTOCKED, read_at__isnull=True
+        ).values_list("target_id", flat=True)
+        item_ids = {uuid.UUID(target_id) for target_id in target_ids}
+        if item_ids:
+            NotificationService.mark_read(user_profile, RESTOCK_KINDS)
+        return item_ids
@@ -0,0 +1,53 @@
+"""Invalidate cached item pages when the rows they were built from change,
+and drop deleted items from the similar-item index.
+
+Connected in ``GearConfig.ready``. Bulk inserts send no signals, so the
+services that use them invalidate explicitly.
+"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+from gear.models import Collection, CollectionItem, Item, ItemImage, ItemReview
+from gear.service.item.item_detail_service import ItemDetailService
+from gear.tasks import enqueue
+
+
+@receiver(post_save, sender=Item)
+@receiver(post_delete, sender=Item)
+def item_changed(sender, instance, **kwargs):
+    ItemDetailService.invalidate(instance.pk)
+
+
+@receiver(post_delete, sender=Item)
+def item_deleted(sender, instance, **kwargs):
+    # The task finds the item gone and removes its row from the index.
+    enqueue("index_similar_item", {"item_id": str(instance.pk)})
+
+
+@receiver(post_save, sender=ItemImage)
+@receiver(post_delete, sender=ItemImage)
+@receiver(post_save, sender=ItemReview)
+@receiver(post_delete, sender=ItemReview)
+@receiver(post_save, sender=CollectionItem)
+@receiver(post_delete, sender=CollectionItem)
+def item_part_changed(sender, instance, **kwargs):
+    ItemDetailService.invalidate(instance.item_id)
+
+
+@receiver(m2m_changed, sender=Item.collections.through)
+def item_collections_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            ItemDetailService.invalidate(instance.pk)
+    elif action == "pre_clear":
+        # A cleared collection's items are only known before the rows go.
+        ItemDetailService.invalidate_collection(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        ItemDetailService.invalidate(*pk_set)
+
+
+@receiver(post_save, sender=Collection)
+def collection_changed(sender, instance, created, **kwargs):
+    """A renamed or re-scoped collection shows differently on its items."""
+    if not created:
+        ItemDetailService.invalidate_collection(instance.pk)
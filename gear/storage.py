@@ -0,0 +1,102 @@
+"""Media storages that can delete many files in one call.
+
+``delete_many(names)`` removes what it can and returns the names it could
+not delete, so the outbox task that called it can fail and be retried.
+Deleting a missing file counts as success, which makes retries safe.
+
+``list_files(prefix)`` streams ``(name, modified)`` pairs a page at a time
+instead of building the whole listing first.
+
+Uploads are stored under the SHA-256 of their bytes (see ``content_name``),
+so identical images share one file.
+
+The S3 storage lives in ``gear.s3_storage`` so that importing the models
+does not import boto3; Django loads it on first use of ``default_storage``.
+"""
+
+import hashlib
+import os
+from datetime import datetime, timezone
+
+from django.core.files.storage import FileSystemStorage
+
+# S3 DeleteObjects accepts at most this many keys per request.
+DELETE_BATCH_SIZE = 1000
+
+
+def chunked(names, size=DELETE_BATCH_SIZE):
+    for start in range(0, len(names), size):
+        yield names[start : start + size]
+
+
+def content_name(directory, filename, content):
+    """``<directory>/<aa>/<sha256><ext>`` for ``content``, hashed chunk by chunk."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    hexdigest = digest.hexdigest()
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{directory.rstrip('/')}/{hexdigest[:2]}/{hexdigest}{extension}"
+
+
+def save_once(storage, name, content, max_length=None):
+    """Upload ``content`` unless a content-addressed ``name`` is already stored."""
+    if storage.exists(name):
+        return name
+    saved = storage.save(name, content, max_length=max_length)
+    if saved != name:
+        # Another upload of the same bytes won the race and the storage
+        # picked a new name; keep the shared copy instead.
+        storage.delete(saved)
+    return name
+
+
+def delete_many(storage, names):
+    """Delete ``names`` from ``storage`` in batches where it supports them."""
+    names = list(dict.fromkeys(name for name in names if name))
+    if not names:
+        return []
+    if hasattr(storage, "delete_many"):
+        return storage.delete_many(names)
+    failed = []
+    for name in names:
+        try:
+            storage.delete(name)
+        except Exception:
+            failed.append(name)
+    return failed
+
+
+class LocalMediaStorage(FileSystemStorage):
+    """Filesystem stand-in for ``S3MediaStorage`` in tests and development.
+
+    Records each batch it is asked to delete in ``delete_batches``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.delete_batches = []
+
+    def delete_many(self, names):
+        failed = []
+        for chunk in chunked(names):
+            self.delete_batches.append(list(chunk))
+            for name in chunk:
+                try:
+                    self.delete(name)
+                except OSError:
+                    failed.append(name)
+        return failed
+
+    def list_files(self, prefix=""):
+        top = self.path(prefix)
+        for directory, _, files in os.walk(top):
+            for filename in sorted(files):
+                path = os.path.join(directory, filename)
+                modified = datetime.fromtimestamp(
+                    os.path.getmtime(path), tz=timezone.utc
+                )
+                yield os.path.relpath(path, self.location).replace(
+                    os.sep, "/"
+                ), modified
@@ -0,0 +1,91 @@
+"""Outbox tasks: side effects queued with a database row and run by a worker.
+
+Call :func:`enqueue` inside the transaction that makes the change; the
+task row commits or rolls back with it. ``manage.py run_worker`` claims due
+rows and runs the registered handler with the row's payload.
+"""
+
+import time
+from datetime import timedelta
+
+from django.utils import timezone
+from gear.models import ItemImage, Task
+
+HANDLERS = {}
+
+
+class UnknownTask(Exception):
+    pass
+
+
+def task(name):
+    """Register ``func`` as the handler for tasks called ``name``."""
+
+    def decorator(func):
+        HANDLERS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(name, payload=None, delay=None, max_attempts=None):
+    if name not in HANDLERS:
+        raise UnknownTask(f"No task handler registered for '{name}'.")
+    fields = {"name": name, "payload": payload or {}}
+    if delay:
+        fields["run_after"] = timezone.now() + timedelta(seconds=delay)
+    if max_attempts:
+        fields["max_attempts"] = max_attempts
+    return Task.objects.create(**fields)
+
+
+class FileDeleteError(Exception):
+    pass
+
+
+@task("delete_files")
+def delete_files(names):
+    """Remove files from the image storage that no row references any more.
+
+    The shared default image and files reused by other rows are kept.
+    Files go in batched requests. If any are left the task fails and the
+    worker retries it with backoff; files already gone count as deleted.
+    """
+    from gear.service.media.media_service import MediaService
+    from gear.storage import delete_many
+
+    storage = ItemImage._meta.get_field("image").storage
+    failed = delete_many(storage, MediaService.unreferenced(names))
+    if failed:
+        raise FileDeleteError(
+            f"Could not delete {len(failed)} of {len(names)} files, "
+            f"starting with {failed[0]!r}."
+        )
+
+
+@task("alert_wishlisters")
+def alert_wishlisters(item_id):
+    from gear.service.wishlist.wishlist_alert_service import WishlistAlertService
+
+    WishlistAlertService.alert_wishlisters(item_id)
+
+
+@task("index_similar_item")
+def index_similar_item(item_id):
+    from gear.service.similarity.similarity_service import SimilarityService
+
+    SimilarityService.index_item(item_id)
+
+
+@task("build_similarity_index")
+def build_similarity_index():
+    from gear.service.similarity.similarity_service import SimilarityService
+
+    SimilarityService.build()
+
+
+@task("noop")
+def noop(sleep_ms=0):
+    """Does nothing but wait; used by ``benchmark_worker``."""
+    if sleep_ms:
+        time.sleep(sleep_ms / 1000)
@@ -1,6 +1,9 @@
 from django import template
-from gear.models import Library, Collection, Item
+from gear.models import DEFAULT_IMAGE, Library, Collection, Item, ItemImage
 import builtins
+import uuid
+from django.utils.html import format_html
+from gear.views.base import IDEMPOTENCY_FIELD
 
 register = template.Library()
 
@@ -15,3 +18,19 @@ def isinstance(value, arg):
     elif arg == "Item":
         return builtins.isinstance(value, Item)
     return False
+
+
+@register.simple_tag
+def idempotency_key():
+    """Hidden field giving this rendered form a key, so a resubmit is a no-op."""
+    return format_html(
+        '<input type="hidden" name="{}" value="{}" />',
+        IDEMPOTENCY_FIELD,
+        uuid.uuid4().hex,
+    )
+
+
+@register.filter
+def image_url(name):
+    """URL of a stored item image name, falling back to the default image."""
+    return ItemImage._meta.get_field("image").storage.url(name or DEFAULT_IMAGE)
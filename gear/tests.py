@@ -1,14 +1,42 @@
-from django.test import TestCase, Client
+from django.test import TestCase, Client, override_settings
 from django.core.exceptions import ValidationError
 from django.utils import timezone
 from django.urls import reverse
 from datetime import timedelta
-from django.contrib.auth.models import User
+from django.contrib.auth.models import AnonymousUser, User
 from django.db import models
 from django.contrib.messages import get_messages
+from django.db import DatabaseError, IntegrityError, connection, transaction
+from django.test.utils import CaptureQueriesContext
+from asgiref.sync import async_to_sync, sync_to_async
+import asyncio
 import uuid
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import zipfile
+from unittest import mock
+from PIL import Image as PILImage
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.cache import cache
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.handlers.asgi import ASGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections
 
 from gear.models import (
+    DEFAULT_IMAGE,
     ItemReview,
     Library,
     Item,
@@ -18,9 +46,50 @@ from gear.models import (
     Collection,
     CollectionItem,
     RentalRequest,
+    CollectionAccessRequest,
+    IdempotencyKey,
+    InventoryHold,
+    Task,
+    Notification,
+    RequestEvent,
+    ItemDailyStats,
+    ItemRecommendation,
 )
 from users.models import UserProfile
+from users.service.librarian.librarian_service import LibrarianService
+from users.service.patron.patron_service import PatronService, RentalRequestError
+from gear.forms.add_library_form import LibraryForm
 from gear.service.item.item_service import ItemService
+from gear.service.collection.collection_service import CollectionService
+from gear.service.membership.membership_service import MembershipService
+from gear.service.dashboard.dashboard_service import DashboardService
+from gear.service.hold.hold_service import HoldService
+from gear.service.wishlist.wishlist_alert_service import WishlistAlertService
+from gear.service.task.task_service import TaskService
+from gear.service.notification.notification_service import NotificationService
+from gear.service.queue.request_queue_service import RequestQueueService, broker
+from gear.service.rollup.rollup_service import RollupService
+from gear.service.analytics.analytics_service import AnalyticsService
+from gear.service.recommendation.recommendation_service import (
+    RecommendationService,
+)
+from gear.service.similarity.similarity_service import SimilarityService
+from gear.service.similarity.tfidf_index import SimilarityIndex
+from gear.service.popularity.popularity_service import PopularityService
+from gear.service.review.review_service import ReviewService
+from gear.service.item.item_detail_service import ItemDetailService
+from gear.storage import delete_many, save_once
+from gear.service.startup.startup_service import StartupService
+from gear.service.cache.cache_service import (
+    MISSING,
+    CacheService,
+    LRUCache,
+    TieredCache,
+)
+from gear import tasks
+from gear.service.catalog.catalog_service import CatalogService
+from gear.service.media.media_service import MediaService
+from gear.service.export.export_service import ExportService
 
 
 class ItemServiceTest(TestCase):
@@ -1200,3 +1269,2544 @@ class SystemWorkflowTests(TestCase):
             pass # No assertion needed if count is 1, template logic handles it
 
         self.client.logout()
+
+
+class HotFilterIndexTests(TestCase):
+    """EXPLAIN the hot request/loan filters against seeded data."""
+
+    def setUp(self):
+        self.patrons = []
+        for i in range(3):
+            django_user = User.objects.create_user(
+                username=f"indexpatron{i}", password="pass"
+            )
+            self.patrons.append(
+                UserProfile.objects.create(
+                    user=django_user,
+                    name=f"Index Patron {i}",
+                    email=f"index{i}@test.com",
+                    user_type="patron",
+                )
+            )
+        self.items = [
+            Item.objects.create(
+                title=f"Index Item {i}", quantity=5, location="in_store"
+            )
+            for i in range(10)
+        ]
+        for item in self.items:
+            for patron in self.patrons:
+                BorrowHistory.objects.create(item=item, user=patron)
+                BorrowHistory.objects.create(
+                    item=item, user=patron, returned_at=timezone.now()
+                )
+                RentalRequest.objects.create(
+                    item=item, patron=patron, status="rejected"
+                )
+            RentalRequest.objects.create(
+                item=item, patron=self.patrons[0], status="pending"
+            )
+
+    def assertUsesIndex(self, queryset, *index_names):
+        plan = queryset.explain()
+        self.assertTrue(
+            any(name in plan for name in index_names),
+            f"Expected one of {index_names} in query plan:\n{plan}",
+        )
+
+    def test_available_quantity_uses_open_loan_index(self):
+        self.assertUsesIndex(
+            BorrowHistory.objects.filter(item=self.items[0], returned_at__isnull=True),
+            "gear_borrow_open_item_idx",
+            "gear_borrow_item_ret_idx",
+        )
+
+    def test_return_lookup_uses_user_item_index(self):
+        self.assertUsesIndex(
+            BorrowHistory.objects.filter(
+                user=self.patrons[1], item=self.items[0], returned_at__isnull=True
+            ),
+            "gear_borrow_user_item_ret_idx",
+        )
+
+    def test_pending_request_check_uses_patron_item_index(self):
+        self.assertUsesIndex(
+            RentalRequest.objects.filter(
+                patron=self.patrons[0], item=self.items[0], status="pending"
+            ),
+            "gear_rental_patron_item_idx",
+        )
+
+    def test_status_tab_uses_status_date_index(self):
+        self.assertUsesIndex(
+            RentalRequest.objects.filter(status="approved").order_by("-request_date"),
+            "gear_rental_status_date_idx",
+        )
+
+    def test_pending_tab_uses_partial_index(self):
+        self.assertUsesIndex(
+            RentalRequest.objects.filter(status="pending").order_by("-request_date"),
+            "gear_rental_pending_idx",
+            "gear_rental_status_date_idx",
+        )
+
+    def test_collection_notifications_use_patron_status_index(self):
+        self.assertUsesIndex(
+            CollectionAccessRequest.objects.filter(
+                patron=self.patrons[0],
+                status__in=["approved", "rejected"],
+                approved_date__gt=timezone.now() - timedelta(days=1),
+            ),
+            "gear_access_patron_status_idx",
+        )
+
+    def test_identifier_lookup_uses_index(self):
+        self.assertUsesIndex(
+            Item.objects.filter(identifier=self.items[3].identifier),
+            "gear_item_identifier",
+        )
+
+
+class MembershipServiceTests(TestCase):
+    def setUp(self):
+        self.public = Collection.objects.create(title="Public", is_private=False)
+        self.other_private = Collection.objects.create(
+            title="Other Private", is_private=True
+        )
+        self.items = [
+            Item.objects.create(title=f"Member {i}", location="in_store")
+            for i in range(50)
+        ]
+
+    def test_bulk_add_is_constant_queries(self):
+        collection = Collection.objects.create(title="Bulk", is_private=False)
+        # existing rows, conflict check, insert (plus savepoint bookkeeping)
+        with self.assertNumQueries(5):
+            change = MembershipService.set_collection_items(collection, self.items)
+
+        self.assertEqual(len(change.added), 50)
+        self.assertFalse(change.has_conflicts)
+        self.assertEqual(collection.items.count(), 50)
+
+    def test_diff_only_touches_changed_rows(self):
+        collection = Collection.objects.create(title="Diff", is_private=False)
+        MembershipService.set_collection_items(collection, self.items[:10])
+
+        change = MembershipService.set_collection_items(collection, self.items[5:15])
+
+        self.assertEqual(change.added, {item.id for item in self.items[10:15]})
+        self.assertEqual(change.removed, {item.id for item in self.items[:5]})
+        self.assertEqual(
+            set(collection.items.values_list("id", flat=True)),
+            {item.id for item in self.items[5:15]},
+        )
+
+    def test_private_collection_claims_public_items(self):
+        CollectionItem.objects.create(item=self.items[0], collection=self.public)
+        private = Collection.objects.create(title="Private", is_private=True)
+
+        change = MembershipService.set_collection_items(private, [self.items[0]])
+
+        self.assertEqual(change.claimed, {self.items[0].id})
+        self.assertFalse(self.public.items.exists())
+        self.assertEqual(list(private.items.all()), [self.items[0]])
+
+    def test_conflicts_reported_per_item(self):
+        CollectionItem.objects.create(item=self.items[0], collection=self.other_private)
+
+        change = MembershipService.set_collection_items(self.public, self.items[:3])
+
+        self.assertEqual(list(change.conflicts), [self.items[0].id])
+        self.assertEqual(change.added, {self.items[1].id, self.items[2].id})
+
+    def test_create_collection_rolls_back_on_conflict(self):
+        CollectionItem.objects.create(item=self.items[0], collection=self.other_private)
+        django_user = User.objects.create_user(username="memberlib", password="pass")
+        django_user.userprofile = UserProfile.objects.create(
+            user=django_user, name="Member Lib", user_type="librarian"
+        )
+
+        result = CollectionService.create_collection(
+            {
+                "title": "Conflicting",
+                "description": "",
+                "is_private": False,
+                "items": self.items[:2],
+            },
+            django_user,
+        )
+
+        self.assertIsInstance(result, ValidationError)
+        self.assertIn("items", result.message_dict)
+        self.assertFalse(Collection.objects.filter(title="Conflicting").exists())
+
+    def test_edit_collection_view_uses_membership_service(self):
+        django_user = User.objects.create_user(username="editlib", password="pass")
+        UserProfile.objects.create(
+            user=django_user,
+            name="Edit Lib",
+            email="edit@test.com",
+            user_type="librarian",
+        )
+        CollectionItem.objects.create(item=self.items[0], collection=self.public)
+        self.client.login(username="editlib", password="pass")
+
+        response = self.client.post(
+            reverse("gear:edit_collection", args=[self.public.id]),
+            {
+                "title": "Public",
+                "description": "Now private",
+                "is_private": "on",
+                "items": [str(item.id) for item in self.items[1:4]],
+            },
+        )
+
+        self.assertRedirects(
+            response, reverse("gear:collection_detail", args=[self.public.id])
+        )
+        self.public.refresh_from_db()
+        self.assertTrue(self.public.is_private)
+        self.assertEqual(
+            set(self.public.items.values_list("id", flat=True)),
+            {item.id for item in self.items[1:4]},
+        )
+
+
+class PickerTests(TestCase):
+    def setUp(self):
+        self.librarian_user = User.objects.create_user(
+            username="pickerlib", password="pass"
+        )
+        self.librarian = UserProfile.objects.create(
+            user=self.librarian_user,
+            name="Picker Lib",
+            email="pickerlib@test.com",
+            user_type="librarian",
+        )
+        self.patron_user = User.objects.create_user(
+            username="pickerpatron", password="pass"
+        )
+        self.patron = UserProfile.objects.create(
+            user=self.patron_user,
+            name="Picker Patron",
+            email="pickerpatron@test.com",
+            user_type="patron",
+        )
+        self.items = [
+            Item.objects.create(title=f"Tent {i:02d}", location="in_store")
+            for i in range(25)
+        ]
+        self.client.login(username="pickerlib", password="pass")
+
+    def test_item_search_pages_with_cursor(self):
+        url = reverse("gear:picker_items")
+        first = self.client.get(url, {"q": "tent", "limit": 10}).json()
+        self.assertEqual(len(first["results"]), 10)
+        self.assertEqual(first["results"][0]["label"], "Tent 00")
+
+        second = self.client.get(
+            url, {"q": "tent", "limit": 10, "cursor": first["next_cursor"]}
+        ).json()
+        self.assertEqual(second["results"][0]["label"], "Tent 10")
+
+        third = self.client.get(
+            url, {"q": "tent", "limit": 10, "cursor": second["next_cursor"]}
+        ).json()
+        self.assertEqual(len(third["results"]), 5)
+        self.assertIsNone(third["next_cursor"])
+
+    def test_item_search_flags_private_items(self):
+        private = Collection.objects.create(title="Vault", is_private=True)
+        CollectionItem.objects.create(item=self.items[0], collection=private)
+
+        results = self.client.get(
+            reverse("gear:picker_items"), {"q": "Tent 00"}
+        ).json()["results"]
+
+        self.assertTrue(results[0]["disabled"])
+
+    def test_bad_cursor_is_rejected(self):
+        response = self.client.get(reverse("gear:picker_items"), {"cursor": "!!"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_patron_and_collection_search_are_librarian_only(self):
+        self.client.login(username="pickerpatron", password="pass")
+        self.assertEqual(
+            self.client.get(reverse("users:picker_patrons")).status_code, 403
+        )
+        self.assertEqual(
+            self.client.get(reverse("gear:picker_collections")).status_code, 403
+        )
+
+    def test_patron_search_excludes_requesting_user(self):
+        results = self.client.get(reverse("users:picker_patrons")).json()["results"]
+        self.assertEqual([row["label"] for row in results], ["Picker Patron"])
+
+    def test_edit_page_renders_only_selected_items(self):
+        library = Library.objects.create(title="Picker Library")
+        library.items.add(self.items[3])
+
+        response = self.client.get(reverse("gear:edit_library", args=[library.id]))
+
+        self.assertContains(response, 'name="items" value="%s"' % self.items[3].id)
+        self.assertNotContains(response, str(self.items[4].id))
+
+    def test_form_validates_only_submitted_ids(self):
+        form = LibraryForm(
+            {
+                "title": "Lib",
+                "description": "Desc",
+                "items": [str(self.items[1].id), str(self.items[2].id)],
+            },
+            user=self.librarian_user,
+        )
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+        self.assertEqual(set(form.cleaned_data["items"]), set(self.items[1:3]))
+
+        form = LibraryForm(
+            {"title": "Lib", "description": "Desc", "items": [str(uuid.uuid4())]},
+            user=self.librarian_user,
+        )
+        self.assertFalse(form.is_valid())
+        self.assertIn("items", form.errors)
+
+
+class RequestDashboardTests(TestCase):
+    def setUp(self):
+        self.librarian_user = User.objects.create_user(
+            username="dashlib", password="pass"
+        )
+        self.librarian = UserProfile.objects.create(
+            user=self.librarian_user,
+            name="Dash Lib",
+            email="dashlib@test.com",
+            user_type="librarian",
+        )
+        self.patron_user = User.objects.create_user(
+            username="dashpatron", password="pass"
+        )
+        self.patron = UserProfile.objects.create(
+            user=self.patron_user,
+            name="Dash Patron",
+            email="dashpatron@test.com",
+            user_type="patron",
+        )
+        self.item = Item.objects.create(title="Stove", location="in_store", quantity=4)
+
+    def make_requests(self, count, status="pending"):
+        return [
+            RentalRequest.objects.create(
+                item=Item.objects.create(
+                    title=f"{status} {i}", location="in_store", quantity=2
+                ),
+                patron=self.patron,
+                status=status,
+            )
+            for i in range(count)
+        ]
+
+    def test_status_counts_use_one_query(self):
+        self.make_requests(3)
+        self.make_requests(2, status="approved")
+
+        with self.assertNumQueries(1):
+            counts = DashboardService.status_counts(RentalRequest.objects.all())
+
+        self.assertEqual(
+            counts, {"pending": 3, "approved": 2, "rejected": 0, "total": 5}
+        )
+
+    def test_tabs_page_independently(self):
+        self.make_requests(15)
+        self.make_requests(3, status="approved")
+        self.client.login(username="dashlib", password="pass")
+
+        first = self.client.get(reverse("users:librarian_rentals"))
+        pending = first.context["tabs"]["pending"]
+        self.assertEqual(len(pending.requests), DashboardService.PAGE_SIZE)
+        self.assertEqual(first.context["pending_count"], 15)
+        self.assertEqual(first.context["total_count"], 18)
+        self.assertFalse(first.context["tabs"]["approved"].has_next)
+
+        second = self.client.get(
+            reverse("users:librarian_rentals") + "?" + pending.next_query
+        )
+        self.assertEqual(second.context["active_tab"], "pending")
+        self.assertEqual(len(second.context["pending_requests"]), 3)
+        self.assertEqual(len(second.context["approved_requests"]), 3)
+        seen = {r.id for r in pending.requests} | {
+            r.id for r in second.context["pending_requests"]
+        }
+        self.assertEqual(len(seen), 15)
+
+    def test_bad_cursor_restarts_tab(self):
+        self.make_requests(2)
+        self.client.login(username="dashlib", password="pass")
+
+        response = self.client.get(
+            reverse("users:librarian_rentals"), {"pending_cursor": "!!"}
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context["pending_requests"]), 2)
+
+    def test_preload_sets_availability_and_image(self):
+        own = RentalRequest.objects.create(
+            item=self.item, patron=self.patron, quantity=1
+        )
+        HoldService.place_hold(own)
+        BorrowHistory.objects.create(item=self.item, user=self.patron)
+        BorrowHistory.objects.create(
+            item=self.item, user=self.patron, returned_at=timezone.now()
+        )
+        image = ItemImage.objects.create(item=self.item, image="item_images/stove.png")
+
+        rentals = list(RentalRequest.objects.select_related("item"))
+        with self.assertNumQueries(3):
+            (rental,) = DashboardService.preload_items(rentals)
+
+        self.assertEqual(rental.item_available_quantity, 3)
+        self.assertEqual(rental.item_image_url, image.image.url)
+
+    def test_dashboard_queries_do_not_grow_with_rows(self):
+        self.client.login(username="dashlib", password="pass")
+        self.make_requests(2)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(reverse("users:librarian_rentals"))
+
+        self.make_requests(10)
+        self.make_requests(5, status="rejected")
+        with CaptureQueriesContext(connection) as many:
+            self.client.get(reverse("users:librarian_rentals"))
+
+        # Only the now non-empty rejected tab adds a page query.
+        self.assertEqual(len(many), len(few) + 1)
+
+    def test_patron_collection_dashboard_only_shows_own_requests(self):
+        other_user = User.objects.create_user(username="other", password="pass")
+        other = UserProfile.objects.create(
+            user=other_user, name="Other", email="other@test.com", user_type="patron"
+        )
+        collection = Collection.objects.create(title="Vault", is_private=True)
+        CollectionAccessRequest.objects.create(
+            collection=collection, patron=self.patron
+        )
+        CollectionAccessRequest.objects.create(collection=collection, patron=other)
+        self.client.login(username="dashpatron", password="pass")
+
+        response = self.client.get(reverse("users:patron_private_collections"))
+
+        self.assertEqual(response.context["total_count"], 1)
+        self.assertEqual(len(response.context["pending_requests"]), 1)
+
+
+class CatalogImportTests(TestCase):
+    def setUp(self):
+        self.librarian_user = User.objects.create_user(
+            username="importlib", password="pass"
+        )
+        self.librarian = UserProfile.objects.create(
+            user=self.librarian_user,
+            name="Import Lib",
+            email="importlib@test.com",
+            user_type="librarian",
+        )
+        self.public = Collection.objects.create(title="Camping", is_private=False)
+        self.private = Collection.objects.create(title="Vault", is_private=True)
+        self.library = Library.objects.create(title="Main Library")
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        self.storage = FileSystemStorage(location=os.path.join(self.tmp, "media"))
+
+    def png_bytes(self):
+        buffer = io.BytesIO()
+        PILImage.new("RGB", (4, 4), "red").save(buffer, format="PNG")
+        return buffer.getvalue()
+
+    def test_csv_import_bulk_creates_items_and_links(self):
+        catalog = io.StringIO(
+            "title,description,location,quantity,collections,libraries\n"
+            "Tent,Two person,in_store,3,Camping,Main Library\n"
+            "Stove,,online,1,,\n"
+            "Broken,,nowhere,1,,\n"
+            "Lantern,,in_store,2,Unknown,\n"
+        )
+
+        report = CatalogService.import_catalog(
+            catalog, "csv", created_by=self.librarian, storage=self.storage
+        )
+
+        self.assertEqual(report.rows, 4)
+        self.assertEqual(report.created, 2)
+        self.assertEqual([line for line, _ in report.errors], [4, 5])
+        self.assertIn("location", report.errors[0][1])
+        self.assertIn("Unknown collection", report.errors[1][1])
+
+        tent = Item.objects.get(title="Tent")
+        self.assertEqual(tent.quantity, 3)
+        self.assertEqual(tent.created_by, self.librarian)
+        self.assertEqual(list(tent.collections.all()), [self.public])
+        self.assertEqual(list(tent.libraries.all()), [self.library])
+        # Items without images get the default image, like create_item.
+        self.assertEqual(tent.images.get().image.name, "item_images/default_gear.png")
+
+    def test_jsonl_import_with_zip_images_in_worker_pool(self):
+        archive = os.path.join(self.tmp, "images.zip")
+        with zipfile.ZipFile(archive, "w") as zf:
+            zf.writestr("tent.png", self.png_bytes())
+            zf.writestr("bad.png", b"not an image")
+        lines = [
+            {"title": f"Tent {i}", "location": "in_store", "images": ["tent.png"]}
+            for i in range(5)
+        ]
+        lines.append({"title": "Bad", "location": "in_store", "images": "bad.png"})
+        catalog = io.StringIO(
+            "\n".join(json.dumps(line) for line in lines) + "\n{not json\n"
+        )
+
+        report = CatalogService.import_catalog(
+            catalog,
+            "jsonl",
+            image_path=archive,
+            workers=2,
+            chunk_size=2,
+            storage=self.storage,
+        )
+
+        self.assertEqual(report.created, 5)
+        self.assertEqual(report.images, 5)
+        self.assertEqual([line for line, _ in report.errors], [6, 7])
+        # Identical uploads share one content-addressed file.
+        digest = hashlib.sha256(self.png_bytes()).hexdigest()
+        names = set(
+            ItemImage.objects.filter(item__title__startswith="Tent").values_list(
+                "image", flat=True
+            )
+        )
+        self.assertEqual(names, {f"item_images/{digest[:2]}/{digest}.png"})
+        self.assertTrue(self.storage.exists(names.pop()))
+
+    def test_failed_chunk_deletes_its_stored_images(self):
+        images = os.path.join(self.tmp, "images")
+        os.makedirs(images)
+        shared = self.png_bytes()
+        buffer = io.BytesIO()
+        PILImage.new("RGB", (4, 4), "blue").save(buffer, format="PNG")
+        for name, data in (("shared.png", shared), ("fresh.png", buffer.getvalue())):
+            with open(os.path.join(images, name), "wb") as f:
+                f.write(data)
+        digest = hashlib.sha256(shared).hexdigest()
+        shared_name = self.storage.save(
+            f"item_images/{digest[:2]}/{digest}.png", ContentFile(shared)
+        )
+        kept = Item.objects.create(title="Kept", location="in_store")
+        ItemImage.objects.create(item=kept, image=shared_name)
+        catalog = io.StringIO(
+            "title,location,images\nTent,in_store,shared.png;fresh.png\n"
+        )
+
+        with mock.patch.object(
+            CatalogService, "write_chunk", side_effect=DatabaseError("boom")
+        ):
+            report = CatalogService.import_catalog(
+                catalog, "csv", image_path=images, storage=self.storage
+            )
+
+        self.assertEqual(report.created, 0)
+        self.assertIn("Could not be saved", report.errors[0][1])
+        # The file the existing row shares stays; the new one is removed.
+        stored = [
+            os.path.join(directory, name)
+            for directory, _, files in os.walk(self.storage.location)
+            for name in files
+        ]
+        self.assertEqual(stored, [self.storage.path(shared_name)])
+
+    def test_private_collection_must_be_the_only_collection(self):
+        catalog = io.StringIO(
+            '{"title": "Safe", "location": "in_store", '
+            '"collections": ["Vault", "Camping"]}\n'
+        )
+
+        report = CatalogService.import_catalog(catalog, "jsonl", storage=self.storage)
+
+        self.assertEqual(report.created, 0)
+        self.assertIn("private collection", report.errors[0][1])
+
+    def test_dry_run_writes_nothing(self):
+        catalog = io.StringIO("title,location\nTent,in_store\n")
+
+        report = CatalogService.import_catalog(
+            catalog, "csv", dry_run=True, storage=self.storage
+        )
+
+        self.assertEqual(report.created, 1)
+        self.assertFalse(Item.objects.exists())
+
+    def test_management_command(self):
+        path = os.path.join(self.tmp, "catalog.csv")
+        with open(path, "w") as f:
+            f.write("title,location,quantity\nTent,in_store,2\nBad,in_store,0\n")
+        out, err = io.StringIO(), io.StringIO()
+
+        call_command(
+            "import_catalog",
+            path,
+            "--workers=1",
+            "--librarian=importlib@test.com",
+            stdout=out,
+            stderr=err,
+        )
+
+        self.assertIn("Imported 1 of 2 rows", out.getvalue())
+        self.assertIn("line 3", err.getvalue())
+        self.assertEqual(Item.objects.get().created_by, self.librarian)
+
+    def test_upload_view_reports_row_errors(self):
+        self.client.login(username="importlib", password="pass")
+        upload = SimpleUploadedFile(
+            "catalog.csv", b"title,location\nTent,in_store\n,in_store\n"
+        )
+
+        response = self.client.post(reverse("gear:import_catalog"), {"catalog": upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["report"].created, 1)
+        self.assertEqual(response.context["errors"][0][0], 3)
+        self.assertTrue(Item.objects.filter(title="Tent").exists())
+
+    def test_upload_view_rejects_unknown_format(self):
+        self.client.login(username="importlib", password="pass")
+        upload = SimpleUploadedFile("catalog.xlsx", b"nope")
+
+        response = self.client.post(reverse("gear:import_catalog"), {"catalog": upload})
+
+        self.assertTrue(response.context["form"].errors)
+        self.assertIsNone(response.context["report"])
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.librarian_user = User.objects.create_user(
+            username="exportlib", password="pass"
+        )
+        self.librarian = UserProfile.objects.create(
+            user=self.librarian_user,
+            name="Export Lib",
+            email="exportlib@test.com",
+            user_type="librarian",
+        )
+        self.patron_user = User.objects.create_user(
+            username="exportpatron", password="pass"
+        )
+        self.patron = UserProfile.objects.create(
+            user=self.patron_user,
+            name="Export Patron",
+            email="exportpatron@test.com",
+            user_type="patron",
+        )
+        self.collection = Collection.objects.create(title="Camping")
+        self.library = Library.objects.create(title="Main")
+        self.item = Item.objects.create(
+            title="Tent, large", location="in_store", quantity=2
+        )
+        CollectionItem.objects.create(item=self.item, collection=self.collection)
+        self.item.libraries.add(self.library)
+        BorrowHistory.objects.create(item=self.item, user=self.patron)
+
+    def test_items_csv_includes_membership(self):
+        lines = list(ExportService.stream("items", "csv"))
+        rows = list(csv.DictReader(io.StringIO("".join(lines))))
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]["title"], "Tent, large")
+        self.assertEqual(rows[0]["collections"], str(self.collection.id))
+        self.assertEqual(rows[0]["libraries"], str(self.library.id))
+
+    def test_item_membership_is_loaded_per_chunk(self):
+        for i in range(4):
+            Item.objects.create(title=f"Extra {i}", location="online")
+
+        with self.assertNumQueries(1 + 3 * 2):
+            rows = list(ExportService.rows("items", chunk_size=2))
+
+        self.assertEqual(len(rows), 5)
+
+    def test_exported_items_can_be_reimported(self):
+        lines = "".join(ExportService.stream("items", "jsonl"))
+
+        report = CatalogService.import_catalog(io.StringIO(lines), "jsonl")
+
+        self.assertEqual(report.created, 1)
+        copy = Item.objects.exclude(pk=self.item.pk).get()
+        self.assertEqual(list(copy.libraries.all()), [self.library])
+
+    def test_streaming_endpoint_is_librarian_only(self):
+        url = reverse("gear:export_dataset", args=["borrow_history"])
+        self.client.login(username="exportpatron", password="pass")
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.client.login(username="exportlib", password="pass")
+        response = self.client.get(url, {"format": "jsonl"})
+
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment", response["Content-Disposition"])
+        body = async_to_sync(self.read)(response.streaming_content).decode()
+        record = json.loads(body.splitlines()[0])
+        self.assertEqual(record["patron"], "exportpatron@test.com")
+        self.assertIsNone(record["returned_at"])
+
+    @staticmethod
+    async def read(streaming_content):
+        return b"".join([part async for part in streaming_content])
+
+    async def test_export_streams_chunk_by_chunk_under_asgi(self):
+        for i in range(4):
+            await Item.objects.acreate(title=f"Extra {i}", location="online")
+        await sync_to_async(self.client.force_login)(self.librarian_user)
+        session = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        path = reverse("gear:export_dataset", args=["items"])
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": b"format=csv",
+            "root_path": "",
+            "headers": [
+                (b"host", b"testserver"),
+                (b"cookie", f"{settings.SESSION_COOKIE_NAME}={session}".encode()),
+            ],
+            "client": ("127.0.0.1", 0),
+            "server": ("testserver", 80),
+        }
+        read, rows_read_when_sent, body = [], [], []
+        rows = ExportService.rows
+
+        def counted_rows(*args, **kwargs):
+            for row in rows(*args, **kwargs):
+                read.append(row["id"])
+                yield row
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        async def send(message):
+            if message["type"] == "http.response.body" and message.get("body"):
+                rows_read_when_sent.append(len(read))
+                body.append(message["body"])
+
+        # As the test client does, keep the handler off the test's connection.
+        request_started.disconnect(close_old_connections)
+        request_finished.disconnect(close_old_connections)
+        try:
+            with mock.patch.object(ExportService, "CHUNK_SIZE", 2), mock.patch.object(
+                ExportService, "rows", side_effect=counted_rows
+            ):
+                await ASGIHandler()(scope, receive, send)
+        finally:
+            request_started.connect(close_old_connections)
+            request_finished.connect(close_old_connections)
+
+        # Header plus one row, then two rows per chunk, each sent as read.
+        self.assertEqual(rows_read_when_sent, [1, 3, 5])
+        self.assertEqual(len(b"".join(body).decode().splitlines()), 6)
+
+    def test_unknown_dataset_and_format(self):
+        self.client.login(username="exportlib", password="pass")
+        self.assertEqual(
+            self.client.get(
+                reverse("gear:export_dataset", args=["passwords"])
+            ).status_code,
+            404,
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse("gear:export_dataset", args=["reviews"]), {"format": "xml"}
+            ).status_code,
+            400,
+        )
+
+    def test_management_command_writes_file(self):
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        path = os.path.join(tmp, "history.csv")
+        err = io.StringIO()
+
+        call_command("export_data", "borrow_history", "--output", path, stderr=err)
+
+        with open(path) as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(rows[0]["item"], "Tent, large")
+        self.assertIn("Wrote 1 rows", err.getvalue())
+
+
+class CatalogApiTests(TestCase):
+    def setUp(self):
+        self.patron_user = User.objects.create_user(
+            username="apipatron", password="pass"
+        )
+        self.patron = UserProfile.objects.create(
+            user=self.patron_user,
+            name="Api Patron",
+            email="apipatron@test.com",
+            user_type="patron",
+        )
+        self.public = Collection.objects.create(title="Camping")
+        self.private = Collection.objects.create(title="Vault", is_private=True)
+        self.library = Library.objects.create(title="Main")
+        self.tent = Item.objects.create(
+            title="Tent", description="Two person", location="in_store", quantity=3
+        )
+        self.safe = Item.objects.create(title="Safe", location="in_store")
+        CollectionItem.objects.create(item=self.tent, collection=self.public)
+        CollectionItem.objects.create(item=self.safe, collection=self.private)
+        self.tent.libraries.add(self.library)
+        BorrowHistory.objects.create(item=self.tent, user=self.patron)
+
+    def get(self, name, **params):
+        return self.client.get(reverse(f"gear:{name}"), params)
+
+    def test_anonymous_visibility_matches_home(self):
+        items = self.get("api_items").json()["data"]
+        collections = self.get("api_collections").json()["data"]
+
+        self.assertEqual([item["title"] for item in items], ["Tent"])
+        self.assertEqual([c["title"] for c in collections], ["Camping"])
+
+    def test_allowed_patron_sees_private_items(self):
+        self.client.login(username="apipatron", password="pass")
+        self.assertEqual(len(self.get("api_items").json()["data"]), 1)
+
+        self.private.allowed_users.add(self.patron)
+        titles = [item["title"] for item in self.get("api_items").json()["data"]]
+
+        self.assertEqual(titles, ["Safe", "Tent"])
+
+    def test_sparse_fields_and_includes(self):
+        data = self.get(
+            "api_items",
+            fields="title,available_quantity",
+            include="collections,libraries",
+        ).json()["data"]
+
+        self.assertEqual(
+            data[0],
+            {
+                "id": str(self.tent.id),
+                "title": "Tent",
+                "available_quantity": 2,
+                "collections": [{"id": str(self.public.id), "title": "Camping"}],
+                "libraries": [{"id": str(self.library.id), "title": "Main"}],
+            },
+        )
+
+    def test_includes_are_batched_per_page(self):
+        for i in range(5):
+            item = Item.objects.create(title=f"Lamp {i}", location="online")
+            CollectionItem.objects.create(item=item, collection=self.public)
+
+        # One page query plus one query per include, however many rows.
+        with self.assertNumQueries(3):
+            response = self.get("api_items", include="collections,images")
+
+        self.assertEqual(len(response.json()["data"]), 6)
+
+    def test_include_respects_visibility(self):
+        self.library.collections.add(self.public, self.private)
+
+        data = self.get("api_libraries", include="collections", fields="title").json()[
+            "data"
+        ]
+
+        self.assertEqual([c["title"] for c in data[0]["collections"]], ["Camping"])
+
+    def test_cursor_pagination(self):
+        for i in range(4):
+            Item.objects.create(title=f"Lamp {i}", location="online")
+
+        first = self.get("api_items", limit=3, fields="title").json()
+        second = self.client.get(first["next"]).json()
+
+        titles = [i["title"] for i in first["data"] + second["data"]]
+        self.assertEqual(titles, ["Lamp 0", "Lamp 1", "Lamp 2", "Lamp 3", "Tent"])
+        self.assertIsNone(second["next"])
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.get("api_items", fields="title,password")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("password", response.json()["error"])
+        self.assertEqual(self.get("api_items", cursor="!!").status_code, 400)
+
+    def test_etag_and_cache_control(self):
+        response = self.get("api_collections")
+        self.assertIn("public", response["Cache-Control"])
+        self.assertIn("max-age=60", response["Cache-Control"])
+
+        cached = self.client.get(
+            reverse("gear:api_collections"), HTTP_IF_NONE_MATCH=response["ETag"]
+        )
+        self.assertEqual(cached.status_code, 304)
+
+        self.client.login(username="apipatron", password="pass")
+        self.assertIn("private", self.get("api_collections")["Cache-Control"])
+
+    def test_availability(self):
+        response = self.client.get(
+            reverse("gear:api_item_availability", args=[self.tent.id])
+        )
+
+        self.assertEqual(
+            response.json(),
+            {
+                "id": str(self.tent.id),
+                "status": "available",
+                "quantity": 3,
+                "on_loan": 1,
+                "on_hold": 0,
+                "available_quantity": 2,
+            },
+        )
+        hidden = self.client.get(
+            reverse("gear:api_item_availability", args=[self.safe.id])
+        )
+        self.assertEqual(hidden.status_code, 404)
+
+
+class IdempotentRequestTests(TestCase):
+    def setUp(self):
+        self.patron_user = User.objects.create_user(
+            username="idempatron", password="pass"
+        )
+        self.patron = UserProfile.objects.create(
+            user=self.patron_user,
+            name="Idem Patron",
+            email="idempatron@test.com",
+            user_type="patron",
+        )
+        self.item = Item.objects.create(title="Kayak", location="in_store", quantity=3)
+        self.client.login(username="idempatron", password="pass")
+
+    def test_one_pending_request_per_patron_and_item(self):
+        RentalRequest.objects.create(item=self.item, patron=self.patron)
+        RentalRequest.objects.create(
+            item=self.item, patron=self.patron, status="approved"
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RentalRequest.objects.create(item=self.item, patron=self.patron)
+
+    def test_duplicate_request_is_reported_from_the_insert(self):
+        PatronService.request_rent_item(self.item, self.patron_user)
+
+        with self.assertRaisesMessage(RentalRequestError, "already have a pending"):
+            PatronService.request_rent_item(self.item, self.patron_user)
+        self.assertEqual(RentalRequest.objects.count(), 1)
+
+    def test_other_integrity_errors_are_not_reported_as_duplicates(self):
+        with mock.patch.object(
+            HoldService, "place_hold", side_effect=IntegrityError("hold")
+        ):
+            with self.assertRaisesMessage(IntegrityError, "hold"):
+                PatronService.request_rent_item(self.item, self.patron_user)
+
+        self.assertFalse(RentalRequest.objects.exists())
+
+    def test_duplicate_review_is_reported_from_the_insert(self):
+        PatronService.leave_review(self.item, self.patron_user, 5, "Great")
+
+        with self.assertRaisesMessage(ValueError, "already left a review"):
+            PatronService.leave_review(self.item, self.patron_user, 4, "Again")
+
+    def test_retry_with_same_key_replays_the_first_response(self):
+        url = reverse("users:request_rent_item", args=[self.item.id])
+        data = {"quantity": 1, "idempotency_key": "abc123"}
+
+        first = self.client.post(url, data)
+        retry = self.client.post(url, data)
+
+        self.assertEqual(retry.status_code, 302)
+        self.assertEqual(retry["Location"], first["Location"])
+        self.assertEqual(RentalRequest.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 302)
+
+    def test_key_cannot_be_reused_for_another_endpoint(self):
+        self.client.post(
+            reverse("users:add_to_wishlist", args=[self.item.id]),
+            HTTP_IDEMPOTENCY_KEY="k1",
+        )
+
+        response = self.client.post(
+            reverse("users:leave_review", args=[self.item.id]),
+            {"rating": 5},
+            HTTP_IDEMPOTENCY_KEY="k1",
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ItemReview.objects.exists())
+        self.assertEqual(WishlistEntry.objects.count(), 1)
+
+    def test_item_page_forms_carry_a_key(self):
+        response = self.client.get(reverse("gear:item_detail", args=[self.item.id]))
+
+        self.assertContains(response, 'name="idempotency_key"', count=3)
+
+    def test_expired_key_is_processed_again(self):
+        url = reverse("users:add_to_wishlist", args=[self.item.id])
+        # A worker crashed before completing the key a day ago.
+        IdempotencyKey.objects.create(user=self.patron, key="k1", path=url)
+        IdempotencyKey.objects.update(created_at=timezone.now() - timedelta(hours=25))
+
+        self.client.post(url, HTTP_IDEMPOTENCY_KEY="k1")
+
+        self.assertEqual(WishlistEntry.objects.count(), 1)
+        self.assertEqual(IdempotencyKey.objects.get().status_code, 302)
+
+    def test_prune_deletes_only_expired_keys_in_batches(self):
+        for key in ("old1", "old2", "old3", "new"):
+            IdempotencyKey.objects.create(user=self.patron, key=key, path="/")
+        IdempotencyKey.objects.filter(key__startswith="old").update(
+            created_at=timezone.now() - timedelta(hours=25)
+        )
+        out = io.StringIO()
+
+        call_command("prune_idempotency_keys", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Deleted 3 expired idempotency keys", out.getvalue())
+        self.assertEqual(
+            list(IdempotencyKey.objects.values_list("key", flat=True)), ["new"]
+        )
+
+
+class InventoryHoldTests(TestCase):
+    def setUp(self):
+        self.librarian = UserProfile.objects.create(
+            user=User.objects.create_user(username="holdlib", password="pass"),
+            name="Hold Librarian",
+            email="holdlib@test.com",
+            user_type="librarian",
+        )
+        self.patrons = [
+            User.objects.create_user(username=f"holder{i}", password="pass")
+            for i in range(2)
+        ]
+        for i, user in enumerate(self.patrons):
+            UserProfile.objects.create(
+                user=user, name=f"Holder {i}", email=f"holder{i}@test.com"
+            )
+        self.item = Item.objects.create(title="Canoe", location="in_store", quantity=2)
+
+    def test_request_holds_its_units(self):
+        rental = PatronService.request_rent_item(self.item, self.patrons[0], 2)
+
+        self.assertEqual(rental.hold.quantity, 2)
+        self.assertEqual(self.item.available_quantity, 0)
+        self.assertEqual(self.item.available_for_request(rental), 2)
+        with self.assertRaisesMessage(RentalRequestError, "exceeds the available"):
+            PatronService.request_rent_item(self.item, self.patrons[1])
+
+    def test_approve_consumes_the_hold(self):
+        rental = PatronService.request_rent_item(self.item, self.patrons[0], 2)
+
+        self.client.login(username="holdlib", password="pass")
+        self.client.post(reverse("users:approve_rental_request", args=[rental.id]))
+
+        rental.refresh_from_db()
+        self.assertEqual(rental.status, "approved")
+        self.assertFalse(InventoryHold.objects.exists())
+        self.assertEqual(self.item.available_quantity, 0)
+
+    def test_approve_rolls_back_when_a_step_fails(self):
+        rental = PatronService.request_rent_item(self.item, self.patrons[0])
+
+        with mock.patch.object(
+            RequestQueueService, "record", side_effect=DatabaseError("queue")
+        ), self.captureOnCommitCallbacks(execute=True):
+            result = LibrarianService.approve_rental_request(rental, self.librarian)
+
+        self.assertEqual(result, "queue")
+        rental.refresh_from_db()
+        self.assertEqual(rental.status, "pending")
+        self.assertTrue(InventoryHold.objects.filter(rental_request=rental).exists())
+        self.assertFalse(BorrowHistory.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+
+    def test_decisions_recheck_the_locked_request(self):
+        rental = PatronService.request_rent_item(self.item, self.patrons[0])
+        stale = RentalRequest.objects.get(pk=rental.pk)
+        LibrarianService.deny_rental_request(rental, self.librarian)
+
+        self.assertEqual(
+            LibrarianService.approve_rental_request(stale, self.librarian),
+            "Only pending requests can be approved",
+        )
+        self.assertEqual(stale.status, "rejected")
+        self.assertFalse(BorrowHistory.objects.exists())
+
+    def test_deny_and_cancel_release_the_hold(self):
+        denied = PatronService.request_rent_item(self.item, self.patrons[0])
+        cancelled = PatronService.request_rent_item(self.item, self.patrons[1])
+
+        LibrarianService.deny_rental_request(denied, self.librarian)
+        self.client.login(username="holder1", password="pass")
+        self.client.post(reverse("users:cancel_rental_request", args=[cancelled.id]))
+
+        self.assertFalse(InventoryHold.objects.exists())
+        self.assertEqual(self.item.available_quantity, 2)
+
+    def test_expired_holds_stop_counting_and_are_swept(self):
+        stale = PatronService.request_rent_item(self.item, self.patrons[0])
+        PatronService.request_rent_item(self.item, self.patrons[1])
+        InventoryHold.objects.filter(rental_request=stale).update(
+            expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+        self.assertEqual(self.item.available_quantity, 1)
+
+        out = io.StringIO()
+        call_command("release_expired_holds", stdout=out)
+
+        self.assertIn("Released 1 expired holds.", out.getvalue())
+        self.assertEqual(InventoryHold.objects.count(), 1)
+        self.assertEqual(RentalRequest.objects.get(pk=stale.pk).status, "pending")
+
+    def test_sweep_alerts_wishlisters_when_expired_holds_free_stock(self):
+        kayak = Item.objects.create(title="Kayak", location="in_store", quantity=2)
+        canoe_hold = PatronService.request_rent_item(self.item, self.patrons[0])
+        PatronService.request_rent_item(self.item, self.patrons[1])
+        kayak_hold = PatronService.request_rent_item(kayak, self.patrons[0])
+        InventoryHold.objects.filter(
+            rental_request__in=[canoe_hold, kayak_hold]
+        ).update(expires_at=timezone.now() - timedelta(minutes=1))
+        Task.objects.all().delete()
+
+        self.assertEqual(HoldService.sweep_expired(batch_size=1), 2)
+
+        # The canoe went from none free to one; the kayak always had one.
+        self.assertEqual(
+            list(Task.objects.values_list("name", "payload")),
+            [("alert_wishlisters", {"item_id": str(self.item.id)})],
+        )
+
+
+class WishlistAlertTests(TestCase):
+    def setUp(self):
+        UserProfile.objects.create(
+            user=User.objects.create_user(username="alertlib", password="pass"),
+            name="Alert Librarian",
+            email="alertlib@test.com",
+            user_type="librarian",
+        )
+        self.patrons = []
+        for i in range(3):
+            user = User.objects.create_user(username=f"fan{i}", password="pass")
+            self.patrons.append(
+                UserProfile.objects.create(
+                    user=user, name=f"Fan {i}", email=f"fan{i}@test.com"
+                )
+            )
+        self.item = Item.objects.create(
+            title="Drone", location="in_store", quantity=1, status="rented_out"
+        )
+        BorrowHistory.objects.create(item=self.item, user=self.patrons[0])
+        for patron in self.patrons[1:]:
+            WishlistEntry.objects.create(user_profile=patron, item=self.item)
+
+    def return_item(self):
+        self.client.login(username="alertlib", password="pass")
+        return self.client.post(
+            reverse("gear:librarian_return_items"),
+            {
+                "patron_id": self.patrons[0].id,
+                "item_id": self.item.id,
+                "quantity": 1,
+            },
+        )
+
+    def restock_alerts(self):
+        return Notification.objects.filter(kind="item_restocked")
+
+    def test_return_alerts_wishlisters_once(self):
+        self.return_item()
+        self.assertFalse(self.restock_alerts().exists())
+        TaskService.run_until_empty()
+        WishlistAlertService.alert_wishlisters(self.item.id)
+
+        self.assertEqual(
+            set(self.restock_alerts().values_list("recipient_id", flat=True)),
+            {self.patrons[1].id, self.patrons[2].id},
+        )
+        self.assertEqual(self.restock_alerts().count(), 2)
+        self.patrons[1].refresh_from_db()
+        self.assertEqual(self.patrons[1].unread_notifications, 1)
+
+    def test_no_alert_when_item_was_already_available(self):
+        self.assertFalse(WishlistAlertService.item_restocked(self.item, 1, 2))
+        self.assertFalse(Task.objects.exists())
+
+    def test_alerts_are_batched_in_fixed_queries(self):
+        ContentType.objects.get_for_model(Item)
+        # The item, the wishlisters, who to skip, then the notify() insert
+        # and counter update inside their savepoint.
+        with self.assertNumQueries(7):
+            queued = WishlistAlertService.alert_wishlisters(self.item.id)
+        self.assertEqual(queued, 2)
+
+    def test_patrons_over_the_rate_limit_are_skipped(self):
+        NotificationService.notify(
+            "item_restocked",
+            [
+                (self.patrons[1].id, Item.objects.create(title=f"Other {i}"))
+                for i in range(WishlistAlertService.ALERTS_PER_WINDOW)
+            ],
+        )
+        NotificationService.mark_all_read(self.patrons[1])
+
+        self.assertEqual(WishlistAlertService.alert_wishlisters(self.item.id), 1)
+        self.assertFalse(
+            self.restock_alerts()
+            .filter(recipient=self.patrons[1], target_id=str(self.item.id))
+            .exists()
+        )
+
+    def test_wishlist_page_shows_and_clears_alerts(self):
+        self.return_item()
+        TaskService.run_until_empty()
+        self.client.login(username="fan1", password="pass")
+
+        home = self.client.get(reverse("gear:home"))
+        self.assertEqual(home.context["notification_count"], 1)
+
+        response = self.client.get(reverse("users:wishlist"))
+
+        self.assertContains(response, "Back in stock")
+        home = self.client.get(reverse("gear:home"))
+        self.assertEqual(home.context["notification_count"], 0)
+        feed = self.client.get(reverse("users:notifications"))
+        self.assertContains(feed, "Drone from your wishlist is available again.")
+
+    def test_approval_marks_the_borrowers_alert_read(self):
+        WishlistAlertService.alert_wishlisters(self.item.id)
+        patron = UserProfile.objects.get(pk=self.patrons[1].pk)
+
+        WishlistAlertService.dismiss(patron, self.item)
+
+        patron.refresh_from_db()
+        self.assertEqual(patron.unread_notifications, 0)
+        other = self.restock_alerts().get(recipient=self.patrons[2])
+        self.assertIsNone(other.read_at)
+
+
+class TaskOutboxTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        tasks.HANDLERS["test_record"] = lambda **payload: self.calls.append(payload)
+        tasks.HANDLERS["test_fail"] = lambda: 1 / 0
+        self.addCleanup(tasks.HANDLERS.pop, "test_record")
+        self.addCleanup(tasks.HANDLERS.pop, "test_fail")
+
+    def test_enqueue_rejects_unknown_tasks(self):
+        with self.assertRaises(tasks.UnknownTask):
+            tasks.enqueue("missing")
+
+    def test_item_delete_queues_its_files_in_the_same_transaction(self):
+        item = Item.objects.create(title="Tent", quantity=1)
+        ItemImage.objects.create(item=item, image="item_images/tent.png")
+        ItemImage.objects.create(item=item)
+
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            item.delete()
+            raise RuntimeError
+        self.assertFalse(Task.objects.exists())
+
+        Item.objects.get(title="Tent").delete()
+        task = Task.objects.get(name="delete_files")
+        self.assertEqual(task.payload, {"names": ["item_images/tent.png"]})
+
+    def test_worker_runs_and_removes_finished_tasks(self):
+        tasks.enqueue("test_record", {"n": 1})
+        tasks.enqueue("test_record", {"n": 2}, delay=60)
+
+        out = io.StringIO()
+        call_command("run_worker", "--once", "--threads", "1", stdout=out)
+
+        self.assertIn("Ran 1 tasks, 0 failed.", out.getvalue())
+        self.assertEqual(self.calls, [{"n": 1}])
+        self.assertEqual(Task.objects.get().payload, {"n": 2})
+
+    def test_failures_back_off_then_fail(self):
+        task = tasks.enqueue("test_fail", max_attempts=2)
+
+        TaskService.run_until_empty()
+        task.refresh_from_db()
+        self.assertEqual(task.status, "pending")
+        self.assertEqual(task.attempts, 1)
+        self.assertIn("ZeroDivisionError", task.last_error)
+        self.assertGreater(task.run_after, timezone.now())
+
+        Task.objects.update(run_after=timezone.now())
+        TaskService.run_until_empty()
+        task.refresh_from_db()
+        self.assertEqual(task.status, "failed")
+        self.assertEqual(task.attempts, 2)
+
+    def test_backoff_doubles_up_to_the_cap(self):
+        self.assertEqual(TaskService.backoff(1), timedelta(seconds=10))
+        self.assertEqual(TaskService.backoff(3), timedelta(seconds=40))
+        self.assertEqual(TaskService.backoff(20), timedelta(hours=1))
+
+    def test_claim_skips_running_tasks_until_their_lease_ends(self):
+        task = tasks.enqueue("test_record")
+        self.assertEqual(TaskService.claim(), [task])
+        self.assertEqual(TaskService.claim(), [])
+
+        Task.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        (reclaimed,) = TaskService.claim()
+        self.assertEqual(reclaimed.attempts, 2)
+
+
+class NotificationTests(TestCase):
+    def setUp(self):
+        self.librarian = UserProfile.objects.create(
+            user=User.objects.create_user(username="notelib", password="pass"),
+            name="Note Librarian",
+            email="notelib@test.com",
+            user_type="librarian",
+        )
+        self.patron = UserProfile.objects.create(
+            user=User.objects.create_user(username="notepatron", password="pass"),
+            name="Note Patron",
+            email="notepatron@test.com",
+        )
+        self.item = Item.objects.create(title="Tripod", location="in_store", quantity=5)
+        self.collection = Collection.objects.create(title="Studio", is_private=True)
+
+    def unread(self):
+        self.patron.refresh_from_db()
+        return self.patron.unread_notifications
+
+    def test_librarian_decisions_notify_the_patron(self):
+        approved = RentalRequest.objects.create(item=self.item, patron=self.patron)
+        with self.captureOnCommitCallbacks(execute=True):
+            LibrarianService.approve_rental_request(approved, self.librarian)
+        access = CollectionAccessRequest.objects.create(
+            collection=self.collection, patron=self.patron
+        )
+        LibrarianService.deny_private_collection_request(access, self.librarian)
+
+        self.assertEqual(
+            list(
+                Notification.objects.order_by("created_at", "id").values_list(
+                    "kind", "target_id"
+                )
+            ),
+            [
+                ("rental_approved", str(self.item.id)),
+                ("collection_rejected", str(self.collection.id)),
+            ],
+        )
+        self.assertEqual(self.unread(), 2)
+
+    def test_notify_writes_in_bulk(self):
+        other = UserProfile.objects.create(
+            user=User.objects.create_user(username="other", password="pass"),
+            name="Other",
+            email="other@test.com",
+        )
+        pairs = [(self.patron.id, self.item)] * 3 + [(other.id, self.item)]
+        with CaptureQueriesContext(connection) as queries:
+            NotificationService.notify("rental_rejected", pairs)
+
+        statements = [q["sql"].split()[0] for q in queries.captured_queries]
+        self.assertEqual(statements.count("INSERT"), 1)
+        self.assertEqual(statements.count("UPDATE"), 2)
+        self.assertEqual(self.unread(), 3)
+        other.refresh_from_db()
+        self.assertEqual(other.unread_notifications, 1)
+
+    def test_feed_pages_with_fixed_queries(self):
+        NotificationService.notify(
+            "rental_approved", [(self.patron.id, self.item)] * 25
+        )
+        with self.assertNumQueries(2):
+            rows, cursor = NotificationService.feed(self.patron)
+            self.assertEqual(rows[0].target, self.item)
+        self.assertEqual(len(rows), 20)
+
+        rows, cursor = NotificationService.feed(self.patron, cursor)
+        self.assertEqual(len(rows), 5)
+        self.assertIsNone(cursor)
+
+    def test_mark_all_read_is_one_update(self):
+        NotificationService.notify("rental_approved", [(self.patron.id, self.item)] * 3)
+        self.client.login(username="notepatron", password="pass")
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse("users:mark_notifications_read"))
+
+        notification_updates = [
+            q
+            for q in queries.captured_queries
+            if q["sql"].startswith('UPDATE "gear_notification"')
+        ]
+        self.assertEqual(len(notification_updates), 1)
+        self.assertFalse(Notification.objects.filter(read_at__isnull=True).exists())
+        self.assertEqual(self.unread(), 0)
+
+    def test_visiting_a_request_tab_clears_its_kind(self):
+        NotificationService.notify("rental_approved", [(self.patron.id, self.item)])
+        NotificationService.notify(
+            "collection_approved", [(self.patron.id, self.collection)]
+        )
+        self.client.login(username="notepatron", password="pass")
+
+        response = self.client.get(reverse("users:patron_rentals"))
+
+        self.assertEqual(response.context["notification_count"], 1)
+        self.assertEqual(self.unread(), 1)
+        feed = self.client.get(reverse("users:notifications"))
+        self.assertContains(feed, "You now have access to Studio.")
+
+
+class RequestQueueStreamTests(TestCase):
+    def setUp(self):
+        self.librarian = UserProfile.objects.create(
+            user=User.objects.create_user(username="queuelib", password="pass"),
+            name="Queue Librarian",
+            email="queuelib@test.com",
+            user_type="librarian",
+        )
+        self.patron_user = User.objects.create_user(username="queuer", password="pass")
+        self.patron = UserProfile.objects.create(
+            user=self.patron_user, name="Queuer", email="queuer@test.com"
+        )
+        self.item = Item.objects.create(title="Sled", location="in_store", quantity=3)
+
+    def test_request_lifecycle_is_logged_in_order(self):
+        first = PatronService.request_rent_item(self.item, self.patron_user)
+        LibrarianService.approve_rental_request(first, self.librarian)
+        second = PatronService.request_rent_item(self.item, self.patron_user)
+        self.client.login(username="queuer", password="pass")
+        self.client.post(reverse("users:cancel_rental_request", args=[second.id]))
+
+        self.assertEqual(
+            list(RequestEvent.objects.order_by("id").values_list("action", flat=True)),
+            ["created", "approved", "created", "cancelled"],
+        )
+
+    def test_decision_events_commit_with_the_decision(self):
+        rental = PatronService.request_rent_item(self.item, self.patron_user)
+
+        with mock.patch.object(
+            HoldService, "release", side_effect=DatabaseError("hold")
+        ):
+            LibrarianService.deny_rental_request(rental, self.librarian)
+        self.assertEqual(
+            list(RequestEvent.objects.values_list("action", flat=True)), ["created"]
+        )
+
+        LibrarianService.approve_rental_request(rental, self.librarian)
+        self.assertEqual(
+            list(RequestEvent.objects.order_by("id").values_list("action", flat=True)),
+            ["created", "approved"],
+        )
+
+    def test_changes_after_high_water_mark(self):
+        PatronService.request_rent_item(self.item, self.patron_user)
+        mark = RequestEvent.objects.get().id
+        rental = RentalRequest.objects.get()
+        LibrarianService.deny_rental_request(rental, self.librarian)
+
+        with self.assertNumQueries(4):
+            changes, counts = RequestQueueService.changes_after(0)
+        self.assertEqual([c["action"] for c in changes], ["created", "rejected"])
+        # The request was resolved before it was read, so no stale summary.
+        self.assertIsNone(changes[0]["summary"])
+        self.assertEqual(counts, {"rental": 0, "collection": 0})
+
+        changes, _ = RequestQueueService.changes_after(mark)
+        self.assertEqual([c["action"] for c in changes], ["rejected"])
+        self.assertEqual(
+            RequestQueueService.changes_after(changes[-1]["id"]), ([], None)
+        )
+
+    def test_event_committed_late_is_still_sent(self):
+        def event(event_id):
+            RequestEvent.objects.create(
+                id=event_id, kind="rental", action="created", request_id=uuid.uuid4()
+            )
+
+        settle = RequestQueueService.SETTLE_SECONDS
+        # Event 11 commits first; event 10 is still in its transaction.
+        event(11)
+        changes, _ = RequestQueueService.changes_after(0)
+        sent = {change["id"]: 0.0 for change in changes}
+        mark = RequestQueueService.settle(0, sent, now=1.0)
+        self.assertEqual(mark, 0)
+
+        event(10)
+        changes, _ = RequestQueueService.changes_after(mark, sent=list(sent))
+        self.assertEqual([c["id"] for c in changes], [10])
+        sent[10] = 1.0
+
+        self.assertEqual(RequestQueueService.settle(mark, sent, now=settle), 0)
+        self.assertEqual(RequestQueueService.settle(mark, sent, now=settle + 1), 11)
+        self.assertEqual(sent, {})
+
+    def test_new_streams_start_before_unsettled_events(self):
+        PatronService.request_rent_item(self.item, self.patron_user)
+        event = RequestEvent.objects.get()
+
+        self.assertEqual(RequestQueueService.high_water_mark(), 0)
+        later = timezone.now() + timedelta(seconds=RequestQueueService.SETTLE_SECONDS)
+        self.assertEqual(RequestQueueService.high_water_mark(now=later), event.id)
+
+    def test_prune_deletes_old_events_in_batches(self):
+        for _ in range(3):
+            RequestEvent.objects.create(
+                kind="rental", action="created", request_id=uuid.uuid4()
+            )
+        RequestEvent.objects.update(created_at=timezone.now() - timedelta(days=2))
+        recent = RequestEvent.objects.create(
+            kind="rental", action="approved", request_id=uuid.uuid4()
+        )
+        out = io.StringIO()
+
+        call_command("prune_request_events", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Deleted 3 old request events", out.getvalue())
+        self.assertEqual(list(RequestEvent.objects.all()), [recent])
+
+    async def test_stream_sends_counts_then_new_requests(self):
+        await sync_to_async(PatronService.request_rent_item)(
+            self.item, self.patron_user
+        )
+        stream = RequestQueueService.stream(0, poll_interval=0.01)
+        try:
+            messages = [await anext(stream) for _ in range(4)]
+        finally:
+            await stream.aclose()
+
+        self.assertEqual(messages[0], "retry: 5000\n\n")
+        self.assertIn('"rental": 1', messages[1])
+        self.assertTrue(messages[2].startswith("id: "))
+        self.assertIn('"patron": "Queuer"', messages[2])
+        self.assertIn("event: counts", messages[3])
+
+    async def test_broker_wakes_subscribers_from_other_threads(self):
+        subscription = broker.subscribe()
+        try:
+            await sync_to_async(broker.publish, thread_sensitive=False)()
+            await asyncio.wait_for(subscription[1].wait(), timeout=1)
+        finally:
+            broker.unsubscribe(subscription)
+
+    def test_stream_is_for_librarians_only(self):
+        url = reverse("users:librarian_queue_stream")
+        self.client.login(username="queuer", password="pass")
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.login(username="queuelib", password="pass")
+        response = self.client.get(url, HTTP_LAST_EVENT_ID="7")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertTrue(response.streaming)
+
+
+class RollupAnalyticsTests(TestCase):
+    def setUp(self):
+        self.librarian = UserProfile.objects.create(
+            user=User.objects.create_user(username="rolluplib", password="pass"),
+            name="Rollup Librarian",
+            email="rolluplib@test.com",
+            user_type="librarian",
+        )
+        self.patron = User.objects.create_user(username="rollpatron", password="pass")
+        self.profile = UserProfile.objects.create(
+            user=self.patron, name="Roll Patron", email="rollpatron@test.com"
+        )
+        self.tent = Item.objects.create(title="Tent", location="in_store", quantity=3)
+        self.stove = Item.objects.create(title="Stove", location="in_store")
+        self.collection = Collection.objects.create(title="Camping")
+        self.collection.items.add(self.tent)
+        self.today = timezone.localdate()
+        self.day = self.today - timedelta(days=3)
+
+    def at(self, day, hour=12):
+        return RollupService.day_start(day) + timedelta(hours=hour)
+
+    def borrow(self, item, borrowed, returned=None):
+        record = BorrowHistory.objects.create(item=item, user=self.profile)
+        BorrowHistory.objects.filter(id=record.id).update(
+            borrowed_at=borrowed, returned_at=returned
+        )
+
+    def seed(self):
+        self.borrow(self.tent, self.at(self.day), self.at(self.day + timedelta(days=2)))
+        self.borrow(self.tent, self.at(self.day, 14))
+        self.borrow(self.tent, self.at(self.day - timedelta(days=10)))
+        rejected = RentalRequest.objects.create(
+            item=self.stove, patron=self.profile, status="rejected"
+        )
+        RentalRequest.objects.filter(id=rejected.id).update(
+            request_date=self.at(self.day), approved_date=self.at(self.day, 15)
+        )
+        entry = WishlistEntry.objects.create(user_profile=self.profile, item=self.stove)
+        WishlistEntry.objects.filter(id=entry.id).update(
+            date_added=self.at(self.day + timedelta(days=1))
+        )
+
+    def test_build_rolls_up_each_metric_per_item_and_day(self):
+        self.seed()
+
+        days, rows = RollupService.build()
+
+        self.assertEqual(days, 13)
+        stats = {(s.item_id, s.day): s for s in ItemDailyStats.objects.all()}
+        tent = stats[(self.tent.id, self.day)]
+        self.assertEqual((tent.borrows, tent.returns, tent.outstanding), (2, 0, 3))
+        returned = stats[(self.tent.id, self.day + timedelta(days=2))]
+        self.assertEqual((returned.returns, returned.outstanding), (1, 2))
+        self.assertEqual(returned.loan_duration, timedelta(days=2))
+        stove = stats[(self.stove.id, self.day)]
+        self.assertEqual((stove.requests, stove.rejections), (1, 1))
+        self.assertEqual(
+            stats[(self.stove.id, self.day + timedelta(days=1))].wishlist_adds, 1
+        )
+        self.assertEqual(rows, len(stats))
+        self.assertEqual(
+            RollupService.high_water_mark(), self.today - timedelta(days=1)
+        )
+
+    def test_build_is_incremental_from_the_high_water_mark(self):
+        self.seed()
+        RollupService.build(until=self.day)
+        self.assertEqual(RollupService.high_water_mark(), self.day)
+
+        days, _ = RollupService.build()
+
+        self.assertEqual(days, 2)
+        self.assertEqual(RollupService.build(), (0, 0))
+        latest = ItemDailyStats.objects.get(
+            item=self.tent, day=self.day + timedelta(days=2)
+        )
+        self.assertEqual(latest.outstanding, 2)
+
+    def test_windows_carry_outstanding_forward(self):
+        self.seed()
+        RollupService.build(window_days=1)
+        single = {
+            (s.item_id, s.day): s.outstanding for s in ItemDailyStats.objects.all()
+        }
+
+        RollupService.build(since=self.day - timedelta(days=10))
+
+        self.assertEqual(
+            single,
+            {(s.item_id, s.day): s.outstanding for s in ItemDailyStats.objects.all()},
+        )
+
+    def test_analytics_reads_only_rollups(self):
+        self.seed()
+        RollupService.build()
+        start, end = AnalyticsService.date_range(30)
+
+        with self.assertNumQueries(5):
+            report = AnalyticsService.report(30)
+
+        self.assertEqual(report["totals"]["borrows"], 3)
+        self.assertEqual(report["totals"]["rejections"], 1)
+        self.assertEqual(report["top_items"][0]["item__title"], "Tent")
+        self.assertEqual(len(report["series"]), 30)
+        [camping] = report["collections"]
+        self.assertEqual(camping["title"], "Camping")
+        self.assertAlmostEqual(camping["average_loan_days"], 2.0)
+        self.assertAlmostEqual(report["percentiles"]["p50"], 2.0)
+
+    def test_percentiles_interpolate(self):
+        from gear.service.analytics.analytics_service import _percentiles
+
+        self.assertEqual(
+            _percentiles([1, 2, 3, 4, 5], (50, 90)), {"p50": 3, "p90": 4.6}
+        )
+        self.assertEqual(_percentiles([]), {})
+
+    def test_analytics_page_is_librarian_only(self):
+        self.seed()
+        call_command("build_rollups", stdout=io.StringIO())
+
+        self.client.login(username="rollpatron", password="pass")
+        self.assertEqual(self.client.get(reverse("gear:analytics")).status_code, 302)
+
+        self.client.login(username="rolluplib", password="pass")
+        response = self.client.get(reverse("gear:analytics"), {"days": "7"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["days"], 7)
+        self.assertContains(response, "Tent")
+
+
+class RecommendationTests(TestCase):
+    def setUp(self):
+        self.patrons = []
+        for name in ("ana", "ben", "cy"):
+            user = User.objects.create_user(username=f"rec{name}", password="pass")
+            self.patrons.append(
+                UserProfile.objects.create(
+                    user=user, name=name.title(), email=f"rec{name}@test.com"
+                )
+            )
+        self.tent = Item.objects.create(title="Tent", location="in_store")
+        self.stove = Item.objects.create(title="Stove", location="in_store")
+        self.lamp = Item.objects.create(title="Lamp", location="in_store")
+        self.day = timezone.localdate() - timedelta(days=3)
+
+    def at(self, day):
+        return RollupService.day_start(day) + timedelta(hours=12)
+
+    def borrow(self, patron, item, day):
+        record = BorrowHistory.objects.create(item=item, user=patron)
+        BorrowHistory.objects.filter(id=record.id).update(borrowed_at=self.at(day))
+
+    def wish(self, patron, item, day):
+        entry = WishlistEntry.objects.create(user_profile=patron, item=item)
+        WishlistEntry.objects.filter(id=entry.id).update(date_added=self.at(day))
+
+    def seed(self):
+        ana, ben, _ = self.patrons
+        self.borrow(ana, self.tent, self.day)
+        self.borrow(ana, self.stove, self.day)
+        self.borrow(ben, self.tent, self.day)
+        self.wish(ben, self.lamp, self.day)
+
+    def neighbours(self, item):
+        return [
+            (r.neighbour_id, round(r.score, 2))
+            for r in ItemRecommendation.objects.filter(item=item).order_by("rank")
+        ]
+
+    def test_build_scores_weighted_co_borrows(self):
+        self.seed()
+
+        self.assertEqual(RecommendationService.build(), 3)
+
+        self.assertEqual(
+            self.neighbours(self.tent), [(self.stove.id, 0.5), (self.lamp.id, 0.25)]
+        )
+        self.assertEqual(self.neighbours(self.lamp), [(self.tent.id, 1.0)])
+
+    def test_build_rescores_only_touched_items(self):
+        self.seed()
+        RecommendationService.build(until=self.day)
+        cy = self.patrons[2]
+        self.borrow(cy, self.stove, self.day + timedelta(days=1))
+        self.borrow(cy, self.lamp, self.day + timedelta(days=1))
+
+        self.assertEqual(RecommendationService.build(), 2)
+        self.assertEqual(RecommendationService.build(), 0)
+
+        self.assertCountEqual(
+            self.neighbours(self.stove), [(self.lamp.id, 0.5), (self.tent.id, 0.5)]
+        )
+        self.assertEqual(
+            self.neighbours(self.tent), [(self.stove.id, 0.5), (self.lamp.id, 0.25)]
+        )
+
+    def test_process_pool_matches_inline_scoring(self):
+        self.seed()
+        postings, baskets = RecommendationService.matrix(timezone.now())
+        inline = RecommendationService.score(postings, baskets, set(postings))
+
+        pooled = RecommendationService.score(
+            postings, baskets, set(postings), processes=2, chunk_size=1
+        )
+
+        self.assertEqual(pooled, inline)
+
+    def test_item_detail_lists_visible_neighbours_in_one_query(self):
+        self.seed()
+        RecommendationService.build()
+        private = Collection.objects.create(title="Staff Only", is_private=True)
+        private.items.add(self.lamp)
+
+        with self.assertNumQueries(1):
+            shown = RecommendationService.for_item(self.tent, AnonymousUser())
+        self.assertEqual(shown, [self.stove])
+
+        response = self.client.get(reverse("gear:item_detail", args=[self.tent.id]))
+        self.assertContains(response, "Patrons who borrowed this also borrowed")
+        self.assertEqual(response.context["recommendations"], [self.stove])
+
+
+class SimilarItemTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+        override = self.settings(SIMILARITY_INDEX_CACHE_DIR=self.tmp)
+        override.enable()
+        self.addCleanup(override.disable)
+        # Start with no mapped copy, and check the stored version every time.
+        for patcher in (
+            mock.patch("gear.service.similarity.similarity_service._mapped", None),
+            mock.patch("gear.service.similarity.similarity_service._checked_at", None),
+            mock.patch.object(SimilarityService, "CHECK_INTERVAL", 0),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.librarian = UserProfile.objects.create(
+            user=User.objects.create_user(username="simlib", password="pass"),
+            name="Sim Librarian",
+            email="simlib@test.com",
+            user_type="librarian",
+        )
+        self.dome = Item.objects.create(
+            title="Dome tent", description="Two person backpacking tent"
+        )
+        self.tunnel = Item.objects.create(
+            title="Tunnel tent", description="Family camping tent for six"
+        )
+        self.stove = Item.objects.create(
+            title="Camp stove", description="Gas stove for camping trips"
+        )
+        self.lamp = Item.objects.create(title="Headlamp", description="LED lamp")
+
+    def test_build_ranks_items_by_text_similarity(self):
+        self.assertEqual(SimilarityService.build(), 4)
+
+        similar = SimilarityService.similar_items(self.dome, AnonymousUser())
+
+        self.assertEqual(similar[0], self.tunnel)
+        self.assertNotIn(self.lamp, similar)
+        self.assertEqual(
+            SimilarityService.similar_items(self.lamp, AnonymousUser()), []
+        )
+
+    def test_create_and_edit_update_the_index_through_the_worker(self):
+        SimilarityService.build()
+        item = ItemService.create_item(
+            {
+                "title": "Ultralight tent",
+                "description": "Backpacking shelter",
+                "location": "in_store",
+            },
+            self.librarian.user,
+        )
+        self.assertEqual(Task.objects.get().name, "index_similar_item")
+        TaskService.run_until_empty()
+
+        self.assertEqual(
+            SimilarityService.similar_items(item, AnonymousUser())[0], self.dome
+        )
+
+        ItemService.edit_item(
+            item,
+            {
+                "title": "Lantern",
+                "description": "LED lamp",
+                "location": item.location,
+                "quantity": 1,
+            },
+        )
+        TaskService.run_until_empty()
+
+        self.assertEqual(
+            SimilarityService.similar_items(item, AnonymousUser()), [self.lamp]
+        )
+        self.assertNotIn(
+            item, SimilarityService.similar_items(self.dome, AnonymousUser())
+        )
+
+    def test_deleted_item_leaves_the_index_through_the_worker(self):
+        SimilarityService.build()
+        tunnel_id = self.tunnel.id
+
+        self.tunnel.delete()
+        self.assertEqual(Task.objects.get().name, "index_similar_item")
+        TaskService.run_until_empty()
+
+        mapped = SimilarityService.mapped()
+        self.assertEqual(mapped.rows, 3)
+        self.assertIsNone(mapped.row_of(tunnel_id))
+        self.assertNotIn(
+            tunnel_id, [neighbour for neighbour, _ in mapped.neighbours(self.dome.id)]
+        )
+
+    def test_removal_refills_the_neighbour_lists_it_emptied(self):
+        ids = [uuid.uuid4() for _ in range(3)]
+        index = SimilarityIndex.build(
+            zip(ids, ["red tent", "red tent blue", "tent stove"], ["", "", ""]), k=1
+        )
+        self.assertEqual(index.neighbours[0][0][0], 1)
+
+        self.assertTrue(index.remove(ids[1]))
+
+        self.assertEqual(index.ids, [ids[0], ids[2]])
+        self.assertEqual([pair[0] for pair in index.neighbours[0]], [1])
+        self.assertFalse(index.remove(ids[1]))
+
+    def test_edit_without_text_change_skips_the_index(self):
+        ItemService.edit_item(
+            self.lamp,
+            {
+                "title": self.lamp.title,
+                "description": self.lamp.description,
+                "location": "in_store",
+                "quantity": 3,
+            },
+        )
+
+        self.assertFalse(Task.objects.exists())
+
+    def test_processes_remap_a_rewritten_index(self):
+        SimilarityService.build()
+        first = SimilarityService.mapped()
+        self.assertIs(SimilarityService.mapped(), first)
+
+        SimilarityService.build()
+
+        self.assertIsNot(SimilarityService.mapped(), first)
+        self.assertEqual(SimilarityService.mapped().rows, 4)
+
+    def test_other_processes_load_the_stored_index(self):
+        SimilarityService.build()
+        self.assertEqual(os.listdir(self.tmp), ["similar_items-1.idx"])
+        # Another host: nothing mapped and an empty cache directory.
+        shutil.rmtree(self.tmp)
+        with mock.patch(
+            "gear.service.similarity.similarity_service._mapped", None
+        ), self.assertNumQueries(2):
+            mapped = SimilarityService.mapped()
+
+        self.assertEqual(mapped.rows, 4)
+        self.assertEqual(
+            SimilarityService.similar_items(self.dome, AnonymousUser())[0],
+            self.tunnel,
+        )
+
+        SimilarityService.build()
+        self.assertEqual(os.listdir(self.tmp), ["similar_items-2.idx"])
+
+    def test_strips_hide_private_items_and_collection_members(self):
+        SimilarityService.build()
+        camping = Collection.objects.create(title="Camping")
+        camping.items.add(self.dome)
+        vault = Collection.objects.create(title="Vault", is_private=True)
+        vault.items.add(self.stove)
+
+        response = self.client.get(reverse("gear:collection_detail", args=[camping.id]))
+        self.assertEqual(response.context["similar_items"], [self.tunnel])
+        self.assertContains(response, "Similar gear")
+
+        response = self.client.get(reverse("gear:item_detail", args=[self.tunnel.id]))
+        self.assertNotIn(self.stove, response.context["similar_items"])
+        self.client.login(username="simlib", password="pass")
+        response = self.client.get(reverse("gear:item_detail", args=[self.tunnel.id]))
+        self.assertIn(self.stove, response.context["similar_items"])
+
+
+class PopularityTests(TestCase):
+    def setUp(self):
+        self.today = timezone.localdate()
+        self.tent = Item.objects.create(title="Tent", location="in_store")
+        self.stove = Item.objects.create(title="Stove", location="in_store")
+        self.lamp = Item.objects.create(title="Lamp", location="in_store")
+        self.camping = Collection.objects.create(title="Camping")
+        self.camping.items.add(self.tent, self.stove)
+        self.library = Library.objects.create(title="Main")
+        self.library.collections.add(self.camping)
+        self.lamp.libraries.add(self.library)
+
+    def stats(self, item, days_ago, **counts):
+        ItemDailyStats.objects.create(
+            item=item, day=self.today - timedelta(days=days_ago), **counts
+        )
+
+    def test_activity_decays_by_half_life(self):
+        self.stats(self.tent, 1, borrows=1)
+        self.stats(self.stove, 15, borrows=1)
+
+        with self.settings(POPULARITY_HALF_LIFE_DAYS=14):
+            scores = PopularityService.item_scores(self.today)
+
+        self.assertAlmostEqual(scores[self.stove.id] / scores[self.tent.id], 0.5)
+        self.assertNotIn(self.lamp.id, scores)
+
+    def test_update_stores_scores_and_rolls_them_up(self):
+        self.stats(self.tent, 1, borrows=2)
+        self.stats(self.stove, 3, wishlist_adds=1)
+        self.stats(self.lamp, 400, borrows=50)
+        user = UserProfile.objects.create(
+            user=User.objects.create_user(username="popular", password="pass"),
+            name="Pop",
+            email="pop@test.com",
+        )
+        ItemReview.objects.create(item=self.lamp, user=user, rating=5)
+
+        self.assertEqual(PopularityService.update(), 3)
+
+        for obj in (self.tent, self.stove, self.lamp, self.camping, self.library):
+            obj.refresh_from_db()
+        self.assertGreater(self.tent.popularity, self.lamp.popularity)
+        self.assertGreater(self.lamp.popularity, self.stove.popularity)
+        self.assertAlmostEqual(self.lamp.popularity, 2.0)
+        self.assertAlmostEqual(
+            self.camping.popularity, self.tent.popularity + self.stove.popularity
+        )
+        self.assertAlmostEqual(
+            self.library.popularity, self.camping.popularity + self.lamp.popularity
+        )
+        self.assertEqual(PopularityService.update(), 0)
+
+    def test_home_pages_items_by_popularity(self):
+        Item.objects.bulk_create(
+            Item(title=f"Bulk {i}", location="online", popularity=i)
+            for i in range(1, 41)
+        )
+        Item.objects.filter(id=self.lamp.id).update(popularity=100)
+
+        response = self.client.get(reverse("gear:home"))
+        gear = response.context["all_gear"]
+        self.assertEqual(gear[0], self.library)
+        items = [g for g in gear if isinstance(g, Item)]
+        self.assertEqual(len(items), 40)
+        self.assertEqual(items[0], self.lamp)
+        self.assertEqual(items[-1].title, "Bulk 2")
+
+        response = self.client.get(
+            f"{reverse('gear:home')}?{response.context['next_query']}"
+        )
+        titles = [g.title for g in response.context["all_gear"]]
+        self.assertEqual(titles[0], "Bulk 1")
+        self.assertCountEqual(titles[1:], ["Stove", "Tent"])
+        self.assertNotIn("next_query", response.context)
+
+    def test_api_sorts_by_popularity(self):
+        Item.objects.filter(id=self.stove.id).update(popularity=5)
+
+        response = self.client.get(reverse("gear:api_items"), {"sort": "popular"})
+        self.assertEqual(response.json()["data"][0]["title"], "Stove")
+
+        response = self.client.get(reverse("gear:api_items"), {"sort": "newest"})
+        self.assertEqual(response.status_code, 400)
+
+
+class ReviewPaginationTests(TestCase):
+    def setUp(self):
+        self.item = Item.objects.create(title="Kayak", location="in_store")
+        self.quiet = Item.objects.create(title="Paddle", location="in_store")
+        base = timezone.now() - timedelta(days=30)
+        for i in range(25):
+            profile = UserProfile.objects.create(
+                user=User.objects.create(username=f"reviewer{i}"),
+                name=f"Reviewer {i}",
+                email=f"reviewer{i}@test.com",
+            )
+            review = ItemReview.objects.create(
+                item=self.item, user=profile, rating=i % 5 + 1, comment=f"Comment {i}"
+            )
+            ItemReview.objects.filter(id=review.id).update(
+                created_at=base + timedelta(hours=i)
+            )
+            if i < 2:
+                ItemReview.objects.create(item=self.quiet, user=profile, rating=4)
+
+    def test_summary_histogram(self):
+        summary = ReviewService.summary(self.item)
+
+        self.assertEqual(summary.count, 25)
+        self.assertEqual(summary.average, 3)
+        self.assertEqual(
+            summary.histogram,
+            [(5, 5, 20), (4, 5, 20), (3, 5, 20), (2, 5, 20), (1, 5, 20)],
+        )
+        self.assertEqual(
+            ReviewService.summary(
+                Item.objects.create(title="New", location="online")
+            ).histogram[0],
+            (5, 0, 0),
+        )
+
+    def test_more_reviews_fragment_walks_every_review_once(self):
+        response = self.client.get(reverse("gear:item_detail", args=[self.item.id]))
+        seen = [review.comment for review in response.context["reviews"]]
+        self.assertEqual(seen[0], "Comment 24")
+        cursor = response.context["next_cursor"]
+
+        while cursor:
+            response = self.client.get(
+                reverse("gear:item_reviews", args=[self.item.id]), {"cursor": cursor}
+            )
+            self.assertTemplateUsed(response, "detail/_review_list.html")
+            seen += [review.comment for review in response.context["reviews"]]
+            cursor = response.context["next_cursor"]
+
+        self.assertEqual(seen, [f"Comment {i}" for i in range(24, -1, -1)])
+        self.assertNotContains(response, "More reviews")
+        self.assertEqual(
+            self.client.get(
+                reverse("gear:item_reviews", args=[self.item.id]), {"cursor": "bad"}
+            ).status_code,
+            400,
+        )
+
+    def test_detail_queries_do_not_grow_with_reviews(self):
+        def count(item):
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get(reverse("gear:item_detail", args=[item.id]))
+            return len(queries)
+
+        # Check the similarity index version on both pages, not just the first.
+        with mock.patch.object(SimilarityService, "CHECK_INTERVAL", 0):
+            self.assertEqual(count(self.item), count(self.quiet))
+
+    def test_private_item_reviews_hidden_from_visitors(self):
+        vault = Collection.objects.create(title="Vault", is_private=True)
+        vault.items.add(self.item)
+
+        response = self.client.get(reverse("gear:item_reviews", args=[self.item.id]))
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ItemDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        ItemDetailService.cache.l1.clear()
+        self.item = Item.objects.create(title="Tent", location="in_store", quantity=3)
+        ItemImage.objects.create(item=self.item, image="item_images/tent.png")
+        self.camping = Collection.objects.create(title="Camping")
+        self.camping.items.add(self.item)
+        self.profile = UserProfile.objects.create(
+            user=User.objects.create(username="camper"),
+            name="Camper",
+            email="camper@test.com",
+        )
+        ItemReview.objects.create(item=self.item, user=self.profile, rating=4)
+
+    def queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            detail = ItemDetailService.get(self.item.id)
+        return detail, len(queries)
+
+    def test_cache_hit_only_checks_availability(self):
+        detail, misses = self.queries()
+        self.assertLessEqual(misses, 6)
+        self.assertEqual(detail.image_urls, [ItemImage.objects.get().image.url])
+        self.assertEqual([c.title for c in detail.collections], ["Camping"])
+        self.assertEqual(detail.review_summary.count, 1)
+
+        detail, hits = self.queries()
+        self.assertEqual(hits, 1)
+        self.assertEqual(detail.available_quantity, 3)
+
+    def test_availability_is_live(self):
+        self.queries()
+        BorrowHistory.objects.create(item=self.item, user=self.profile)
+
+        detail, hits = self.queries()
+
+        self.assertEqual(hits, 1)
+        self.assertEqual(detail.available_quantity, 2)
+
+    def test_changes_invalidate_the_cached_page(self):
+        self.queries()
+        self.item.title = "Dome tent"
+        self.item.save()
+        self.assertEqual(self.queries()[0].item.title, "Dome tent")
+
+        ItemImage.objects.create(item=self.item, image="item_images/fly.png")
+        self.assertEqual(len(self.queries()[0].image_urls), 2)
+
+        ItemReview.objects.create(
+            item=self.item,
+            user=UserProfile.objects.create(
+                user=User.objects.create(username="hiker"),
+                name="Hiker",
+                email="h@t.com",
+            ),
+            rating=2,
+        )
+        self.assertEqual(self.queries()[0].review_summary.count, 2)
+
+        self.camping.title = "Backpacking"
+        self.camping.save()
+        self.assertEqual(self.queries()[0].collections[0].title, "Backpacking")
+
+        self.camping.items.clear()
+        self.assertEqual(self.queries()[0].collections, [])
+
+        vault = Collection.objects.create(title="Vault", is_private=True)
+        MembershipService.set_collection_items(vault, [self.item.id])
+        self.assertTrue(self.queries()[0].is_private)
+
+    def test_view_uses_read_model(self):
+        url = reverse("gear:item_detail", args=[self.item.id])
+        self.client.get(url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertContains(response, "Quantity: 3")
+        self.assertNotIn(
+            '"gear_itemreview"',
+            " ".join(q["sql"] for q in queries.captured_queries),
+        )
+        self.assertEqual(
+            self.client.get(
+                reverse("gear:item_detail", args=[uuid.uuid4()])
+            ).status_code,
+            404,
+        )
+
+
+class FileDeleteTests(TestCase):
+    def setUp(self):
+        self.storage = ItemImage._meta.get_field("image").storage
+        self.storage.delete_batches.clear()
+
+    def save(self, name):
+        return self.storage.save(name, io.BytesIO(b"image"))
+
+    def test_delete_files_sends_batches_and_spares_the_default(self):
+        names = [self.save(f"item_images/delete-{i}.png") for i in range(3)]
+
+        tasks.delete_files(names + [DEFAULT_IMAGE, names[0]])
+
+        self.assertEqual(self.storage.delete_batches, [names])
+        self.assertFalse(any(self.storage.exists(name) for name in names))
+
+    def test_batches_hold_at_most_a_thousand_names(self):
+        names = [f"item_images/missing-{i}.png" for i in range(2500)]
+
+        self.assertEqual(delete_many(self.storage, names), [])
+        self.assertEqual(
+            [len(batch) for batch in self.storage.delete_batches], [1000, 1000, 500]
+        )
+
+    def test_undeleted_files_fail_the_task_for_a_retry(self):
+        stuck = self.save("item_images/stuck/keep.png").rsplit("/", 1)[0]
+        self.addCleanup(shutil.rmtree, self.storage.path(stuck))
+        task = tasks.enqueue("delete_files", {"names": [stuck]})
+
+        TaskService.run_until_empty()
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, "pending")
+        self.assertIn("FileDeleteError", task.last_error)
+
+    def test_replacing_images_queues_the_old_files(self):
+        item = Item.objects.create(title="Tent", location="in_store", quantity=1)
+        ItemImage.objects.create(item=item, image="item_images/old-tent.png")
+
+        ItemService.edit_item(
+            item,
+            {
+                "title": "Tent",
+                "description": "",
+                "location": "in_store",
+                "quantity": 1,
+            },
+            [SimpleUploadedFile("new.png", b"image", content_type="image/png")],
+        )
+
+        task = Task.objects.get(name="delete_files")
+        self.assertEqual(task.payload, {"names": ["item_images/old-tent.png"]})
+        self.assertEqual(item.images.count(), 1)
+
+
+class GcMediaTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = ItemImage._meta.get_field("image").storage
+
+        item = Item.objects.create(title="Tent", location="in_store")
+        for name in ("item_images/kept.png", DEFAULT_IMAGE):
+            ItemImage.objects.create(item=item, image=self.save(name))
+        self.orphans = [self.save(f"item_images/orphan-{i}.png") for i in range(3)]
+        self.save("user_images/default_profile.jpg")
+
+    def save(self, name):
+        saved = self.storage.save(name, io.BytesIO(b"image"))
+        self.assertEqual(saved, name)
+        return saved
+
+    def gc(self, *args):
+        out = io.StringIO()
+        call_command("gc_media", "--min-age-hours", "0", *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_lists_orphans_only(self):
+        output = self.gc("--dry-run")
+
+        for name in self.orphans:
+            self.assertIn(name, output)
+            self.assertTrue(self.storage.exists(name))
+        self.assertNotIn("kept.png", output)
+        self.assertIn("Scanned 6 files; 3 orphans would be deleted.", output)
+
+    def test_deletes_orphans_in_batches_and_keeps_defaults(self):
+        self.storage.delete_batches.clear()
+        output = self.gc("--batch-size", "2")
+
+        self.assertEqual([len(b) for b in self.storage.delete_batches], [2, 1])
+
+        self.assertIn("deleted 3 of 3 orphans", output)
+        self.assertFalse(any(self.storage.exists(name) for name in self.orphans))
+        for name in (
+            "item_images/kept.png",
+            DEFAULT_IMAGE,
+            "user_images/default_profile.jpg",
+        ):
+            self.assertTrue(self.storage.exists(name))
+
+    def test_orphan_reused_during_the_listing_is_kept(self):
+        reused = self.orphans[0]
+
+        def share(name):
+            # A new row points at the old file without writing it again.
+            if name == reused:
+                item = Item.objects.create(title="Tarp", location="in_store")
+                ItemImage.objects.create(item=item, image=name)
+
+        report = MediaService.collect(min_age=timedelta(0), on_orphan=share)
+
+        self.assertEqual((report.orphans, report.in_use, report.deleted), (3, 1, 2))
+        self.assertTrue(self.storage.exists(reused))
+        self.assertFalse(any(self.storage.exists(name) for name in self.orphans[1:]))
+
+    def test_recent_uploads_are_left_alone(self):
+        call_command("gc_media", stdout=io.StringIO())
+
+        self.assertTrue(all(self.storage.exists(name) for name in self.orphans))
+
+
+class ContentAddressedImageTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = ItemImage._meta.get_field("image").storage
+        self.tent = Item.objects.create(title="Tent", location="in_store")
+        self.stove = Item.objects.create(title="Stove", location="in_store")
+
+    def upload(self, name="photo.PNG", data=b"stock photo"):
+        return SimpleUploadedFile(name, data, content_type="image/png")
+
+    def test_identical_uploads_share_one_file(self):
+        first = ItemImage.objects.create(item=self.tent, image=self.upload())
+        second = ItemImage.objects.create(
+            item=self.stove, image=self.upload("copy.png")
+        )
+        other = ItemImage.objects.create(item=self.stove, image=self.upload(data=b"x"))
+
+        digest = hashlib.sha256(b"stock photo").hexdigest()
+        self.assertEqual(first.image.name, f"item_images/{digest[:2]}/{digest}.png")
+        self.assertEqual(second.image.name, first.image.name)
+        self.assertNotEqual(other.image.name, first.image.name)
+        self.assertEqual(len(list(self.storage.list_files("item_images/"))), 2)
+
+    def test_resaving_an_unchanged_image_uploads_nothing(self):
+        name = ItemImage.objects.create(item=self.tent, image=self.upload()).image.name
+        written = os.stat(self.storage.path(name)).st_mtime_ns
+        data = {
+            "title": "Tent",
+            "description": "",
+            "location": "in_store",
+            "quantity": 1,
+        }
+
+        ItemService.edit_item(self.tent, data, [self.upload()])
+
+        self.assertEqual(self.tent.images.get().image.name, name)
+        self.assertEqual(os.stat(self.storage.path(name)).st_mtime_ns, written)
+        task = Task.objects.get(name="delete_files")
+        self.assertGreater(task.run_after, timezone.now())
+        tasks.delete_files(**task.payload)
+        self.assertTrue(self.storage.exists(name))
+
+    def test_racing_identical_uploads_keep_one_file(self):
+        class RacingStorage(FileSystemStorage):
+            # The upload passed the existence check before the other saved.
+            racing = False
+
+            def exists(self, name):
+                if self.racing:
+                    self.racing = False
+                    return False
+                return super().exists(name)
+
+        storage = RacingStorage(location=self.storage.location)
+        name = "item_images/ab/same.png"
+        for _ in range(2):
+            storage.racing = True
+            self.assertEqual(save_once(storage, name, ContentFile(b"x")), name)
+
+        self.assertEqual(os.listdir(self.storage.path("item_images/ab")), ["same.png"])
+
+    def test_replacing_a_collection_image_queues_the_old_file(self):
+        collection = Collection.objects.create(title="Camping", image=self.upload())
+        old = collection.image.name
+
+        CollectionService.edit_collection(
+            collection,
+            {"title": "Camping", "description": "", "is_private": False},
+            image=self.upload(data=b"new photo"),
+        )
+
+        self.assertTrue(self.storage.exists(old))
+        task = Task.objects.get(name="delete_files")
+        self.assertEqual(task.payload, {"names": [old]})
+        tasks.delete_files(**task.payload)
+        self.assertFalse(self.storage.exists(old))
+        self.assertTrue(self.storage.exists(collection.image.name))
+
+    def test_files_are_kept_while_any_row_references_them(self):
+        shared = ItemImage.objects.create(item=self.tent, image=self.upload())
+        ItemImage.objects.create(item=self.stove, image=self.upload())
+        name = shared.image.name
+
+        shared.image.delete()
+        self.assertTrue(self.storage.exists(name))
+        task = Task.objects.get(name="delete_files")
+        self.assertEqual(task.payload, {"names": [name]})
+        tasks.delete_files(**task.payload)
+        task.delete()
+        self.assertTrue(self.storage.exists(name))
+
+        for item, kept in ((self.tent, True), (self.stove, False)):
+            item.delete()
+            task = Task.objects.get(name="delete_files")
+            tasks.delete_files(**task.payload)
+            task.delete()
+            self.assertEqual(self.storage.exists(name), kept)
+
+
+class StartupProfileTests(TestCase):
+    def test_parse_importtime(self):
+        imports = StartupService.parse_importtime(
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |   botocore.compat\n"
+            "import time:       900 |       1020 | boto3\n"
+            "Some warning\n"
+        )
+
+        self.assertEqual(
+            [(c.module, c.self_us, c.cumulative_us, c.depth) for c in imports],
+            [("botocore.compat", 120, 120, 1), ("boto3", 900, 1020, 0)],
+        )
+
+    def test_fresh_worker_renders_the_home_page_without_heavy_imports(self):
+        # The worker runs with production settings against its own database.
+        # Its speed is checked by the profile_startup step in CI, not here.
+        tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp)
+        env = {"DATABASE_URL": f"sqlite:///{os.path.join(tmp, 'db.sqlite3')}"}
+        subprocess.run(
+            [sys.executable, "manage.py", "migrate", "-v0"],
+            cwd=settings.BASE_DIR,
+            env={**os.environ, **env},
+            check=True,
+            capture_output=True,
+        )
+
+        with mock.patch.dict(os.environ, env):
+            profile = StartupService.profile("/")
+
+        self.assertEqual(profile.status, 200)
+        for module in ("boto3", "botocore", "PIL.Image", "numpy"):
+            self.assertNotIn(module, profile.modules)
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def tiered(self, namespace="test", **kwargs):
+        tiered = TieredCache(namespace, **kwargs)
+        self.addCleanup(TieredCache.instances.remove, tiered)
+        return tiered
+
+    def test_lru_evicts_the_least_recent_and_expires_entries(self):
+        now = [0.0]
+        lru = LRUCache(max_entries=2, ttl=10, clock=lambda: now[0])
+        lru.set("a", 1)
+        lru.set("b", 2)
+        lru.get("a")
+        lru.set("c", 3)
+
+        self.assertIs(lru.get("b"), MISSING)
+        self.assertEqual((lru.get("a"), lru.get("c")), (1, 3))
+        now[0] = 10
+        self.assertIs(lru.get("a"), MISSING)
+
+    def test_reads_through_both_tiers_and_counts_hits(self):
+        tiered = self.tiered(l1_ttl=60)
+        tiered.set("k", {"v": 1})
+        self.assertEqual(tiered.get("k"), {"v": 1})
+        tiered.l1.clear()
+        self.assertEqual(tiered.get("k"), {"v": 1})
+        self.assertEqual(tiered.get("k"), {"v": 1})
+        self.assertIsNone(tiered.get("missing"))
+
+        counts = CacheService.metrics()["test"]
+        self.assertEqual(
+            (counts["l1_hits"], counts["l2_hits"], counts["misses"]), (2, 1, 1)
+        )
+        self.assertEqual(counts["hit_rate"], 0.75)
+
+    def test_versions_and_generations_retire_keys(self):
+        tiered = self.tiered()
+        tiered.set("k", "old shape")
+        self.assertIsNone(self.tiered(version=2).get("k"))
+
+        other_worker = self.tiered()
+        tiered.invalidate_all()
+        self.assertIsNone(tiered.get("k"))
+        other_worker.l1.clear()
+        self.assertIsNone(other_worker.get("k"))
+
+    def test_sessions_stay_in_the_database_without_a_cache_store(self):
+        self.assertEqual(settings.CACHE_URL, "")
+        self.assertEqual(settings.SESSION_ENGINE, "django.contrib.sessions.backends.db")
+
+    @override_settings(SESSION_ENGINE="django.contrib.sessions.backends.cached_db")
+    def test_sessions_are_served_from_a_cache_store(self):
+        visitor = User.objects.create(username="visitor")
+        UserProfile.objects.create(user=visitor, name="Visitor", email="v@test.com")
+        self.client.force_login(visitor)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse("gear:home"))
+
+        self.assertFalse(
+            any("django_session" in q["sql"] for q in queries.captured_queries)
+        )
+
+    def test_prune_sessions_deletes_expired_rows_in_batches(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(
+                session_key=f"old{i}", session_data="", expire_date=now - timedelta(1)
+            )
+        Session.objects.create(
+            session_key="live", session_data="", expire_date=now + timedelta(1)
+        )
+        out = io.StringIO()
+
+        call_command("prune_sessions", "--batch-size", "2", stdout=out)
+
+        self.assertIn("Deleted 5 expired sessions.", out.getvalue())
+        self.assertEqual(
+            list(Session.objects.values_list("session_key", flat=True)), ["live"]
+        )
@@ -1,8 +1,13 @@
 from django.urls import path
 from gear.views.home import home_view
 from .views.add import add_item_view, add_collection_view, add_library_view
+from .views.add import import_catalog_view
 from gear.views.detail import item_detail_view, collection_detail_view
 from gear.views.detail import library_detail_view
+from gear.views.picker import picker_view
+from gear.views.export import export_view
+from gear.views.api import api_view
+from gear.views.analytics import analytics_view
 from gear.views.requests.rentals.librarian_rental_view import (
     librarian_rentals,
     approve_rental_request,
@@ -25,7 +30,34 @@ urlpatterns = [
     path("add/item", add_item_view.add_item, name="add_item"),
     path("add/collection", add_collection_view.add_collection, name="add_collection"),
     path("add/library", add_library_view.add_library, name="add_library"),
+    path("add/catalog", import_catalog_view.import_catalog, name="import_catalog"),
+    path("picker/items/", picker_view.picker_items, name="picker_items"),
+    path(
+        "picker/collections/",
+        picker_view.picker_collections,
+        name="picker_collections",
+    ),
+    path("api/v1/items/", api_view.api_items, name="api_items"),
+    path(
+        "api/v1/items/<uuid:item_id>/availability/",
+        api_view.api_item_availability,
+        name="api_item_availability",
+    ),
+    path("api/v1/collections/", api_view.api_collections, name="api_collections"),
+    path("api/v1/libraries/", api_view.api_libraries, name="api_libraries"),
+    path("analytics/", analytics_view.analytics, name="analytics"),
+    path("export/", export_view.export_index, name="export_index"),
+    path(
+        "export/<str:dataset>/",
+        export_view.export_dataset,
+        name="export_dataset",
+    ),
     path("item/<uuid:item_id>/", item_detail_view.item_detail, name="item_detail"),
+    path(
+        "item/<uuid:item_id>/reviews/",
+        item_detail_view.item_reviews,
+        name="item_reviews",
+    ),
     path("item/<uuid:item_id>/edit/", item_detail_view.edit_item, name="item_edit"),
     path(
         "item/<uuid:item_id>/delete/", item_detail_view.delete_item, name="item_delete"
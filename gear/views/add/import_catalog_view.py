@@ -0,0 +1,70 @@
+import io
+import tempfile
+
+from django.contrib import messages
+from django.contrib.auth.decorators import user_passes_test
+from django.shortcuts import render
+from gear.forms.import_catalog_form import ImportCatalogForm
+from gear.service.catalog.catalog_service import CatalogImportError
+from gear.service.service_instances import _catalog_service
+from gear.views.base import is_librarian
+
+MAX_SHOWN_ERRORS = 100
+
+
+@user_passes_test(is_librarian, login_url="gear:home")
+def import_catalog(request):
+    report = None
+    if request.method == "POST":
+        form = ImportCatalogForm(request.POST, request.FILES)
+        if form.is_valid():
+            data = form.cleaned_data
+            # Web requests validate in-process; large files belong to the
+            # import_catalog management command and its worker pool.
+            with tempfile.NamedTemporaryFile(suffix=".zip") as archive:
+                image_path = None
+                if data["images"]:
+                    for chunk in data["images"].chunks():
+                        archive.write(chunk)
+                    archive.flush()
+                    image_path = archive.name
+
+                stream = io.TextIOWrapper(
+                    data["catalog"].file, encoding="utf-8-sig", newline=""
+                )
+                try:
+                    report = _catalog_service.import_catalog(
+                        stream,
+                        form.catalog_format,
+                        image_path=image_path,
+                        created_by=request.user.userprofile,
+                        dry_run=data["dry_run"],
+                    )
+                except (CatalogImportError, UnicodeDecodeError) as e:
+                    form.add_error("catalog", str(e))
+                    messages.error(request, "Failed to import catalog.")
+                finally:
+                    stream.detach()
+
+            if report is not None:
+                if report.has_errors:
+                    messages.warning(
+                        request,
+                        f"{len(report.errors)} row(s) were skipped; see the list below.",
+                    )
+                elif data["dry_run"]:
+                    messages.success(request, f"All {report.rows} rows are valid.")
+                else:
+                    messages.success(
+                        request, f"Imported {report.created} items successfully!"
+                    )
+    else:
+        form = ImportCatalogForm()
+
+    context = {
+        "form": form,
+        "report": report,
+        "errors": report.errors[:MAX_SHOWN_ERRORS] if report else [],
+        "max_shown_errors": MAX_SHOWN_ERRORS,
+    }
+    return render(request, "add/import_catalog.html", context)
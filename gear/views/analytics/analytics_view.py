@@ -0,0 +1,31 @@
+from django.contrib.auth.decorators import user_passes_test
+from django.shortcuts import render
+from gear.service.service_instances import (
+    _analytics_service,
+    _cache_service,
+    _rollup_service,
+)
+from gear.views.base import is_librarian
+
+RANGES = (7, 30, 90, 365)
+
+
+@user_passes_test(is_librarian, login_url="gear:home")
+def analytics(request):
+    try:
+        days = int(request.GET.get("days", _analytics_service.DEFAULT_DAYS))
+    except ValueError:
+        days = _analytics_service.DEFAULT_DAYS
+    if days not in RANGES:
+        days = _analytics_service.DEFAULT_DAYS
+
+    context = _analytics_service.report(days)
+    context.update(
+        {
+            "days": days,
+            "ranges": RANGES,
+            "rolled_up_through": _rollup_service.high_water_mark(),
+            "cache_metrics": _cache_service.metrics(),
+        }
+    )
+    return render(request, "analytics/analytics.html", context)
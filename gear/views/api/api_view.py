@@ -0,0 +1,80 @@
+import hashlib
+
+from django.http import JsonResponse
+from django.utils.cache import (
+    get_conditional_response,
+    patch_cache_control,
+    patch_vary_headers,
+)
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+from gear.service.api.api_service import ApiError
+from gear.service.pagination.pagination_service import InvalidCursor
+from gear.service.service_instances import _api_service
+from gear.views.base import is_librarian
+
+API_MAX_AGE = 60
+AVAILABILITY_MAX_AGE = 10
+
+
+def api_error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+def api_response(request, payload, max_age=API_MAX_AGE):
+    """JSON response with a content ETag, answering 304 when it matches.
+
+    What a visitor may see depends on who they are, so signed-in responses
+    are private to the browser and every response varies on the session.
+    """
+    response = JsonResponse(payload)
+    response["ETag"] = quote_etag(hashlib.sha1(response.content).hexdigest())
+    visibility = "private" if request.user.is_authenticated else "public"
+    patch_cache_control(response, max_age=max_age, **{visibility: True})
+    patch_vary_headers(response, ["Cookie"])
+    return get_conditional_response(request, etag=response["ETag"], response=response)
+
+
+def _list(request, resource):
+    try:
+        payload = _api_service.list_resource(
+            resource, request.user, is_librarian(request.user), request.GET
+        )
+    except ApiError as e:
+        return api_error(str(e), e.status)
+    except InvalidCursor as e:
+        return api_error(str(e), 400)
+
+    next_url = None
+    if payload["next_cursor"]:
+        query = request.GET.copy()
+        query["cursor"] = payload["next_cursor"]
+        next_url = request.build_absolute_uri(f"{request.path}?{query.urlencode()}")
+    payload["next"] = next_url
+    return api_response(request, payload)
+
+
+@require_GET
+def api_items(request):
+    return _list(request, "items")
+
+
+@require_GET
+def api_collections(request):
+    return _list(request, "collections")
+
+
+@require_GET
+def api_libraries(request):
+    return _list(request, "libraries")
+
+
+@require_GET
+def api_item_availability(request, item_id):
+    try:
+        payload = _api_service.item_availability(
+            item_id, request.user, is_librarian(request.user)
+        )
+    except ApiError as e:
+        return api_error(str(e), e.status)
+    return api_response(request, payload, max_age=AVAILABILITY_MAX_AGE)
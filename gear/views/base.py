@@ -1,6 +1,13 @@
+from functools import wraps
+
 from users.service.service_instances import _librarian_service, _patron_service
+from django.contrib import messages
+from django.http import HttpResponse, HttpResponseBadRequest, HttpResponseRedirect
 from django.shortcuts import render
 from ..models import Collection
+from ..service.service_instances import _idempotency_service
+
+IDEMPOTENCY_FIELD = "idempotency_key"
 
 
 def is_librarian(user):
@@ -11,6 +18,53 @@ def is_patron(user):
     return _patron_service.is_patron(user)
 
 
+def idempotent(view):
+    """Run a POST at most once per ``Idempotency-Key`` header or form field.
+
+    A retry with a key that already finished replays the stored redirect
+    after one lookup instead of doing the work again.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = _idempotency_service.clean_key(
+            request.headers.get("Idempotency-Key")
+            or request.POST.get(IDEMPOTENCY_FIELD)
+        )
+        if request.method != "POST" or key is None:
+            return view(request, *args, **kwargs)
+
+        profile = request.user.userprofile
+        seen = _idempotency_service.reserve(profile, key, request.path)
+        if seen is not None:
+            if seen.path != request.path:
+                return HttpResponseBadRequest(
+                    "This idempotency key was already used for another request."
+                )
+            if seen.status_code is None:
+                messages.info(request, "Your request is already being processed.")
+                return HttpResponseRedirect(
+                    request.META.get("HTTP_REFERER") or request.path
+                )
+            messages.info(request, "This request was already submitted.")
+            if seen.location:
+                return HttpResponseRedirect(seen.location)
+            return HttpResponse(status=seen.status_code)
+
+        try:
+            response = view(request, *args, **kwargs)
+        except Exception:
+            _idempotency_service.release(profile, key)
+            raise
+        if response.status_code >= 500:
+            _idempotency_service.release(profile, key)
+        else:
+            _idempotency_service.complete(profile, key, response)
+        return response
+
+    return wrapper
+
+
 def collection_detail(request, collection_id):
     collection = Collection.objects.get(id=collection_id)
     if collection.created_by and is_patron(collection.created_by.userprofile):
@@ -5,7 +5,7 @@ from django.shortcuts import redirect
 from gear.forms.add_collection_form import CollectionForm
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
-from gear.models import CollectionItem
+from gear.service.service_instances import _collection_service, _similarity_service
 
 
 def is_librarian(user):
@@ -38,12 +38,17 @@ def collection_detail(request, collection_id):
             id=user.userprofile.id
         ).exists()
 
+    similar_items = _similarity_service.similar_to_collection(
+        collection, user, is_librarian=user_is_librarian
+    )
+
     context = {
         "collection": collection,
         "creator_text": creator_text,
         "user_is_librarian": user_is_librarian,
         "user_is_creator": user_is_creator,
         "user_has_access": user_has_access,
+        "similar_items": similar_items,
     }
     return render(request, "detail/collection_detail.html", context)
 
@@ -56,30 +61,20 @@ def edit_collection(request, collection_id):
         form = CollectionForm(request.POST, request.FILES, user=request.user)
 
         if form.is_valid():
-            items = form.cleaned_data["items"]
-            collection.title = form.cleaned_data["title"]
-            collection.description = form.cleaned_data["description"]
-            collection.is_private = form.cleaned_data["is_private"]
-            collection.items.set(items)
-            if collection.is_private and items:
-                CollectionItem.objects.filter(
-                    item__in=items, collection__is_private=False
-                ).delete()
-
-            collection.allowed_users.set(form.cleaned_data["allowed_users"])
-
-            new_image = form.cleaned_data.get("image")
-            if new_image:
-                if collection.image:
-                    collection.image.delete(save=False)
-                collection.image = new_image
-
-            collection.save()
-            messages.success(
-                request,
-                f"Collection '{collection.title}' has been updated successfully.",
+            result = _collection_service.edit_collection(
+                collection, form.cleaned_data, form.cleaned_data.get("image")
             )
-            return redirect("gear:collection_detail", collection_id=collection.id)
+
+            if isinstance(result, Exception):
+                collection.refresh_from_db()
+                form.add_error(None, result)
+                messages.error(request, "Failed to update collection.")
+            else:
+                messages.success(
+                    request,
+                    f"Collection '{collection.title}' has been updated successfully.",
+                )
+                return redirect("gear:collection_detail", collection_id=collection.id)
 
     else:
         form = CollectionForm(
@@ -87,8 +82,8 @@ def edit_collection(request, collection_id):
                 "title": collection.title,
                 "description": collection.description,
                 "is_private": collection.is_private,
-                "items": collection.items.all(),
-                "allowed_users": collection.allowed_users.all(),
+                "items": collection.items.values_list("id", flat=True),
+                "allowed_users": collection.allowed_users.values_list("id", flat=True),
             },
             user=request.user,
         )
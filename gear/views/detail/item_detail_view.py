@@ -2,28 +2,35 @@ from django.shortcuts import render, get_object_or_404
 from gear.forms.request_rental_form import Request_Rental_Form
 from gear.forms.review_form import ReviewForm
 from gear.models import Item
-from gear.views.base import is_librarian, is_patron
+from gear.views.base import idempotent, is_librarian, is_patron
 from users.service.patron.patron_service import PatronService, RentalRequestError
 from users.service.librarian.librarian_service import LibrarianService
+from gear.service.service_instances import (
+    _item_service,
+    _recommendation_service,
+    _review_service,
+    _similarity_service,
+)
 from django.shortcuts import redirect
-from django.http import HttpResponseForbidden
+from django.http import Http404, HttpResponseBadRequest, HttpResponseForbidden
+from django.views.decorators.http import require_GET
+from gear.service.pagination.pagination_service import InvalidCursor
+from gear.service.item.item_detail_service import ItemDetailService
 from gear.forms.add_item_form import ItemForm
 from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
 
 
 def item_detail(request, item_id):
-    item = get_object_or_404(Item, id=item_id)
-    if (
-        item.collections.filter(is_private=True).exists()
-        and not request.user.is_authenticated
-    ):
+    detail = ItemDetailService.get(item_id)
+    if detail is None:
+        raise Http404("Item not found.")
+    if detail.is_private and not request.user.is_authenticated:
         return redirect("gear:home")
+    item = detail.item
 
     rental_form = Request_Rental_Form()
     review_form = ReviewForm()
-    collections = item.collections.all()
-    reviews = item.reviews.all().order_by("-created_at")
 
     user_type = None
     if request.user.is_authenticated:
@@ -32,17 +39,48 @@ def item_detail(request, item_id):
         elif LibrarianService.is_librarian(request.user):
             user_type = "librarian"
 
+    is_librarian = user_type == "librarian"
+    recommendations = _recommendation_service.for_item(
+        item, request.user, is_librarian=is_librarian
+    )
+    similar_items = _similarity_service.similar_items(
+        item, request.user, is_librarian=is_librarian
+    )
+
     context = {
         "item": item,
         "user_type": user_type,
         "rental_form": rental_form,
         "review_form": review_form,
-        "reviews": reviews,
-        "collections": collections,
+        "image_urls": detail.image_urls,
+        "available_quantity": detail.available_quantity,
+        "reviews": detail.reviews,
+        "next_cursor": detail.next_cursor,
+        "review_summary": detail.review_summary,
+        "collections": detail.collections,
+        "recommendations": recommendations,
+        "similar_items": similar_items,
     }
     return render(request, "detail/item_detail.html", context)
 
 
+@require_GET
+def item_reviews(request, item_id):
+    """The next page of reviews as an HTML fragment for "More reviews"."""
+    item = get_object_or_404(Item, id=item_id)
+    if (
+        item.collections.filter(is_private=True).exists()
+        and not request.user.is_authenticated
+    ):
+        raise Http404("Item not found.")
+    try:
+        reviews, next_cursor = _review_service.page(item, request.GET.get("cursor"))
+    except InvalidCursor:
+        return HttpResponseBadRequest("Invalid cursor.")
+    context = {"item": item, "reviews": reviews, "next_cursor": next_cursor}
+    return render(request, "detail/_review_list.html", context)
+
+
 @user_passes_test(is_librarian, login_url="gear:home")
 def delete_item(request, item_id):
     if request.method == "POST":
@@ -69,16 +107,9 @@ def edit_item(request, item_id):
         form = ItemForm(request.POST, request.FILES)
 
         if form.is_valid():
-            item.title = form.cleaned_data["title"]
-            item.description = form.cleaned_data["description"]
-            item.location = form.cleaned_data["location"]
-            item.quantity = form.cleaned_data["quantity"]
-            item.save()
-
-            if request.FILES.getlist("images"):
-                item.images.all().delete()
-                for image in request.FILES.getlist("images"):
-                    item.images.create(image=image)
+            _item_service.edit_item(
+                item, form.cleaned_data, request.FILES.getlist("images")
+            )
 
             messages.success(
                 request, f"Item '{item.title}' has been updated successfully."
@@ -99,6 +130,7 @@ def edit_item(request, item_id):
 
 
 @user_passes_test(is_patron, login_url="gear:home")
+@idempotent
 def request_rent_item(request, item_id):
     if request.method == "POST":
         item = get_object_or_404(Item, id=item_id)
@@ -137,6 +169,7 @@ def request_rent_item(request, item_id):
 
 
 @user_passes_test(is_patron, login_url="gear:home")
+@idempotent
 def leave_review(request, item_id):
 
     if request.method == "POST":
@@ -76,15 +76,8 @@ def library_detail(request, library_id):
 def edit_library(request, library_id):
     library = get_object_or_404(Library, id=library_id)
 
-    # Get search queries from GET parameters
-    item_search_query = request.GET.get('item_search', '')
-    collection_search_query = request.GET.get('collection_search', '')
-
     if request.method == "POST":
-        # Pass user and search queries to the form
-        form = LibraryForm(request.POST, request.FILES, user=request.user, 
-                           item_search_query=item_search_query, 
-                           collection_search_query=collection_search_query)
+        form = LibraryForm(request.POST, request.FILES, user=request.user)
 
         if form.is_valid():
             library.title = form.cleaned_data["title"]
@@ -103,25 +96,20 @@ def edit_library(request, library_id):
         else:
             messages.error(request, "Please correct the errors below.")
     else:
-        # Pass user and search queries to the form for initial rendering
+        # The pickers only render the current selection, so ids are enough
         form = LibraryForm(
             initial={
                 "title": library.title,
                 "description": library.description,
-                "collections": library.collections.all(),
-                "items": library.items.all(),
+                "collections": library.collections.values_list("id", flat=True),
+                "items": library.items.values_list("id", flat=True),
             },
             user=request.user,
-            item_search_query=item_search_query, 
-            collection_search_query=collection_search_query
         )
 
-    # Add search queries to context for the template
     context = {
         "form": form,
         "library": library, # Pass library for context
-        "item_search_query": item_search_query,
-        "collection_search_query": collection_search_query,
     }
 
     return render(
@@ -0,0 +1,54 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import user_passes_test
+from django.contrib.auth.views import redirect_to_login
+from django.http import (
+    Http404,
+    HttpResponseBadRequest,
+    HttpResponseNotAllowed,
+    StreamingHttpResponse,
+)
+from django.shortcuts import render
+from django.utils import timezone
+from gear.service.export.export_service import EXPORT_FORMATS, EXPORTS
+from gear.service.service_instances import _export_service
+from gear.views.base import is_librarian
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "jsonl": "application/x-ndjson; charset=utf-8",
+}
+
+
+@user_passes_test(is_librarian, login_url="gear:home")
+def export_index(request):
+    datasets = [(name, name.replace("_", " ").title()) for name in EXPORTS]
+    context = {"datasets": datasets, "formats": EXPORT_FORMATS}
+    return render(request, "export/export_index.html", context)
+
+
+async def export_dataset(request, dataset):
+    """Stream an export as the client reads it.
+
+    Async so that, under ASGI, rows are sent chunk by chunk instead of being
+    collected into one body first. The method and librarian checks are
+    inline because Django 4.2's view decorators only wrap sync views.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+    if not await sync_to_async(is_librarian)(request.user):
+        return redirect_to_login(request.get_full_path(), "gear:home")
+    if dataset not in EXPORTS:
+        raise Http404("Unknown export.")
+    fmt = request.GET.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return HttpResponseBadRequest("Format must be csv or jsonl.")
+
+    # Rows are pulled from a database cursor as the client reads them, so
+    # memory use stays flat however large the table is.
+    response = StreamingHttpResponse(
+        _export_service.astream(dataset, fmt), content_type=CONTENT_TYPES[fmt]
+    )
+    filename = f"gearup-{dataset}-{timezone.now():%Y%m%d}.{fmt}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    response["Cache-Control"] = "no-store"
+    return response
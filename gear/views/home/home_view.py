@@ -6,22 +6,29 @@ from django.shortcuts import redirect, get_object_or_404
 from django.shortcuts import render
 from gear.models import Library, Collection, Item
 from django.views.decorators.http import require_POST
-from gear.service.service_instances import _item_service
-from gear.views.base import is_patron
+from gear.service.pagination.pagination_service import InvalidCursor
+from gear.service.service_instances import (
+    _collection_service,
+    _item_service,
+    _pagination_service,
+    _popularity_service,
+)
+from gear.views.base import idempotent, is_librarian, is_patron
 from django.contrib.auth.decorators import user_passes_test
 from django.db.models import Q
 
+HOME_PAGE_SIZE = 40
 
-def home(request):
-    libraries = Library.objects.all()
 
-    # Filter collections based on user authentication status
-    if request.user.is_authenticated:
-        collections = Collection.objects.all()
-    else:
-        collections = Collection.objects.filter(is_private=False)
+def home(request):
+    ordering = _popularity_service.ORDERING
+    libraries = Library.objects.order_by(*ordering)
 
-    items = Item.objects.all()
+    # Private collections and their items are filtered by the shared
+    # visibility rules, which the JSON API applies as well.
+    collections = _collection_service.get_visible_collections(request.user)
+    collections = collections.order_by(*ordering)
+    items = _item_service.get_visible_items(request.user, is_librarian(request.user))
 
     # Handle search
     search_query = request.GET.get("search", "")
@@ -36,22 +43,25 @@ def home(request):
             Q(title__icontains=search_query) | Q(description__icontains=search_query)
         )
 
-    if request.user.is_authenticated:
-        if request.user.userprofile.user_type != "librarian":
-            items = items.filter(
-                ~Q(collections__is_private=True)
-                | Q(
-                    collections__is_private=True,
-                    collections__allowed_users=request.user.userprofile,
-                )
-            )
-    else:
-        items = items.exclude(collections__is_private=True)
-
-    items = items.distinct()
-
     filter_type = request.GET.get("filter", "all")
 
+    # Items, the long list, come a page at a time in popularity order;
+    # libraries and collections lead the first page only.
+    cursor = request.GET.get("cursor")
+    items = items.prefetch_related("collections")
+    try:
+        items, next_cursor = _pagination_service.keyset_page(
+            items, ordering, cursor, HOME_PAGE_SIZE
+        )
+    except InvalidCursor:
+        cursor = None
+        items, next_cursor = _pagination_service.keyset_page(
+            items, ordering, None, HOME_PAGE_SIZE
+        )
+    if cursor:
+        libraries = libraries.none()
+        collections = collections.none()
+
     all_gear = []
 
     context = {
@@ -89,10 +99,11 @@ def home(request):
         if not all_gear:
             all_gear = list(collections) + list(items) + list(libraries)
 
-    # Prefetch related collections for items before passing to context
-    items = items.prefetch_related("collections")
-
     context["all_gear"] = all_gear
+    if next_cursor and any(isinstance(gear, Item) for gear in all_gear):
+        params = request.GET.copy()
+        params["cursor"] = next_cursor
+        context["next_query"] = params.urlencode()
 
     context["debug_info"] = {
         "filter_applied": filter_type,
@@ -106,6 +117,7 @@ def home(request):
 
 
 @user_passes_test(is_patron, login_url="gear:home")
+@idempotent
 def add_to_wishlist(request, item_id):
     if request.method == "POST":
         item = get_object_or_404(Item, id=item_id)
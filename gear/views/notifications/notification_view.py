@@ -0,0 +1,29 @@
+from django.contrib import messages
+from django.contrib.auth.decorators import user_passes_test
+from django.shortcuts import redirect, render
+from django.views.decorators.http import require_POST
+from gear.service.service_instances import _notification_service
+from gear.views.base import is_patron
+
+
+@user_passes_test(is_patron, login_url="gear:home")
+def notifications(request):
+    user_profile = request.user.userprofile
+    rows, next_cursor = _notification_service.feed(
+        user_profile, request.GET.get("cursor")
+    )
+    context = {
+        "notifications": rows,
+        "next_cursor": next_cursor,
+        "is_first_page": not request.GET.get("cursor"),
+    }
+    return render(request, "notifications/notifications.html", context)
+
+
+@require_POST
+@user_passes_test(is_patron, login_url="gear:home")
+def mark_notifications_read(request):
+    updated = _notification_service.mark_all_read(request.user.userprofile)
+    if updated:
+        messages.success(request, f"Marked {updated} notifications as read.")
+    return redirect("users:notifications")
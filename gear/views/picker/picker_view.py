@@ -0,0 +1,88 @@
+from django.http import JsonResponse
+from django.views.decorators.http import require_GET
+from gear.models import DEFAULT_IMAGE, Collection, ItemImage
+from gear.service.pagination.pagination_service import InvalidCursor
+from gear.service.service_instances import (
+    _collection_service,
+    _item_service,
+    _pagination_service,
+)
+from gear.views.base import is_librarian
+
+PICKER_ORDERING = ("title", "id")
+
+
+def picker_page(request, queryset, ordering=PICKER_ORDERING):
+    """Keyset-paginate ``queryset`` using the ``limit``/``cursor`` query params."""
+    limit = _pagination_service.parse_limit(request.GET.get("limit"))
+    return _pagination_service.keyset_page(
+        queryset, ordering, request.GET.get("cursor"), limit
+    )
+
+
+def picker_response(results, next_cursor):
+    return JsonResponse({"results": results, "next_cursor": next_cursor})
+
+
+def picker_error(message, status):
+    return JsonResponse({"error": message}, status=status)
+
+
+@require_GET
+def picker_items(request):
+    if not request.user.is_authenticated:
+        return picker_error("Authentication required.", 403)
+
+    items = _item_service.search_items(
+        _item_service.get_pickable_items(request.user, is_librarian(request.user)),
+        request.GET.get("q", "").strip(),
+    )
+    try:
+        rows, next_cursor = picker_page(request, items)
+    except InvalidCursor as e:
+        return picker_error(str(e), 400)
+
+    storage = ItemImage._meta.get_field("image").storage
+    return picker_response(
+        [
+            {
+                "id": str(item.id),
+                "label": item.title,
+                "detail": item.description[:120],
+                "image": storage.url(item.first_image or DEFAULT_IMAGE),
+                "disabled": item.in_private,
+                "in_public": item.in_public,
+            }
+            for item in rows
+        ],
+        next_cursor,
+    )
+
+
+@require_GET
+def picker_collections(request):
+    if not is_librarian(request.user):
+        return picker_error("You don't have permission to search collections.", 403)
+
+    collections = _collection_service.search_collections(
+        request.GET.get("q", "").strip()
+    )
+    try:
+        rows, next_cursor = picker_page(request, collections)
+    except InvalidCursor as e:
+        return picker_error(str(e), 400)
+
+    storage = Collection._meta.get_field("image").storage
+    return picker_response(
+        [
+            {
+                "id": str(collection.id),
+                "label": collection.title,
+                "detail": "Private" if collection.is_private else "Public",
+                "image": storage.url(collection.image.name or DEFAULT_IMAGE),
+                "disabled": False,
+            }
+            for collection in rows
+        ],
+        next_cursor,
+    )
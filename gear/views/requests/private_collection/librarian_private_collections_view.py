@@ -3,6 +3,7 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib import messages
 from django.contrib.auth.decorators import user_passes_test
 from gear.models import CollectionAccessRequest
+from gear.service.service_instances import _dashboard_service
 from gear.views.base import is_librarian
 from users.service.librarian.librarian_service import LibrarianService
 
@@ -12,24 +13,10 @@ def librarian_private_collections(request):
     if not is_librarian(request.user):
         return HttpResponseForbidden("You don't have permission to access this page.")
 
-    requests_qs = (
-        CollectionAccessRequest.objects.all()
-        .order_by("-request_date")
-        .select_related("collection", "patron", "approved_by")
+    requests_qs = CollectionAccessRequest.objects.select_related(
+        "collection", "patron", "approved_by"
     )
-    pending_requests = requests_qs.filter(status="pending")
-    approved_requests = requests_qs.filter(status="approved")
-    rejected_requests = requests_qs.filter(status="rejected")
-
-    context = {
-        "requests": requests_qs,
-        "pending_requests": pending_requests,
-        "approved_requests": approved_requests,
-        "rejected_requests": rejected_requests,
-        "pending_count": pending_requests.count(),
-        "approved_count": approved_requests.count(),
-        "rejected_count": rejected_requests.count(),
-    }
+    context = _dashboard_service.collection_dashboard(requests_qs, request.GET)
 
     return render(request, "requests/librarian/private_collections.html", context)
 
@@ -2,35 +2,26 @@ from django.http import HttpResponseForbidden
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib import messages
 from gear.models import CollectionAccessRequest
+from gear.service.notification.notification_service import COLLECTION_KINDS
+from gear.service.service_instances import (
+    _dashboard_service,
+    _notification_service,
+    _request_queue_service,
+)
 from gear.views.base import is_patron
 from django.contrib.auth.decorators import user_passes_test
-from django.utils import timezone
+from django.db import transaction
 
 
 @user_passes_test(is_patron, login_url="gear:home")
 def patron_private_collections(request):
     user_profile = request.user.userprofile
-    user_profile.last_viewed_collection_requests = timezone.now()
-    user_profile.save(update_fields=["last_viewed_collection_requests"])
+    _notification_service.mark_read(user_profile, COLLECTION_KINDS)
 
-    requests_qs = (
-        CollectionAccessRequest.objects.filter(patron=user_profile)
-        .order_by("-request_date")
-        .select_related("collection")
-    )
-    pending_requests = requests_qs.filter(status="pending")
-    approved_requests = requests_qs.filter(status="approved")
-    rejected_requests = requests_qs.filter(status="rejected")
-
-    context = {
-        "requests": requests_qs,
-        "pending_requests": pending_requests,
-        "approved_requests": approved_requests,
-        "rejected_requests": rejected_requests,
-        "pending_count": pending_requests.count(),
-        "approved_count": approved_requests.count(),
-        "rejected_count": rejected_requests.count(),
-    }
+    requests_qs = CollectionAccessRequest.objects.filter(
+        patron=user_profile
+    ).select_related("collection")
+    context = _dashboard_service.collection_dashboard(requests_qs, request.GET)
 
     return render(request, "requests/patron/private_collections.html", context)
 
@@ -48,7 +39,9 @@ def cancel_private_collection_request(request, request_id):
         messages.error(request, "Only pending requests can be cancelled.")
         return redirect("users:patron_private_collections")
 
-    access_request.delete()
+    with transaction.atomic():
+        _request_queue_service.record("collection", "cancelled", access_request.id)
+        access_request.delete()
     messages.success(
         request, f"Request for '{access_request.collection.title}' has been cancelled."
     )
@@ -0,0 +1,34 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseForbidden, StreamingHttpResponse
+from gear.service.service_instances import _request_queue_service
+from gear.views.base import is_librarian
+
+
+def _last_event_id(request):
+    raw = request.headers.get("Last-Event-ID") or request.GET.get("last_event_id")
+    try:
+        return max(int(raw), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+async def librarian_queue_stream(request):
+    """Server-sent events for new and resolved pending requests.
+
+    Needs an ASGI server so an open stream does not hold a worker thread.
+    Reconnecting browsers send ``Last-Event-ID`` and resume from there.
+    """
+    if not await sync_to_async(is_librarian)(request.user):
+        return HttpResponseForbidden("Only librarians can follow the request queue.")
+
+    high_water_mark = _last_event_id(request)
+    if high_water_mark is None:
+        high_water_mark = await sync_to_async(_request_queue_service.high_water_mark)()
+
+    response = StreamingHttpResponse(
+        _request_queue_service.stream(high_water_mark),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
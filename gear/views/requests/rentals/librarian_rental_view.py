@@ -2,6 +2,7 @@ from django.http import HttpResponseForbidden, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib.auth.decorators import user_passes_test
 from gear.models import RentalRequest, BorrowHistory, Item
+from gear.service.service_instances import _dashboard_service, _wishlist_alert_service
 from gear.views.base import is_librarian
 from users.service.librarian.librarian_service import LibrarianService
 from django.contrib import messages
@@ -19,24 +20,8 @@ def librarian_rentals(request):
     if not LibrarianService.is_librarian(request.user):
         return HttpResponseForbidden("You don't have permission to access this page.")
 
-    requests = (
-        RentalRequest.objects.all()
-        .order_by("-request_date")
-        .select_related("item", "patron", "approved_by")
-    )
-    pending_requests = requests.filter(status="pending")
-    approved_requests = requests.filter(status="approved")
-    rejected_requests = requests.filter(status="rejected")
-
-    context = {
-        "requests": requests,
-        "pending_requests": pending_requests,
-        "approved_requests": approved_requests,
-        "rejected_requests": rejected_requests,
-        "pending_count": pending_requests.count(),
-        "approved_count": approved_requests.count(),
-        "rejected_count": rejected_requests.count(),
-    }
+    requests = RentalRequest.objects.select_related("item", "patron", "approved_by")
+    context = _dashboard_service.rental_dashboard(requests, request.GET)
 
     return render(request, "requests/librarian/rentals.html", context)
 
@@ -85,17 +70,7 @@ def approve_rental_request(request, request_id):
 
     rental_request = get_object_or_404(RentalRequest, id=request_id)
 
-    if rental_request.status != "pending":
-        messages.error(request, "Only pending requests can be approved.")
-        return redirect("users:librarian_rentals")
-
-    if rental_request.quantity > rental_request.item.available_quantity:
-        messages.error(
-            request,
-            f"Not enough quantity available. Requested: {rental_request.quantity}, Available: {rental_request.item.available_quantity}",
-        )
-        return redirect("users:librarian_rentals")
-
+    # The service re-checks the status and stock under a row lock.
     result = LibrarianService.approve_rental_request(
         rental_request, request.user.userprofile
     )
@@ -118,10 +93,6 @@ def deny_rental_request(request, request_id):
 
     rental_request = get_object_or_404(RentalRequest, id=request_id)
 
-    if rental_request.status != "pending":
-        messages.error(request, "Only pending requests can be denied.")
-        return redirect("users:librarian_rentals")
-
     result = LibrarianService.deny_rental_request(
         rental_request, request.user.userprofile
     )
@@ -173,6 +144,7 @@ def return_items_view(request):
 
         actual_returned_count = 0
         with transaction.atomic():
+            available_before = item.available_quantity
             records_to_return = BorrowHistory.objects.select_for_update().filter(
                 user=patron, item=item, returned_at__isnull=True
             ).order_by('borrowed_at')[:quantity_to_return]
@@ -186,9 +158,12 @@ def return_items_view(request):
                 record.save()
                 actual_returned_count += 1
 
-            if item.available_quantity > 0 and item.status == 'rented_out':
+            available_after = item.available_quantity
+            if available_after > 0 and item.status == 'rented_out':
                 item.status = 'available'
                 item.save(update_fields=['status'])
+
+            _wishlist_alert_service.item_restocked(item, available_before, available_after)
             
         if actual_returned_count > 0:
           messages.success(
@@ -2,9 +2,16 @@ from django.http import HttpResponseForbidden
 from django.shortcuts import get_object_or_404, redirect, render
 from django.contrib import messages
 from gear.models import RentalRequest, BorrowHistory
+from gear.service.notification.notification_service import RENTAL_KINDS
+from gear.service.service_instances import (
+    _dashboard_service,
+    _notification_service,
+    _request_queue_service,
+    _wishlist_alert_service,
+)
 from gear.views.base import is_patron
 from django.contrib.auth.decorators import user_passes_test
-from django.utils import timezone
+from django.db import transaction
 from collections import defaultdict
 from django.db.models import Min, Max
 
@@ -12,27 +19,9 @@ from django.db.models import Min, Max
 @user_passes_test(is_patron, login_url="gear:home")
 def patron_rentals(request):
     user_profile = request.user.userprofile
-    user_profile.last_viewed_rental_requests = timezone.now()
-    user_profile.save(update_fields=["last_viewed_rental_requests"])
-    requests = (
-        RentalRequest.objects.filter(patron=user_profile)
-        .order_by("-request_date")
-        .select_related("item")
-    )
-
-    pending_requests = requests.filter(status="pending")
-    approved_requests = requests.filter(status="approved")
-    rejected_requests = requests.filter(status="rejected")
-
-    context = {
-        "requests": requests,
-        "pending_requests": pending_requests,
-        "approved_requests": approved_requests,
-        "rejected_requests": rejected_requests,
-        "pending_count": pending_requests.count(),
-        "approved_count": approved_requests.count(),
-        "rejected_count": rejected_requests.count(),
-    }
+    _notification_service.mark_read(user_profile, RENTAL_KINDS)
+    requests = RentalRequest.objects.filter(patron=user_profile).select_related("item")
+    context = _dashboard_service.rental_dashboard(requests, request.GET)
 
     return render(request, "requests/patron/rentals.html", context)
 
@@ -50,7 +39,15 @@ def cancel_request(request, request_id):
         messages.error(request, "Only pending requests can be cancelled.")
         return redirect("users:patron_rentals")
 
-    rental_request.delete()
+    # Deleting the request cascades to its inventory hold.
+    item = rental_request.item
+    available_before = item.available_quantity
+    with transaction.atomic():
+        _request_queue_service.record("rental", "cancelled", rental_request.id)
+        rental_request.delete()
+    _wishlist_alert_service.item_restocked(
+        item, available_before, item.available_quantity
+    )
     messages.success(
         request, f"Request for '{rental_request.item.title}' has been cancelled."
     )
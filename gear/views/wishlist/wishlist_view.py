@@ -1,5 +1,5 @@
 from django.shortcuts import render
-from gear.service.service_instances import _item_service
+from gear.service.service_instances import _item_service, _wishlist_alert_service
 from django.shortcuts import redirect
 from gear.models import Item
 from gear.models import WishlistEntry
@@ -13,6 +13,7 @@ def wishlist(request):
     wishlist_items = _item_service.get_all_wishlist_items(request.user)
     context = {
         'wishlist_items': wishlist_items,
+        'restocked_item_ids': _wishlist_alert_service.take_unseen(request.user.userprofile),
     }
     print(wishlist_items)
     return render(request, 'wishlist/wishlist.html', context)
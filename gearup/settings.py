@@ -8,13 +8,21 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
 import sys
+import tempfile
 import dj_database_url
 import os
 from pathlib import Path
-from dotenv import load_dotenv
 from django.core.exceptions import ImproperlyConfigured
 
-load_dotenv()
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Deployments set the environment directly; only a checkout with a .env
+# file pays for reading it.
+if (BASE_DIR / ".env").exists():
+    from dotenv import load_dotenv
+
+    load_dotenv(BASE_DIR / ".env")
 
 
 def get_env_variable(var_name):
@@ -27,9 +35,6 @@ def get_env_variable(var_name):
 # Use the get_env_variable function for SECRET_KEY
 SECRET_KEY = get_env_variable("SECRET_KEY")
 
-# Build paths inside the project like this: BASE_DIR / 'subdir'.
-BASE_DIR = Path(__file__).resolve().parent.parent
-
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
 
@@ -54,7 +59,14 @@ AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY")
 AWS_STORAGE_BUCKET_NAME = "gearup-project-a14"
 AWS_S3_REGION_NAME = "us-east-2"
 AWS_S3_CUSTOM_DOMAIN = f"{AWS_STORAGE_BUCKET_NAME}.s3.amazonaws.com"
-DEFAULT_FILE_STORAGE = "storages.backends.s3boto3.S3Boto3Storage"
+
+# Tests write media to a throwaway directory instead of the bucket.
+if "test" in sys.argv:
+    DEFAULT_FILE_STORAGE = "gear.storage.LocalMediaStorage"
+    MEDIA_ROOT = os.path.join(tempfile.gettempdir(), "gearup-test-media")
+    MEDIA_URL = "/media/"
+else:
+    DEFAULT_FILE_STORAGE = "gear.s3_storage.S3MediaStorage"
 
 SOCIAL_AUTH_PIPELINE = (
     "social_core.pipeline.social_auth.social_details",
@@ -138,6 +150,64 @@ if "test" in sys.argv:
 else:
     DATABASES = {"default": dj_database_url.config(default=os.getenv("DATABASE_URL"))}
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Shared by every process on every host, so a signal that invalidates a
+# cached page is seen everywhere. CACHE_URL names an out-of-process store
+# (redis://, rediss:// or memcached://host:port). Without one the cache
+# falls back to a database table (migration gear 0032 runs
+# `createcachetable`), which is shared but costs a query per lookup.
+
+CACHE_URL = os.getenv("CACHE_URL", "")
+CACHE_BACKENDS = {
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+}
+
+if "test" in sys.argv:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+elif CACHE_URL:
+    scheme, _, address = CACHE_URL.partition("://")
+    if scheme not in CACHE_BACKENDS:
+        raise ImproperlyConfigured(
+            f"CACHE_URL must start with one of {sorted(CACHE_BACKENDS)}, "
+            f"not {scheme!r}."
+        )
+    CACHES = {
+        "default": {
+            "BACKEND": CACHE_BACKENDS[scheme],
+            # The memcached backends take a bare host:port.
+            "LOCATION": address if scheme == "memcached" else CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "gear_cache",
+            "OPTIONS": {
+                "MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "100000")),
+            },
+        }
+    }
+
+# Sessions are read through the cache only when it lives outside the
+# database; on the database cache, cached_db would add cache-table queries
+# on top of the session-table ones. Either way a flushed session is gone
+# on every host. `manage.py prune_sessions` deletes expired rows.
+if CACHE_URL:
+    SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+else:
+    SESSION_ENGINE = "django.contrib.sessions.backends.db"
+
+# In-process tier in front of the shared cache (gear.service.cache). A
+# change made in one worker reaches the others' copies within the TTL.
+CACHE_L1_MAX_ENTRIES = int(os.getenv("CACHE_L1_MAX_ENTRIES", "1000"))
+CACHE_L1_TTL = float(os.getenv("CACHE_L1_TTL", "5"))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -178,3 +248,41 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# How long a submitted rental request reserves its units before the hold
+# lapses and the stock is offered to other patrons again.
+RENTAL_HOLD_HOURS = int(os.getenv("RENTAL_HOLD_HOURS", "48"))
+
+# Hours an idempotency key is remembered. A retry after that, or after a
+# worker crashed mid-request, is processed again. `manage.py
+# prune_idempotency_keys` deletes expired keys.
+IDEMPOTENCY_KEY_TTL_HOURS = int(os.getenv("IDEMPOTENCY_KEY_TTL_HOURS", "24"))
+
+# Days for an item's borrows, wishlist adds and reviews to lose half their
+# weight in the popularity ranking.
+POPULARITY_HALF_LIFE_DAYS = float(os.getenv("POPULARITY_HALF_LIFE_DAYS", "14"))
+
+# TF-IDF similar-item index. The built index is stored in the database, so
+# web and worker processes on every host see the same one; each host keeps
+# memory-mapped copies in this directory. `manage.py build_similarity_index`
+# rebuilds it.
+if os.getenv("SIMILARITY_INDEX_PATH"):
+    raise ImproperlyConfigured(
+        "SIMILARITY_INDEX_PATH is no longer used: the similarity index is "
+        "stored in the database. Unset it, and set SIMILARITY_INDEX_CACHE_DIR "
+        "to move the local copies."
+    )
+SIMILARITY_INDEX_CACHE_DIR = os.getenv(
+    "SIMILARITY_INDEX_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "gearup-similarity"),
+)
+
+# Seconds an assembled item page stays cached. Edits, images, reviews and
+# collection changes invalidate it straight away; this only bounds staleness
+# from writes that skip model signals, such as queryset updates.
+ITEM_DETAIL_CACHE_SECONDS = int(os.getenv("ITEM_DETAIL_CACHE_SECONDS", "600"))
+
+# Seconds a queued image delete waits before checking whether any row still
+# references the file. Uploads are content-addressed and shared, so this
+# gives a transaction that is reusing the file time to commit.
+FILE_DELETE_DELAY = int(os.getenv("FILE_DELETE_DELAY", "300"))
@@ -0,0 +1,97 @@
+function initTypeaheadPicker(picker) {
+	const url = picker.dataset.searchUrl;
+	const name = picker.dataset.name;
+	const input = picker.querySelector(".typeahead-input");
+	const selected = picker.querySelector(".typeahead-selected");
+	const results = picker.querySelector(".typeahead-results");
+	const more = picker.querySelector(".typeahead-more");
+	let cursor = null;
+	let timeout;
+
+	function selectedIds() {
+		return new Set(Array.from(selected.querySelectorAll(".typeahead-chip")).map((chip) => chip.dataset.id));
+	}
+
+	function bindRemove(chip) {
+		chip.querySelector(".typeahead-remove").addEventListener("click", () => chip.remove());
+	}
+
+	function addChip(row) {
+		if (selectedIds().has(row.id)) {
+			return;
+		}
+		const chip = document.createElement("span");
+		chip.className = "typeahead-chip badge badge-primary text-white gap-1 p-3";
+		chip.dataset.id = row.id;
+		if (row.in_public) {
+			chip.dataset.inPublic = "true";
+		}
+		const hidden = document.createElement("input");
+		hidden.type = "hidden";
+		hidden.name = name;
+		hidden.value = row.id;
+		const remove = document.createElement("button");
+		remove.type = "button";
+		remove.className = "typeahead-remove";
+		remove.innerHTML = '<i class="bi bi-x"></i>';
+		chip.append(hidden, document.createTextNode(row.label), remove);
+		selected.appendChild(chip);
+		bindRemove(chip);
+	}
+
+	function renderRow(row) {
+		const card = document.createElement("div");
+		card.className = "flex items-center p-3 bg-base-100 shadow rounded-lg transition-all duration-200 " + (row.disabled ? "opacity-50 cursor-not-allowed" : "cursor-pointer hover:shadow-lg");
+		const img = document.createElement("img");
+		img.src = row.image || "";
+		img.alt = row.label;
+		img.className = "w-10 h-10 rounded-full object-cover border border-gray-200 flex-shrink-0";
+		const text = document.createElement("div");
+		text.className = "ml-3 flex-grow";
+		const label = document.createElement("p");
+		label.className = "text-sm font-medium text-gray-900";
+		label.textContent = row.label;
+		const detail = document.createElement("p");
+		detail.className = "text-xs text-gray-500";
+		detail.textContent = row.detail || "";
+		text.append(label, detail);
+		card.append(img, text);
+		if (!row.disabled) {
+			card.addEventListener("click", () => addChip(row));
+		}
+		results.appendChild(card);
+	}
+
+	function search(append) {
+		const params = new URLSearchParams({ q: input.value.trim() });
+		if (append && cursor) {
+			params.set("cursor", cursor);
+		}
+		fetch(`${url}?${params}`, { headers: { Accept: "application/json" } })
+			.then((response) => response.json())
+			.then((data) => {
+				if (!append) {
+					results.innerHTML = "";
+				}
+				data.results.forEach(renderRow);
+				cursor = data.next_cursor;
+				more.classList.toggle("hidden", !cursor);
+			});
+	}
+
+	selected.querySelectorAll(".typeahead-chip").forEach(bindRemove);
+	input.addEventListener("input", () => {
+		clearTimeout(timeout);
+		timeout = setTimeout(() => search(false), 300);
+	});
+	input.addEventListener("focus", () => {
+		if (!results.childElementCount) {
+			search(false);
+		}
+	});
+	more.addEventListener("click", () => search(true));
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+	document.querySelectorAll(".typeahead-picker").forEach(initTypeaheadPicker);
+});
@@ -0,0 +1,60 @@
+function initRequestQueue(panel) {
+	const kind = panel.dataset.kind;
+	const list = panel.querySelector(".queue-new");
+	const source = new EventSource(panel.dataset.streamUrl);
+	// A reconnect resumes from the last settled event, so recent ones can
+	// arrive twice.
+	const seen = new Set();
+
+	function describe(change) {
+		const summary = change.summary;
+		if (kind === "rental") {
+			return `${summary.patron} requested ${summary.quantity} × ${summary.item}`;
+		}
+		return `${summary.patron} requested access to ${summary.collection}`;
+	}
+
+	source.addEventListener("counts", (event) => {
+		const counts = JSON.parse(event.data);
+		document.querySelectorAll("[data-pending-count]").forEach((element) => {
+			element.textContent = counts[kind];
+		});
+	});
+
+	source.addEventListener("request", (event) => {
+		const change = JSON.parse(event.data);
+		if (change.kind !== kind || seen.has(change.id)) {
+			return;
+		}
+		seen.add(change.id);
+		if (change.action === "created") {
+			if (!change.summary) {
+				return;
+			}
+			const entry = document.createElement("li");
+			entry.dataset.requestId = change.request_id;
+			entry.textContent = describe(change);
+			list.appendChild(entry);
+			panel.classList.remove("hidden");
+			return;
+		}
+
+		list.querySelector(`[data-request-id="${change.request_id}"]`)?.remove();
+		if (!list.childElementCount) {
+			panel.classList.add("hidden");
+		}
+		const card = document.querySelector(`.request-card[data-request-id="${change.request_id}"]`);
+		if (card && !card.dataset.resolved) {
+			card.dataset.resolved = change.action;
+			card.classList.add("opacity-50");
+			const badge = document.createElement("div");
+			badge.className = "absolute top-4 right-4 badge badge-neutral text-xs font-medium";
+			badge.textContent = change.action.charAt(0).toUpperCase() + change.action.slice(1);
+			card.appendChild(badge);
+		}
+	});
+}
+
+document.addEventListener("DOMContentLoaded", () => {
+	document.querySelectorAll(".request-queue").forEach(initRequestQueue);
+});
@@ -0,0 +1,22 @@
+// Swaps the "More reviews" button for the next page of reviews, which
+// carries its own button when there are more still.
+document.addEventListener("click", async (event) => {
+	const button = event.target.closest("[data-more-reviews] button");
+	if (!button) {
+		return;
+	}
+	button.disabled = true;
+	const holder = button.closest("[data-more-reviews]");
+	try {
+		const response = await fetch(button.dataset.url, {
+			headers: { "X-Requested-With": "XMLHttpRequest" },
+		});
+		if (!response.ok) {
+			throw new Error(response.statusText);
+		}
+		holder.insertAdjacentHTML("beforebegin", await response.text());
+		holder.remove();
+	} catch (error) {
+		button.disabled = false;
+	}
+});
@@ -22,8 +22,6 @@ def patron_status(request):
 def patron_notifications(request):
     if request.user.is_authenticated and _patron_service.is_patron(request.user):
         return {
-            "notification_count": _patron_service.get_unread_request_notifications(
-                request.user
-            )
+            "notification_count": request.user.userprofile.unread_notifications,
         }
     return {}
@@ -1,15 +1,18 @@
 
+from django.urls import reverse_lazy
 from django import forms
+from gear.forms.picker_field import PickerMultipleChoiceField
 from users.models import UserProfile
 from users.service.service_instances import _patron_service
 
 
 class AddLibrarianForm(forms.Form):
-    new_librarians = forms.ModelMultipleChoiceField(
+    new_librarians = PickerMultipleChoiceField(
         queryset=UserProfile.objects.none(),
+        search_url=reverse_lazy('users:picker_patrons'),
+        placeholder='Search patrons...',
         required=True,
         error_messages={'required': 'Please select a librarian.'},
-        widget=forms.CheckboxSelectMultiple,
     )
 
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,46 @@
+from django.db import migrations
+
+# Postgres-only: trigram GIN indexes matching the UPPER(col::text) LIKE
+# expressions Django emits for icontains, plus text_pattern_ops btrees on
+# lower(col) for prefix matches. Other backends keep scanning.
+FORWARD_SQL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS users_profile_name_trgm "
+    "ON users_userprofile USING gin (UPPER(name::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS users_profile_email_trgm "
+    "ON users_userprofile USING gin (UPPER(email::text) gin_trgm_ops)",
+    "CREATE INDEX IF NOT EXISTS users_profile_email_prefix "
+    "ON users_userprofile (LOWER(email::text) text_pattern_ops)",
+    "CREATE INDEX IF NOT EXISTS users_profile_name_prefix "
+    "ON users_userprofile (LOWER(name::text) text_pattern_ops)",
+]
+
+REVERSE_SQL = [
+    "DROP INDEX IF EXISTS users_profile_name_trgm",
+    "DROP INDEX IF EXISTS users_profile_email_trgm",
+    "DROP INDEX IF EXISTS users_profile_email_prefix",
+    "DROP INDEX IF EXISTS users_profile_name_prefix",
+]
+
+
+def run_postgres_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != "postgresql":
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0006_userprofile_last_viewed_collection_requests_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_postgres_sql(FORWARD_SQL), run_postgres_sql(REVERSE_SQL)
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.19 on 2026-10-19 10:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0007_userprofile_search_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="userprofile",
+            name="unread_notifications",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
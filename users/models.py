@@ -25,6 +25,9 @@ class UserProfile(models.Model):
 
     last_viewed_rental_requests = models.DateTimeField(null=True, blank=True)
     last_viewed_collection_requests = models.DateTimeField(null=True, blank=True)
+    # Counter cache of unread gear.Notification rows, kept by
+    # NotificationService so the nav badge costs no query.
+    unread_notifications = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return f"{self.name}"
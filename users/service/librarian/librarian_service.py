@@ -1,3 +1,4 @@
+from django.db import transaction
 from django.forms import ValidationError
 from ...models import UserProfile as User
 from django.utils import timezone
@@ -45,39 +46,77 @@ class LibrarianService:
         except (ValidationError, ValueError, User.DoesNotExist) as e:
             return e
 
+    @staticmethod
+    def _lock_pending(rental_request):
+        """Lock the item, then the request, and reload the request's fields.
+
+        Items are locked first, as ``request_rent_item`` does, so two
+        librarians acting on the same request or item queue up instead of
+        both passing the checks.
+        """
+        from gear.models import Item, RentalRequest
+
+        list(
+            Item.objects.select_for_update()
+            .filter(pk=rental_request.item_id)
+            .values("pk")
+        )
+        list(
+            RentalRequest.objects.select_for_update()
+            .filter(pk=rental_request.pk)
+            .values("pk")
+        )
+        rental_request.refresh_from_db()
+
     @staticmethod
     def approve_rental_request(rental_request, librarian):
         from gear.models import BorrowHistory
+        from gear.service.hold.hold_service import HoldService
+        from gear.service.notification.notification_service import NotificationService
+        from gear.service.queue.request_queue_service import RequestQueueService
+        from gear.service.wishlist.wishlist_alert_service import WishlistAlertService
 
         try:
-            if rental_request.status != "pending":
-                return "Only pending requests can be approved"
-
-            if rental_request.quantity > rental_request.item.available_quantity:
-                return (
-                    f"Not enough quantity available. Requested: {rental_request.quantity}, "
-                    f"Available: {rental_request.item.available_quantity}"
+            with transaction.atomic():
+                LibrarianService._lock_pending(rental_request)
+                if rental_request.status != "pending":
+                    return "Only pending requests can be approved"
+
+                # The request's own hold is stock set aside for it.
+                item = rental_request.item
+                available = item.available_for_request(rental_request)
+                if rental_request.quantity > available:
+                    return (
+                        f"Not enough quantity available. Requested: {rental_request.quantity}, "
+                        f"Available: {available}"
+                    )
+
+                rental_request.status = "approved"
+                rental_request.approved_by = librarian
+                rental_request.approved_date = timezone.now()
+                rental_request.save()
+                HoldService.release(rental_request)
+
+                item.rent_start_date = rental_request.approved_date
+                item.rent_return_date = rental_request.approved_date + timedelta(days=7)
+                BorrowHistory.objects.bulk_create(
+                    BorrowHistory(item=item, user=rental_request.patron)
+                    for _ in range(rental_request.quantity)
                 )
-
-            rental_request.status = "approved"
-            rental_request.approved_by = librarian
-            rental_request.approved_date = timezone.now()
-            rental_request.save()
-
-            item = rental_request.item
-            item.rent_start_date = rental_request.approved_date
-            item.rent_return_date = rental_request.approved_date + timedelta(days=7)
-
-            for _ in range(rental_request.quantity):
-                BorrowHistory.objects.create(
-                    item=item,
-                    user=rental_request.patron,
+                if item.available_quantity == 0:
+                    item.status = "rented_out"
+                item.save(
+                    update_fields=["rent_start_date", "rent_return_date", "status"]
+                )
+                # Approval only takes stock, so it never restocks anything; it
+                # does settle the borrower's own pending alert for the item.
+                WishlistAlertService.dismiss(rental_request.patron, item)
+                RequestQueueService.record("rental", "approved", rental_request.id)
+                transaction.on_commit(
+                    lambda: NotificationService.notify(
+                        "rental_approved", [(rental_request.patron_id, item)]
+                    )
                 )
-
-            if item.available_quantity == 0:
-                item.status = "rented_out"
-
-            item.save(update_fields=["rent_start_date", "rent_return_date", "status"])
             return True
 
         except Exception as e:
@@ -85,21 +124,44 @@ class LibrarianService:
 
     @staticmethod
     def deny_rental_request(rental_request, librarian):
-        try:
-            if rental_request.status != "pending":
-                return "Only pending requests can be denied"
-
-            rental_request.status = "rejected"
-            rental_request.approved_by = librarian
-            rental_request.approved_date = timezone.now()
-            rental_request.save()
+        from gear.service.hold.hold_service import HoldService
+        from gear.service.notification.notification_service import NotificationService
+        from gear.service.queue.request_queue_service import RequestQueueService
+        from gear.service.wishlist.wishlist_alert_service import WishlistAlertService
 
+        try:
+            with transaction.atomic():
+                LibrarianService._lock_pending(rental_request)
+                if rental_request.status != "pending":
+                    return "Only pending requests can be denied"
+
+                item = rental_request.item
+                available_before = item.available_quantity
+                rental_request.status = "rejected"
+                rental_request.approved_by = librarian
+                rental_request.approved_date = timezone.now()
+                rental_request.save()
+                HoldService.release(rental_request)
+                # The alert fan-out is an outbox task, so it commits or rolls
+                # back with the denial.
+                WishlistAlertService.item_restocked(
+                    item, available_before, item.available_quantity
+                )
+                RequestQueueService.record("rental", "rejected", rental_request.id)
+                transaction.on_commit(
+                    lambda: NotificationService.notify(
+                        "rental_rejected", [(rental_request.patron_id, item)]
+                    )
+                )
             return True
         except Exception as e:
             return str(e)
 
     @staticmethod
     def approve_private_collection_request(access_request, librarian):
+        from gear.service.notification.notification_service import NotificationService
+        from gear.service.queue.request_queue_service import RequestQueueService
+
         try:
             if access_request.status != "pending":
                 return "Only pending requests can be approved."
@@ -111,12 +173,20 @@ class LibrarianService:
                 id=access_request.patron.id
             ).exists():
                 access_request.collection.allowed_users.add(access_request.patron)
+            NotificationService.notify(
+                "collection_approved",
+                [(access_request.patron_id, access_request.collection)],
+            )
+            RequestQueueService.record("collection", "approved", access_request.id)
             return True
         except Exception as e:
             return str(e)
 
     @staticmethod
     def deny_private_collection_request(access_request, librarian):
+        from gear.service.notification.notification_service import NotificationService
+        from gear.service.queue.request_queue_service import RequestQueueService
+
         try:
             if access_request.status != "pending":
                 return "Only pending requests can be denied."
@@ -124,6 +194,11 @@ class LibrarianService:
             access_request.approved_by = librarian
             access_request.approved_date = timezone.now()
             access_request.save()
+            NotificationService.notify(
+                "collection_rejected",
+                [(access_request.patron_id, access_request.collection)],
+            )
+            RequestQueueService.record("collection", "rejected", access_request.id)
             return True
         except Exception as e:
             return str(e)
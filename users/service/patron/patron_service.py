@@ -1,6 +1,7 @@
 from ...models import UserProfile as User
-from django.db.models import Q
-from django.utils import timezone
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Case, F, FloatField, Func, Q, Value, When
+from django.db.models.functions import Cast, Greatest, Lower
 
 
 class PatronService:
@@ -17,17 +18,56 @@ class PatronService:
 
         return user.userprofile.user_type == "patron"
 
+    # Trigram indexes only help once the query has a full trigram; shorter
+    # queries are answered from the lower(name)/lower(email) prefix indexes.
+    MIN_TRIGRAM_QUERY = 3
+    SEARCH_ORDERING = ("-rank", "name", "id")
+
     @staticmethod
     def search_patrons(query: str):
+        query = (query or "").strip()
         if not query:
             return User.objects.none()
 
-        users = User.objects.filter(
-            Q(user_type="patron")
-            & (Q(name__icontains=query) | Q(email__icontains=query))
+        lowered = query.lower()
+        patrons = User.objects.filter(user_type="patron").alias(
+            name_lower=Lower("name"), email_lower=Lower("email")
+        )
+        prefix = Q(email_lower__startswith=lowered) | Q(name_lower__startswith=lowered)
+
+        if len(query) < PatronService.MIN_TRIGRAM_QUERY:
+            return patrons.filter(prefix).annotate(
+                rank=Case(
+                    When(email_lower__startswith=lowered, then=Value(1.0)),
+                    default=Value(0.5),
+                    output_field=FloatField(),
+                )
+            )
+
+        # On Postgres the icontains lookups are served by the GIN
+        # UPPER(col) gin_trgm_ops indexes from users.0007.
+        patrons = patrons.filter(
+            prefix | Q(name__icontains=query) | Q(email__icontains=query)
         )
 
-        return users
+        if connection.vendor == "postgresql":
+            rank = Cast(
+                Greatest(
+                    Func(F("name"), Value(query), function="SIMILARITY"),
+                    Func(F("email"), Value(query), function="SIMILARITY"),
+                ),
+                FloatField(),
+            )
+        else:
+            rank = Case(
+                When(email_lower=lowered, then=Value(1.0)),
+                When(email_lower__startswith=lowered, then=Value(0.8)),
+                When(name_lower__startswith=lowered, then=Value(0.6)),
+                default=Value(0.3),
+                output_field=FloatField(),
+            )
+
+        return patrons.annotate(rank=rank)
 
     @staticmethod
     def get_all_patrons():
@@ -35,29 +75,46 @@ class PatronService:
 
     @staticmethod
     def request_rent_item(item, patron, quantity=1):
-        from gear.models import RentalRequest
-
-        if RentalRequest.objects.filter(
-            patron=patron.userprofile, item=item, status="pending"
-        ).exists():
-            raise RentalRequestError(
-                "You already have a pending request for this item."
-            )
-
-        if item.available_quantity < quantity:
-            raise RentalRequestError("Requested quantity exceeds the available stock.")
-
-        rental_request = RentalRequest.objects.create(
-            item=item,
-            patron=patron.userprofile,
-            status="pending",
-            quantity=quantity,
-        )
+        from gear.models import Item, RentalRequest
+        from gear.service.hold.hold_service import HoldService
+        from gear.service.queue.request_queue_service import RequestQueueService
+
+        # The partial unique constraint on (patron, item) for pending
+        # requests rejects duplicates, so there is no check-then-insert race.
+        # Locking the item row serialises the availability check with the
+        # hold it places, so concurrent requests cannot oversubscribe stock.
+        with transaction.atomic():
+            list(Item.objects.select_for_update().filter(pk=item.pk).values("pk"))
+            if item.available_quantity < quantity:
+                raise RentalRequestError(
+                    "Requested quantity exceeds the available stock."
+                )
+            try:
+                with transaction.atomic():
+                    rental_request = RentalRequest.objects.create(
+                        item=item,
+                        patron=patron.userprofile,
+                        status="pending",
+                        quantity=quantity,
+                    )
+            except IntegrityError:
+                # Only a clash with gear_rental_one_pending_per_item means a
+                # duplicate; anything else is a bug and propagates.
+                if not RentalRequest.objects.filter(
+                    item=item, patron=patron.userprofile, status="pending"
+                ).exists():
+                    raise
+                raise RentalRequestError(
+                    "You already have a pending request for this item."
+                )
+            HoldService.place_hold(rental_request)
+            RequestQueueService.record("rental", "created", rental_request.id)
         return rental_request
 
     @staticmethod
     def request_private_collection(collection, patron):
         from gear.models import CollectionAccessRequest
+        from gear.service.queue.request_queue_service import RequestQueueService
 
         if CollectionAccessRequest.objects.filter(
             patron=patron.userprofile, collection=collection, status="pending"
@@ -71,9 +128,11 @@ class PatronService:
                 "You already have access to this collection."
             )
 
-        access_request = CollectionAccessRequest.objects.create(
-            collection=collection, patron=patron.userprofile, status="pending"
-        )
+        with transaction.atomic():
+            access_request = CollectionAccessRequest.objects.create(
+                collection=collection, patron=patron.userprofile, status="pending"
+            )
+            RequestQueueService.record("collection", "created", access_request.id)
         return access_request
 
     @staticmethod
@@ -90,42 +149,18 @@ class PatronService:
         if rating_value < 1 or rating_value > 5:
             raise ValueError("Rating must be between 1 and 5.")
 
-        if ItemReview.objects.filter(item=item, user=patron.userprofile).exists():
+        try:
+            with transaction.atomic():
+                review = ItemReview.objects.create(
+                    item=item,
+                    user=patron.userprofile,
+                    rating=rating_value,
+                    comment=comment.strip(),
+                )
+        except IntegrityError:
             raise ValueError("You have already left a review for this item.")
-
-        review = ItemReview.objects.create(
-            item=item,
-            user=patron.userprofile,
-            rating=rating_value,
-            comment=comment.strip(),
-        )
         return review, True
 
-    @staticmethod
-    def get_unread_request_notifications(user):
-        from gear.models import RentalRequest, CollectionAccessRequest
-
-        up = getattr(user, "userprofile", user)
-
-        last_rental = up.last_viewed_rental_requests or timezone.make_aware(
-            timezone.datetime.min
-        )
-        last_coll = up.last_viewed_collection_requests or timezone.make_aware(
-            timezone.datetime.min
-        )
-
-        rental_unread = RentalRequest.objects.filter(
-            patron=up,
-            status__in=["approved", "rejected"],
-            approved_date__gt=last_rental,
-        ).count()
-
-        coll_unread = CollectionAccessRequest.objects.filter(
-            patron=up, status__in=["approved", "rejected"], approved_date__gt=last_coll
-        ).count()
-
-        return rental_unread + coll_unread
-
 
 class RentalRequestError(Exception):
     pass
@@ -5,7 +5,10 @@ from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.test import override_settings
 from django.core.files.storage import FileSystemStorage
+from unittest import skipUnless
+from django.db import connection
 from .models import UserProfile
+from .service.patron.patron_service import PatronService
 
 
 class UserAccessTests(TestCase):
@@ -297,3 +300,66 @@ class UserProfileUpdateTest(TestCase):
                 # Check that the form shows validation errors
                 self.assertTrue('form' in response.context)
                 self.assertTrue(response.context['form'].errors)
+
+
+class PatronSearchTests(TestCase):
+    def setUp(self):
+        User = get_user_model()
+        for name, email in [
+            ("Alice Walker", "alice@example.com"),
+            ("Walker Brown", "wbrown@example.com"),
+            ("Bob Stone", "bob.walker@example.com"),
+            ("Carol King", "carol@example.com"),
+        ]:
+            UserProfile.objects.create(
+                user=User.objects.create_user(username=email, password="pass"),
+                name=name,
+                email=email,
+                user_type="patron",
+            )
+        librarian = User.objects.create_user(username="lib", password="pass")
+        UserProfile.objects.create(
+            user=librarian,
+            name="Walker Librarian",
+            email="lib@example.com",
+            user_type="librarian",
+        )
+        self.librarian = librarian
+
+    def names(self, queryset):
+        return [
+            patron.name for patron in queryset.order_by(*PatronService.SEARCH_ORDERING)
+        ]
+
+    def test_empty_query_returns_nothing(self):
+        self.assertFalse(PatronService.search_patrons("  ").exists())
+
+    def test_search_ranks_prefix_matches_first(self):
+        names = self.names(PatronService.search_patrons("walker"))
+        self.assertEqual(names[0], "Walker Brown")
+        self.assertEqual(set(names), {"Walker Brown", "Alice Walker", "Bob Stone"})
+
+    def test_short_query_only_matches_prefixes(self):
+        names = self.names(PatronService.search_patrons("ca"))
+        self.assertEqual(names, ["Carol King"])
+
+    def test_picker_endpoint_paginates_ranked_results(self):
+        self.client.force_login(self.librarian)
+        url = reverse("users:picker_patrons")
+
+        first = self.client.get(url, {"q": "walker", "limit": 2}).json()
+        second = self.client.get(
+            url, {"q": "walker", "limit": 2, "cursor": first["next_cursor"]}
+        ).json()
+
+        labels = [row["label"] for row in first["results"] + second["results"]]
+        self.assertEqual(len(labels), 3)
+        self.assertEqual(len(set(labels)), 3)
+        self.assertIsNone(second["next_cursor"])
+
+    @skipUnless(connection.vendor == "postgresql", "pg_trgm indexes are Postgres-only")
+    def test_trigram_index_serves_contains_search(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+        plan = PatronService.search_patrons("walker").explain()
+        self.assertIn("users_profile_name_trgm", plan)
@@ -2,14 +2,16 @@ from django.urls import path
 
 from gear.views.detail import collection_detail_view, item_detail_view
 from gear.views.home import home_view
+from gear.views.requests.queue import request_queue_view
 from gear.views.requests.rentals import librarian_rental_view, patron_rental_view
 from gear.views.requests.private_collection import (
     patron_private_collections_view,
     librarian_private_collections_view,
 )
+from gear.views.notifications import notification_view
 from gear.views.wishlist import wishlist_view
 from .views import base_view
-from .views.librarian import add_librarian_view
+from .views.librarian import add_librarian_view, patron_picker_view
 from .views import profile_view
 
 app_name = "users"
@@ -18,8 +20,23 @@ urlpatterns = [
     path("logout/", base_view.logout_view, name="logout"),
     path("profile/", profile_view.profile, name="profile"),
     path("librarian/add/", add_librarian_view.add_librarian, name="add_librarian"),
+    path(
+        "picker/patrons/",
+        patron_picker_view.picker_patrons,
+        name="picker_patrons",
+    ),
     path("update_profile/", profile_view.update_user, name="update_profile"),
     path("wishlist/", wishlist_view.wishlist, name="wishlist"),
+    path(
+        "notifications/",
+        notification_view.notifications,
+        name="notifications",
+    ),
+    path(
+        "notifications/read/",
+        notification_view.mark_notifications_read,
+        name="mark_notifications_read",
+    ),
     path(
         "item/<uuid:item_id>/add_to_wishlist/",
         home_view.add_to_wishlist,
@@ -41,6 +58,11 @@ urlpatterns = [
         patron_rental_view.cancel_request,
         name="cancel_rental_request",
     ),
+    path(
+        "librarian/queue/stream/",
+        request_queue_view.librarian_queue_stream,
+        name="librarian_queue_stream",
+    ),
     path(
         "librarian/rentals/",
         librarian_rental_view.librarian_rentals,
@@ -0,0 +1,39 @@
+from django.views.decorators.http import require_GET
+from gear.service.pagination.pagination_service import InvalidCursor
+from gear.views.picker.picker_view import picker_error, picker_page, picker_response
+from ..base_view import is_librarian
+from ...service.service_instances import _patron_service
+
+
+@require_GET
+def picker_patrons(request):
+    if not is_librarian(request.user):
+        return picker_error("You don't have permission to search patrons.", 403)
+
+    query = request.GET.get("q", "").strip()
+    if query:
+        patrons = _patron_service.search_patrons(query)
+        ordering = _patron_service.SEARCH_ORDERING
+    else:
+        patrons = _patron_service.get_all_patrons()
+        ordering = ("name", "id")
+    patrons = patrons.exclude(email=request.user.email)
+
+    try:
+        rows, next_cursor = picker_page(request, patrons, ordering=ordering)
+    except InvalidCursor as e:
+        return picker_error(str(e), 400)
+
+    return picker_response(
+        [
+            {
+                "id": str(patron.id),
+                "label": patron.name,
+                "detail": patron.email,
+                "image": patron.profile_picture.url,
+                "disabled": False,
+            }
+            for patron in rows
+        ],
+        next_cursor,
+    )